@@ -13,6 +13,7 @@ import inspect
 import ipaddress
 import datetime
 import os
+import time
 from math import *
 import collections
 import ast
@@ -43,68 +44,96 @@ RESERVED_CATG = ['South', 'North', 'General',
 
 
 class ConfigurationCache(object):
-    """Configuration Cache Manager"""
+    """Configuration Cache Manager
 
-    MAX_CACHE_SIZE = 10
+    Categories are kept in least recently used order, so a hit moves the category to the end of the cache
+    and an eviction drops the first one; both are O(1).
+    """
 
-    def __init__(self):
+    MAX_CACHE_SIZE = 100
+    """ Default number of categories held in the cache """
+
+    def __init__(self, max_cache_size=MAX_CACHE_SIZE, ttl=None):
         """
-        cache: value stored in dictionary as per category_name
-        max_cache_size: Hold the 10 recently requested categories in the cache
+        cache: value stored in dictionary as per category_name, least recently used first
+        max_cache_size: Hold the max_cache_size recently requested categories in the cache
+        ttl: seconds after which a cached category is read again from the storage layer, None or 0 to never expire
         hit: number of times an item is read from the cache
         miss: number of times an item was not found in the cache and a read of the storage layer was required
+        eviction: number of categories removed from the cache to make room for more recently used ones
+        expired: number of times a category was found in the cache but was older than ttl
         """
         self.cache = {}
-        self.max_cache_size = self.MAX_CACHE_SIZE
+        self.max_cache_size = max_cache_size
+        self.ttl = ttl
         self.hit = 0
         self.miss = 0
+        self.eviction = 0
+        self.expired = 0
 
     def __contains__(self, category_name):
         """Returns True or False depending on whether or not the key is in the cache
         and update the hit and data_accessed"""
-        if category_name in self.cache:
-            try:
-                current_hit = self.cache[category_name]['hit']
-            except KeyError:
-                current_hit = 0
-
-            self.hit += 1
-            self.cache[category_name].update({'date_accessed': datetime.datetime.now(), 'hit': current_hit + 1})
-            return True
+        entry = self.cache.get(category_name)
+        if entry is not None:
+            if self.ttl and time.monotonic() - entry.get('cached_at', 0) > self.ttl:
+                self.cache.pop(category_name)
+                self.expired += 1
+            else:
+                self.hit += 1
+                entry.update({'date_accessed': datetime.datetime.now(), 'hit': entry.get('hit', 0) + 1})
+                # Move to the most recently used end
+                self.cache[category_name] = self.cache.pop(category_name)
+                return True
         self.miss += 1
         return False
 
     # TODO: FOGL-3246 Add description
-    def update(self, category_name, category_val, display_name=None):
-        """Update the cache dictionary and remove the oldest item"""
-        if category_name not in self.cache and len(self.cache) >= self.max_cache_size:
-            self.remove_oldest()
+    def update(self, category_name, category_val, display_name=None, resolved=False):
+        """Update the cache dictionary and remove the least recently used items beyond max_cache_size
+
+        resolved is True when script type items of category_val are already decoded and carry their "file"
+        """
+        self.cache.pop(category_name, None)
         display_name = category_name if display_name is None else display_name
-        self.cache[category_name] = {'date_accessed': datetime.datetime.now(), 'value': category_val, 'displayName': display_name}
-        _logger.info("Updated Configuration Cache %s", self.cache)
+        self.cache[category_name] = {'date_accessed': datetime.datetime.now(), 'cached_at': time.monotonic(),
+                                     'value': category_val, 'displayName': display_name, 'resolved': resolved}
+        while len(self.cache) > self.max_cache_size:
+            self.remove_oldest()
+        _logger.debug("Updated Configuration Cache for category %s", category_name)
+
+    def configure(self, max_cache_size=None, ttl=None):
+        """Change the capacity and the ttl of the cache, evicting the least recently used items if it shrinks"""
+        if max_cache_size is not None:
+            self.max_cache_size = max_cache_size
+        if ttl is not None:
+            self.ttl = ttl
+        while len(self.cache) > self.max_cache_size:
+            self.remove_oldest()
 
     def remove_oldest(self):
-        """Remove the entry that has the oldest accessed date"""
-        oldest_entry = None
-        for category_name in self.cache:
-            if oldest_entry is None:
-                oldest_entry = category_name
-            elif self.cache[category_name]['date_accessed'] < self.cache[oldest_entry]['date_accessed']:
-                oldest_entry = category_name
-        self.cache.pop(oldest_entry)
+        """Remove the least recently used entry"""
+        if self.cache:
+            self.cache.pop(next(iter(self.cache)))
+            self.eviction += 1
 
     def remove(self, key):
         """Remove the entry with given key name"""
-        for category_name in self.cache:
-            if key == category_name:
-                self.cache.pop(key)
-                break
+        self.cache.pop(key, None)
 
     @property
     def size(self):
         """Return the size of the cache"""
         return len(self.cache)
 
+    @property
+    def statistics(self):
+        """Return the size, capacity and hit/miss/eviction counters of the cache"""
+        lookups = self.hit + self.miss
+        return {'size': self.size, 'maxSize': self.max_cache_size, 'ttl': self.ttl if self.ttl else 0,
+                'hit': self.hit, 'miss': self.miss, 'eviction': self.eviction, 'expired': self.expired,
+                'hitRatio': round(self.hit / lookups, 4) if lookups else 0}
+
 
 class ConfigurationManagerSingleton(object):
     """ ConfigurationManagerSingleton
@@ -146,6 +175,11 @@ class ConfigurationManager(ConfigurationManagerSingleton):
     _storage = None
     _registered_interests = None
     _cacheManager = None
+    _category_tree = None
+    _callback_methods = None
+
+    _CATEGORY_TREE_MAX_AGE = 30
+    """ Seconds after which the category tree is reloaded, to pick up categories written by other processes """
 
     def __init__(self, storage=None):
         ConfigurationManagerSingleton.__init__(self)
@@ -157,27 +191,37 @@ class ConfigurationManager(ConfigurationManagerSingleton):
             self._registered_interests = {}
         if self._cacheManager is None:
             self._cacheManager = ConfigurationCache()
+        if self._callback_methods is None:
+            self._callback_methods = {}
 
     async def _run_callbacks(self, category_name):
         callbacks = self._registered_interests.get(category_name)
         if callbacks is not None:
             for callback in callbacks:
-                try:
-                    cb = import_module(callback)
-                except ImportError:
-                    _logger.exception(
-                        'Unable to import callback module %s for category_name %s', callback, category_name)
-                    raise
-                if not hasattr(cb, 'run'):
-                    _logger.exception(
-                        'Callback module %s does not have method run', callback)
-                    raise AttributeError('Callback module {} does not have method run'.format(callback))
-                method = cb.run
-                if not inspect.iscoroutinefunction(method):
-                    _logger.exception(
-                        'Callback module %s run method must be a coroutine function', callback)
-                    raise AttributeError('Callback module {} run method must be a coroutine function'.format(callback))
-                await cb.run(category_name)
+                method = self._callback_methods.get(callback)
+                if method is None:
+                    method = self._resolve_callback(callback, category_name)
+                await method(category_name)
+
+    def _resolve_callback(self, callback, category_name):
+        """Import the callback module once and cache its run coroutine function"""
+        try:
+            cb = import_module(callback)
+        except ImportError:
+            _logger.exception(
+                'Unable to import callback module %s for category_name %s', callback, category_name)
+            raise
+        if not hasattr(cb, 'run'):
+            _logger.exception(
+                'Callback module %s does not have method run', callback)
+            raise AttributeError('Callback module {} does not have method run'.format(callback))
+        method = cb.run
+        if not inspect.iscoroutinefunction(method):
+            _logger.exception(
+                'Callback module %s run method must be a coroutine function', callback)
+            raise AttributeError('Callback module {} run method must be a coroutine function'.format(callback))
+        self._callback_methods[callback] = method
+        return method
 
     async def _merge_category_vals(self, category_val_new, category_val_storage, keep_original_items, category_name=None):
         # preserve all value_vals from category_val_storage
@@ -338,6 +382,8 @@ class ConfigurationManager(ConfigurationManagerSingleton):
             response = result['response']
             # TODO: FOGL-3246 Add description in cache
             self._cacheManager.update(category_name, new_category_val, display_name)
+            if self._category_tree is not None:
+                self._category_tree['categories'][category_name] = (category_description, display_name)
         except KeyError:
             raise ValueError(result['message'])
         except StorageServerError as ex:
@@ -357,18 +403,18 @@ class ConfigurationManager(ConfigurationManagerSingleton):
         return category_info
 
     async def _read_all_groups(self, root, children):
-        async def nested_children(child):
-            # Recursively find children
-            if not child:
-                return
-            next_children = await self.get_category_child(child["key"])
-            if len(next_children) == 0:
-                child.update({"children": []})
-            else:
-                child.update({"children": next_children})
-                # call for each child
-                for next_child in child["children"]:
-                    await nested_children(next_child)
+        if children:
+            tree_index = self._category_tree
+            if tree_index is None or time.monotonic() - tree_index['loaded_at'] > self._CATEGORY_TREE_MAX_AGE:
+                tree_index = await self._load_category_tree()
+            categories = tree_index['categories']
+            list_child = {child for category_children in tree_index['children'].values() for child in category_children}
+            tree = []
+            for k, (v, d) in categories.items():
+                if (k not in list_child) == (root is True):
+                    tree.append({"key": k, "description": v, "displayName": d,
+                                 "children": self._category_subtree(tree_index, k, {k})})
+            return tree
 
         # SELECT key, description, display_name FROM configuration
         payload = PayloadBuilder().SELECT("key", "description", "display_name").payload()
@@ -378,7 +424,7 @@ class ConfigurationManager(ConfigurationManagerSingleton):
         unique_category_children_payload = PayloadBuilder().SELECT("child").DISTINCT(["child"]).payload()
         unique_category_children = await self._storage.query_tbl_with_payload('category_children', unique_category_children_payload)
 
-        list_child = [row['child'] for row in unique_category_children['rows']]
+        list_child = {row['child'] for row in unique_category_children['rows']}
         list_root = []
         list_not_root = []
 
@@ -387,17 +433,43 @@ class ConfigurationManager(ConfigurationManagerSingleton):
                 list_not_root.append((row["key"], row["description"], row["display_name"]))
             else:
                 list_root.append((row["key"], row["description"], row["display_name"]))
-        if children:
-            tree = []
-            for k, v, d in list_root if root is True else list_not_root:
-                tree.append({"key": k, "description": v, "displayName": d, "children": []})
 
-            for branch in tree:
-                await nested_children(branch)
+        return list_root if root else list_not_root
 
-            return tree
+    async def _load_category_tree(self):
+        """Build the adjacency index of the categories and their children with one query per table
 
-        return list_root if root else list_not_root
+        Return Values:
+        dict with "categories" as key -> (description, display_name) and "children" as parent -> list of children
+        """
+        # SELECT key, description, display_name FROM configuration
+        payload = PayloadBuilder().SELECT("key", "description", "display_name").payload()
+        all_categories = await self._storage.query_tbl_with_payload('configuration', payload)
+
+        # SELECT parent, child FROM category_children
+        payload = PayloadBuilder().SELECT("parent", "child").payload()
+        all_category_children = await self._storage.query_tbl_with_payload('category_children', payload)
+
+        categories = collections.OrderedDict()
+        for row in all_categories['rows']:
+            categories[row['key']] = (row['description'], row['display_name'])
+        children = {}
+        for row in all_category_children['rows']:
+            children.setdefault(row['parent'], []).append(row['child'])
+        self._category_tree = {'categories': categories, 'children': children, 'loaded_at': time.monotonic()}
+        return self._category_tree
+
+    def _category_subtree(self, tree_index, category_name, ancestors):
+        """Return the nested children of a category from the adjacency index, skipping any cycle back to ancestors"""
+        categories = tree_index['categories']
+        subtree = []
+        for child in tree_index['children'].get(category_name, []):
+            if child in ancestors or child not in categories:
+                continue
+            description, display_name = categories[child]
+            subtree.append({"key": child, "description": description, "displayName": display_name,
+                            "children": self._category_subtree(tree_index, child, ancestors | {child})})
+        return subtree
 
     async def _read_category_val(self, category_name):
         # SELECT configuration.key, configuration.description, configuration.value,
@@ -529,12 +601,14 @@ class ConfigurationManager(ConfigurationManagerSingleton):
             # read the updated value from storage
             cat_value = await self._read_category_val(category_name)
             # Category config items cache updated
-            for item_name, new_val in config_item_list.items():
-                if category_name in self._cacheManager.cache:
+            if category_name in self._cacheManager.cache:
+                for item_name, new_val in config_item_list.items():
                     if item_name in self._cacheManager.cache[category_name]['value']:
                         self._cacheManager.cache[category_name]['value'][item_name]['value'] = cat_value[item_name]['value']
                     else:
                         self._cacheManager.cache[category_name]['value'].update({item_name: cat_value[item_name]['value']})
+                # Values are as stored in the database; script type items are resolved again on the next read
+                self._cacheManager.cache[category_name]['resolved'] = False
 
             # Configuration Change audit entry
             audit = AuditLogger(self._storage)
@@ -558,11 +632,9 @@ class ConfigurationManager(ConfigurationManagerSingleton):
             response = result['response']
             # Re-read category from DB
             new_category_val_db = await self._read_category_val(category_name)
-            if category_name in self._cacheManager.cache:
-                self._cacheManager.cache[category_name]['value'] = new_category_val_db
-                self._cacheManager.cache[category_name]['displayName'] = display_name
-            else:
-                self._cacheManager.cache.update({category_name: {"value": new_category_val_db, "displayName": display_name}})
+            self._cacheManager.update(category_name, new_category_val_db, display_name)
+            if self._category_tree is not None:
+                self._category_tree['categories'][category_name] = (category_description, display_name)
         except KeyError:
             raise ValueError(result['message'])
         except StorageServerError as ex:
@@ -603,12 +675,7 @@ class ConfigurationManager(ConfigurationManagerSingleton):
         """
         try:
             if category_name in self._cacheManager:
-                # Interim solution; to ensure script type config item file content handling
-                # Note: Make sure to pass display_name to cacheManager.update; Otherwise, in case of None, it will be set to category_name
-                # FOGL-3246 Add description in cache
-                category_value = self._handle_script_type(category_name, self._cacheManager.cache[category_name]['value'])
-                self._cacheManager.update(category_name, category_value, display_name=self._cacheManager.cache[category_name]['displayName'])
-                return category_value
+                return self._get_cached_category_value(category_name)
 
             category_value = await self._read_category_val(category_name)
 
@@ -616,7 +683,7 @@ class ConfigurationManager(ConfigurationManagerSingleton):
                 category_value = self._handle_script_type(category_name, category_value)
                 # FIXME: FOGL-3246 Explicit set display_name otherwise it always None and add description
                 # For display_name we need to fetch from DB as above def returns only its value
-                self._cacheManager.update(category_name, category_value)
+                self._cacheManager.update(category_name, category_value, resolved=True)
             return category_value
         except:
             _logger.exception(
@@ -636,9 +703,10 @@ class ConfigurationManager(ConfigurationManagerSingleton):
         """
         try:
             if category_name in self._cacheManager:
-                if item_name not in self._cacheManager.cache[category_name]['value']:
+                category_value = self._get_cached_category_value(category_name)
+                if item_name not in category_value:
                     return None
-                return self._cacheManager.cache[category_name]['value'][item_name]
+                return category_value[item_name]
             else:
                 cat_item = await self._read_item_val(category_name, item_name)
                 if cat_item is not None:
@@ -647,7 +715,7 @@ class ConfigurationManager(ConfigurationManagerSingleton):
                         category_value = self._handle_script_type(category_name, category_value)
                         # FIXME: FOGL-3246 Explicit set display_name otherwise it always None and add description
                         # For display_name we need to fetch from DB as above def returns only its value
-                        self._cacheManager.update(category_name, category_value)
+                        self._cacheManager.update(category_name, category_value, resolved=True)
                         cat_item = category_value[item_name]
                 return cat_item
         except:
@@ -1055,6 +1123,8 @@ class ConfigurationManager(ConfigurationManagerSingleton):
             for a_new_child in new_children:
                 result = await self._create_child(category_name, a_new_child)
                 children_from_storage.append(a_new_child)
+                if self._category_tree is not None:
+                    self._category_tree['children'].setdefault(category_name, []).append(a_new_child)
 
             return {"children": children_from_storage}
 
@@ -1095,6 +1165,8 @@ class ConfigurationManager(ConfigurationManagerSingleton):
                 _children = []
                 for item in child_dict:
                     _children.append(item['child'])
+                if self._category_tree is not None:
+                    self._category_tree['children'][category_name] = list(_children)
 
             # TODO: Shall we write audit trail code entry here? log_code?
 
@@ -1126,6 +1198,8 @@ class ConfigurationManager(ConfigurationManagerSingleton):
             payload = PayloadBuilder().WHERE(["parent", "=", category_name]).payload()
             result = await self._storage.delete_from_tbl("category_children", payload)
             response = result["response"]
+            if self._category_tree is not None:
+                self._category_tree['children'].pop(category_name, None)
             # TODO: Shall we write audit trail code entry here? log_code?
 
         except KeyError:
@@ -1201,6 +1275,12 @@ class ConfigurationManager(ConfigurationManagerSingleton):
             # Remove cat from cache
             if cat in self._cacheManager.cache:
                 self._cacheManager.remove(cat)
+            if self._category_tree is not None:
+                self._category_tree['categories'].pop(cat, None)
+                self._category_tree['children'].pop(cat, None)
+                for category_children in self._category_tree['children'].values():
+                    if cat in category_children:
+                        category_children.remove(cat)
 
         except KeyError as ex:
             raise ValueError(ex)
@@ -1347,6 +1427,21 @@ class ConfigurationManager(ConfigurationManagerSingleton):
 
         return item_val
 
+    def _get_cached_category_value(self, category_name):
+        """Return the cached value of the category, resolving its script type items only once after each write
+
+        Keyword Arguments:
+        category_name -- name of the category, must be in the cache
+
+        Return Values:
+        JSON
+        """
+        cache_entry = self._cacheManager.cache[category_name]
+        if not cache_entry.get('resolved'):
+            cache_entry['value'] = self._handle_script_type(category_name, cache_entry['value'])
+            cache_entry['resolved'] = True
+        return cache_entry['value']
+
     def _handle_script_type(self, category_name, category_value):
         """For the given category, check for config item of type script “unhexlify” the value stored in database
         and add “file” attribute on the fly
@@ -26,6 +26,8 @@ class JQFilter:
     def __init__(self):
         """Initialise the JQFilter"""
         self._logger = logger.setup("JQFilter")
+        self._filter_string = None
+        self._program = None
 
     def transform(self, reading_block, filter_string):
         """
@@ -50,3 +52,42 @@ class JQFilter:
         except ValueError as ex:
             self._logger.error("Failed to transform, please check the transformation rule, exception %s", str(ex))
             raise
+
+    def compile(self, filter_string):
+        """
+        Args:
+            filter_string: filter to compile. Filter should be in JQ format.
+        Returns: the compiled filter, cached until a different filter_string is given
+        Raises:
+            ValueError: If filter is not a proper JQ filter
+        """
+        if self._program is None or filter_string != self._filter_string:
+            try:
+                self._program = pyjq.compile(filter_string)
+            except ValueError as ex:
+                self._logger.error("Failed to compile, please check the transformation rule, exception %s", str(ex))
+                raise
+            self._filter_string = filter_string
+        return self._program
+
+    def apply(self, reading_block, filter_string):
+        """Same as transform, returning the first output only and compiling the filter once for all the calls
+        with the same filter_string
+
+        Args:
+            reading_block: Python objects (as loaded from JSON) on which filter needs to be applied.
+            filter_string: filter to apply. Filter should be in JQ format.
+        Returns: first output of the filter, as Python objects, None if the filter has no output
+        Raises:
+            TypeError: If reading_block can not be converted to JSON
+            ValueError: If filter is not a proper JQ filter
+        """
+        program = self.compile(filter_string)
+        try:
+            return program.first(reading_block)
+        except TypeError as ex:
+            self._logger.error("Invalid JSON passed, exception %s", str(ex))
+            raise
+        except ValueError as ex:
+            self._logger.error("Failed to transform, please check the transformation rule, exception %s", str(ex))
+            raise
@@ -6,9 +6,15 @@
 
 """ FogLAMP Logger """
 
+import atexit
+import copy
+import os
 import sys
+import queue
 import logging
-from logging.handlers import SysLogHandler
+import threading
+import time
+from logging.handlers import SysLogHandler, QueueHandler
 
 __author__ = "Praveen Garg"
 __copyright__ = "Copyright (c) 2017 OSIsoft, LLC"
@@ -24,6 +30,19 @@ r"""Send log entries to /var/log/syslog
 CONSOLE = 1
 """Send log entries to STDOUT"""
 
+ASYNC_ENV = 'FOGLAMP_ASYNC_LOGGING'
+"""Set this environment variable to 'true' to have a process log asynchronously, see :func:`enable_async`"""
+
+_FORMAT = 'FogLAMP[%(process)d] %(levelname)s: %(module)s: %(name)s: %(message)s'
+
+_DEFAULT_QUEUE_SIZE = 10000
+_DEFAULT_BATCH_SIZE = 100
+_DEFAULT_RATE_LIMIT = 1000
+"""Log entries per second below WARNING, others are dropped"""
+
+_async_writer = None  # type: _AsyncWriter
+"""Writer of the log entries queued when logging asynchronously, None when logging synchronously"""
+
 
 def setup(logger_name: str = None,
           destination: int = SYSLOG,
@@ -66,20 +85,283 @@ def setup(logger_name: str = None,
 
     logger = logging.getLogger(logger_name)
 
-    if destination == SYSLOG:
-        handler = SysLogHandler(address='/dev/log')
-    elif destination == CONSOLE:
-        handler = logging.StreamHandler(sys.stdout)
-    else:
+    if destination not in (SYSLOG, CONSOLE):
         raise ValueError("Invalid destination {}".format(destination))
 
-    # TODO: Consider using %r with message when using syslog .. \n looks better than #
-    formatter = logging.Formatter(fmt='FogLAMP[%(process)d] %(levelname)s: %(module)s: %(name)s: %(message)s')
+    if _async_writer is None and os.getenv(ASYNC_ENV, '').lower() in ('1', 'true'):
+        enable_async()
 
-    handler.setFormatter(formatter)
+    if _async_writer is not None:
+        handler = _async_writer.queue_handlers[destination]
+    else:
+        handler = _create_handler(destination)
 
     logger.setLevel(level)
     logger.propagate = propagate
     logger.addHandler(handler)
 
     return logger
+
+
+def _create_handler(destination):
+    if destination == SYSLOG:
+        handler = SysLogHandler(address='/dev/log')
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+
+    # TODO: Consider using %r with message when using syslog .. \n looks better than #
+    handler.setFormatter(logging.Formatter(fmt=_FORMAT))
+    handler.foglamp_destination = destination
+    return handler
+
+
+class _AsyncQueueHandler(QueueHandler):
+    """Queues log entries for the writer thread without blocking the caller"""
+
+    def __init__(self, writer, destination):
+        super().__init__(writer.queue)
+        self._writer = writer
+        self.foglamp_destination = destination
+
+    def emit(self, record):
+        if record.levelno < logging.WARNING and not self._writer.allow():
+            return
+        super().emit(record)
+
+    def prepare(self, record):
+        # Only the message is rendered here, in case its arguments change later,
+        # the writer formats the entry
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return self.foglamp_destination, record
+
+    def enqueue(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            with self._writer.lock:
+                self._writer.dropped += 1
+
+
+class _AsyncWriter(threading.Thread):
+    """Writes queued log entries in batches to syslog or stdout
+
+    Consecutive repeats of the same message are written once, followed by a count. Entries
+    dropped are reported in a WARNING, at most every _LOSS_REPORT_SECONDS and on stop.
+    """
+
+    _STOP = object()
+
+    _LOSS_REPORT_SECONDS = 60
+
+    def __init__(self, queue_size, batch_size, rate_limit):
+        super().__init__(name='FogLAMP logger', daemon=True)
+        self.queue = queue.Queue(queue_size)
+        self.batch_size = batch_size
+        self.rate_limit = rate_limit
+        self.handlers = {}
+        """destination -> handler writing the entries"""
+        self.queue_handlers = {SYSLOG: _AsyncQueueHandler(self, SYSLOG), CONSOLE: _AsyncQueueHandler(self, CONSOLE)}
+        self.lock = threading.Lock()
+        """Guards the counters updated by the logging threads: the rate limit window, dropped and rate_limited"""
+        self._window = None
+        self._window_count = 0
+        self._last = None
+        """(destination, key, record) of the last entry written"""
+        self._repeats = 0
+        self.written = 0
+        self.dropped = 0
+        self.rate_limited = 0
+        self.deduplicated = 0
+        self._loss_report_time = time.monotonic()
+        self._reported_dropped = 0
+        self._reported_rate_limited = 0
+
+    def allow(self):
+        """Whether an entry below WARNING can be queued in the current second"""
+        window = int(time.monotonic())
+        with self.lock:
+            if window != self._window:
+                self._window = window
+                self._window_count = 0
+            self._window_count += 1
+            if self._window_count > self.rate_limit:
+                self.rate_limited += 1
+                return False
+        return True
+
+    def run(self):
+        while True:
+            try:
+                batch = [self.queue.get(timeout=1)]
+            except queue.Empty:
+                self._write_repeats()
+                self._report_losses()
+                self._flush()
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            for item in batch:
+                if item is self._STOP:
+                    stop = True
+                else:
+                    self._write(*item)
+            if stop:
+                self._write_repeats()
+            self._report_losses(final=stop)
+            self._flush()
+            if stop:
+                return
+
+    def _handler(self, destination):
+        handler = self.handlers.get(destination)
+        if handler is None:
+            handler = self.handlers[destination] = _create_handler(destination)
+        return handler
+
+    def _write(self, destination, record):
+        key = (record.name, record.levelno, record.msg)
+        if self._last is not None and self._last[:2] == (destination, key):
+            self._repeats += 1
+            self.deduplicated += 1
+            return
+        self._write_repeats()
+        self._last = (destination, key, record)
+        self._emit(destination, record)
+
+    def _write_repeats(self):
+        if self._repeats:
+            destination, _, record = self._last
+            repeated = logging.makeLogRecord(record.__dict__)
+            repeated.msg = "Last message repeated {} times".format(self._repeats)
+            repeated.exc_info = repeated.exc_text = None
+            self._repeats = 0
+            self._emit(destination, repeated)
+        self._last = None
+
+    def _emit(self, destination, record):
+        handler = self._handler(destination)
+        if isinstance(handler, logging.StreamHandler):
+            # Written together, flushed once per batch
+            try:
+                handler.stream.write(handler.format(record) + handler.terminator)
+            except Exception:
+                handler.handleError(record)
+        else:
+            handler.emit(record)
+        self.written += 1
+
+    def _report_losses(self, final=False):
+        """Writes a WARNING to the destinations in use when entries were dropped since the last report"""
+        now = time.monotonic()
+        if not final and now - self._loss_report_time < self._LOSS_REPORT_SECONDS:
+            return
+        with self.lock:
+            dropped = self.dropped - self._reported_dropped
+            rate_limited = self.rate_limited - self._reported_rate_limited
+        if not dropped and not rate_limited:
+            return
+        self._loss_report_time = now
+        self._reported_dropped += dropped
+        self._reported_rate_limited += rate_limited
+
+        self._write_repeats()
+        record = logging.makeLogRecord({
+            'name': __name__, 'module': 'logger', 'levelno': logging.WARNING, 'levelname': 'WARNING',
+            'msg': 'Dropped {} log entries: {} on a full queue, {} over the rate limit of {} per second'.format(
+                dropped + rate_limited, dropped, rate_limited, self.rate_limit)})
+        for destination in list(self.handlers):
+            self._emit(destination, record)
+
+    def _flush(self):
+        for handler in self.handlers.values():
+            handler.flush()
+
+    def stop(self):
+        """Writes the queued entries and stops"""
+        self.queue.put(self._STOP)
+        self.join()
+        for handler in self.handlers.values():
+            handler.close()
+
+    def statistics(self):
+        return {
+            "queued": self.queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "rateLimited": self.rate_limited,
+            "deduplicated": self.deduplicated,
+        }
+
+
+def _all_loggers():
+    yield logging.getLogger()
+    for logger in list(logging.Logger.manager.loggerDict.values()):
+        if isinstance(logger, logging.Logger):
+            yield logger
+
+
+def _replace_handlers(replacement):
+    for logger in _all_loggers():
+        for handler in list(logger.handlers):
+            destination = getattr(handler, 'foglamp_destination', None)
+            if destination is None:
+                continue
+            logger.removeHandler(handler)
+            if not isinstance(handler, _AsyncQueueHandler):
+                handler.close()
+            logger.addHandler(replacement(destination))
+
+
+def enable_async(queue_size: int = _DEFAULT_QUEUE_SIZE,
+                 batch_size: int = _DEFAULT_BATCH_SIZE,
+                 rate_limit: int = _DEFAULT_RATE_LIMIT) -> None:
+    """Logs asynchronously in this process
+
+    Log calls queue the entry and return; a background thread writes the
+    entries in batches. Loggers configured by :func:`setup` before and after
+    the call are switched. Entries are dropped, counted and reported in a
+    WARNING, when the queue is full or when more than rate_limit entries below
+    WARNING are logged in a second. Queued entries are written when the
+    process exits.
+
+    Args:
+        queue_size: maximum number of entries waiting to be written
+        batch_size: maximum number of entries written together
+        rate_limit: maximum number of entries below WARNING per second
+    """
+    global _async_writer
+    if _async_writer is not None:
+        return
+    _async_writer = _AsyncWriter(queue_size, batch_size, rate_limit)
+    _async_writer.start()
+    _replace_handlers(lambda destination: _async_writer.queue_handlers[destination])
+
+
+def disable_async() -> None:
+    """Writes the queued entries and logs synchronously again"""
+    global _async_writer
+    if _async_writer is None:
+        return
+    writer = _async_writer
+    _async_writer = None
+    _replace_handlers(_create_handler)
+    writer.stop()
+
+
+def get_async_statistics():
+    """Counters of asynchronous logging, None when logging synchronously"""
+    return _async_writer.statistics() if _async_writer is not None else None
+
+
+def _stop_async():
+    if _async_writer is not None:
+        _async_writer.stop()
+
+
+atexit.register(_stop_async)
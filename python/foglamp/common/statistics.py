@@ -4,9 +4,8 @@
 # See: http://foglamp.readthedocs.io/
 # FOGLAMP_END
 
-import json
 from foglamp.common import logger
-from foglamp.common.storage_client.payload_builder import PayloadBuilder
+from foglamp.common.storage_client.payload_builder import PayloadBuilder, Param
 from foglamp.common.storage_client.storage_client import StorageClientAsync
 
 
@@ -18,6 +17,9 @@ __version__ = "${VERSION}"
 
 _logger = logger.setup(__name__)
 
+_UPDATE_PAYLOAD = PayloadBuilder().WHERE(["key", "=", Param("key")]).EXPR(["value", "+", Param("value")]).compile()
+""" Increments the value of a statistics key """
+
 
 async def create_statistics(storage=None):
     stat = Statistics(storage)
@@ -62,14 +64,9 @@ class Statistics(object):
             raise TypeError('stat_list must be a dict')
 
         try:
-            payload = {"updates": []}
-            for k, v in stat_list.items():
-                payload_item = PayloadBuilder() \
-                    .WHERE(["key", "=", k]) \
-                    .EXPR(["value", "+", v]) \
-                    .payload()
-                payload['updates'].append(json.loads(payload_item))
-            await self._storage.update_tbl("statistics", json.dumps(payload, sort_keys=False))
+            payload = b'{"updates": [' + \
+                      b', '.join([_UPDATE_PAYLOAD.render(key=k, value=v) for k, v in stat_list.items()]) + b']}'
+            await self._storage.update_tbl("statistics", payload)
         except Exception as ex:
             _logger.exception('Unable to bulk update statistics %s', str(ex))
             raise
@@ -91,10 +88,7 @@ class Statistics(object):
             raise ValueError('value must be an integer')
 
         try:
-            payload = PayloadBuilder()\
-                .WHERE(["key", "=", key])\
-                .EXPR(["value", "+", value_increment])\
-                .payload()
+            payload = _UPDATE_PAYLOAD.render(key=key, value=value_increment)
             await self._storage.update_tbl("statistics", payload)
         except Exception as ex:
             _logger.exception(
@@ -114,10 +108,7 @@ class Statistics(object):
         for key, value_increment in sensor_stat_dict.items():
             # Try updating the statistics value for given key
             try:
-                payload = PayloadBuilder() \
-                    .WHERE(["key", "=", key]) \
-                    .EXPR(["value", "+", value_increment]) \
-                    .payload()
+                payload = _UPDATE_PAYLOAD.render(key=key, value=value_increment)
                 result = await self._storage.update_tbl("statistics", payload)
                 if result["response"] != "updated":
                     raise KeyError
@@ -139,7 +130,7 @@ class Statistics(object):
         try:
             payload = PayloadBuilder().INSERT(key=key, description=description, value=0, previous_value=0).payload()
             await self._storage.insert_into_tbl("statistics", payload)
-            self._registered_keys.append(key)
+            self._registered_keys.add(key)
         except Exception as ex:
             """ The error may be because the key has been created in another process, reload keys """
             await self._load_keys()
@@ -148,11 +139,11 @@ class Statistics(object):
                 raise
 
     async def _load_keys(self):
-        self._registered_keys = []
+        self._registered_keys = set()
         try:
             payload = PayloadBuilder().SELECT("key").payload()
             results = await self._storage.query_tbl_with_payload('statistics', payload)
             for row in results['rows']:
-                self._registered_keys.append(row['key'])
+                self._registered_keys.add(row['key'])
         except Exception as ex:
             _logger.exception('Failed to retrieve statistics keys, %s', str(ex))
@@ -12,6 +12,7 @@ __copyright__ = "Copyright (c) 2017 OSIsoft, LLC"
 __license__ = "Apache 2.0"
 __version__ = "${VERSION}"
 
+import asyncio
 import aiohttp
 import http.client
 import json
@@ -25,6 +26,61 @@ from foglamp.common.storage_client.utils import Utils
 
 _LOGGER = logger.setup(__name__)
 
+_CONNECTION_LIMIT = 10
+""" Default maximum number of simultaneous connections a pooled client opens to the storage service """
+
+_CONNECTION_IDLE_TIMEOUT = 60
+""" Default number of seconds an idle keep-alive connection of a pooled client stays open """
+
+
+class _PooledSession(object):
+    """ Async context manager handing out a long-lived session, which is left open on exit """
+
+    def __init__(self, session):
+        self._session = session
+
+    async def __aenter__(self):
+        return self._session
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class ConnectionPool(object):
+    """ Long-lived aiohttp sessions to the storage service, one per event loop
+
+    Requests made through the same event loop reuse the keep-alive connections of its session
+    instead of opening a new TCP connection for every call.
+    """
+
+    def __init__(self, limit=_CONNECTION_LIMIT, keepalive=True, idle_timeout=_CONNECTION_IDLE_TIMEOUT):
+        """
+        :param limit: maximum number of simultaneous connections, 0 for no limit
+        :param keepalive: keep connections open between requests
+        :param idle_timeout: seconds after which an idle keep-alive connection is closed
+        """
+        self.limit = limit
+        self.keepalive = keepalive
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+
+    def session(self):
+        """ Returns the session of the current event loop, creating it when missing or closed """
+        loop = asyncio.get_event_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, force_close=not self.keepalive,
+                                             keepalive_timeout=self.idle_timeout if self.keepalive else None)
+            session = aiohttp.ClientSession(connector=connector)
+            self._sessions[loop] = session
+        return _PooledSession(session)
+
+    async def close(self):
+        """ Closes the session of the current event loop and its connections """
+        session = self._sessions.pop(asyncio.get_event_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+
 
 class AbstractStorage(ABC):
     """ abstract class for storage client """
@@ -49,8 +105,14 @@ class AbstractStorage(ABC):
 
 
 class StorageClientAsync(AbstractStorage):
+    _kept_services = {}
+    """ Storage service records kept by :meth:`keep_service`, keyed on core management (host, port) """
+
     def __init__(self, core_management_host, core_management_port, svc=None):
+        self._connection_pool = None
         try:
+            if svc is None:
+                svc = self._kept_services.get((core_management_host, core_management_port))
             if svc:
                 self.service = svc
             else:
@@ -120,13 +182,55 @@ class StorageClientAsync(AbstractStorage):
     def disconnect(self):
         pass
 
+    def keep_service(self, core_management_host, core_management_port):
+        """ Lets clients created later in this process for the same core reuse the storage service record
+        of this client instead of asking the core for it again
+
+        Meant for short lived processes started ahead of their work, such as warm task workers.
+        """
+        StorageClientAsync._kept_services[(core_management_host, core_management_port)] = self.service
+
+    @property
+    def connection_pool(self):
+        return self._connection_pool
+
+    def enable_connection_pool(self, limit=_CONNECTION_LIMIT, keepalive=True, idle_timeout=_CONNECTION_IDLE_TIMEOUT):
+        """ Switches the client to pooled mode, requests then share one long-lived session per event loop
+
+        Calling it again changes the settings used by sessions opened afterwards.
+
+        :param limit: maximum number of simultaneous connections to the storage service, 0 for no limit
+        :param keepalive: keep connections open between requests
+        :param idle_timeout: seconds after which an idle keep-alive connection is closed
+        """
+        if self._connection_pool is None:
+            self._connection_pool = ConnectionPool(limit, keepalive, idle_timeout)
+        else:
+            self._connection_pool.limit = limit
+            self._connection_pool.keepalive = keepalive
+            self._connection_pool.idle_timeout = idle_timeout
+
+    async def close(self):
+        """ Closes the pooled session of the current event loop, if any
+
+        The client stays usable; in pooled mode a new session is opened by the next request.
+        """
+        if self._connection_pool is not None:
+            await self._connection_pool.close()
+
+    def _client_session(self):
+        """ Session for a single request: a short-lived one or, in pooled mode, the shared one """
+        if self._connection_pool is None:
+            return aiohttp.ClientSession()
+        return self._connection_pool.session()
+
     # FIXME: As per JIRA-615 strict=false at python side (interim solution)
     # fix is required at storage layer (error message with escape sequence using a single quote)
     async def insert_into_tbl(self, tbl_name, data):
         """ insert json payload into given table
 
         :param tbl_name:
-        :param data: JSON payload
+        :param data: JSON payload, or the dict / list to send as one
         :return:
 
         :Example:
@@ -145,13 +249,14 @@ class StorageClientAsync(AbstractStorage):
         if not data:
             raise ValueError("Data to insert is missing")
 
-        if not Utils.is_json(data):
+        body = Utils.serialize(data)
+        if body is None:
             raise TypeError("Provided data to insert must be a valid JSON")
 
         post_url = '/storage/table/{tbl_name}'.format(tbl_name=tbl_name)
         url = 'http://' + self.base_url + post_url
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, data=data) as resp:
+        async with self._client_session() as session:
+            async with session.post(url, data=body) as resp:
                 status_code = resp.status
                 jdoc = await resp.json()
                 if status_code not in range(200, 209):
@@ -165,7 +270,7 @@ class StorageClientAsync(AbstractStorage):
         """ update json payload for specified condition into given table
 
         :param tbl_name:
-        :param data: JSON payload
+        :param data: JSON payload, or the dict / list to send as one
         :return:
 
         :Example:
@@ -188,14 +293,15 @@ class StorageClientAsync(AbstractStorage):
         if not data:
             raise ValueError("Data to update is missing")
 
-        if not Utils.is_json(data):
+        body = Utils.serialize(data)
+        if body is None:
             raise TypeError("Provided data to update must be a valid JSON")
 
         put_url = '/storage/table/{tbl_name}'.format(tbl_name=tbl_name)
 
         url = 'http://' + self.base_url + put_url
-        async with aiohttp.ClientSession() as session:
-            async with session.put(url, data=data) as resp:
+        async with self._client_session() as session:
+            async with session.put(url, data=body) as resp:
                 status_code = resp.status
                 jdoc = await resp.json()
                 if status_code not in range(200, 209):
@@ -227,12 +333,15 @@ class StorageClientAsync(AbstractStorage):
 
         del_url = '/storage/table/{tbl_name}'.format(tbl_name=tbl_name)
 
-        if condition and (not Utils.is_json(condition)):
-            raise TypeError("condition payload must be a valid JSON")
+        body = None
+        if condition:
+            body = Utils.serialize(condition)
+            if body is None:
+                raise TypeError("condition payload must be a valid JSON")
 
         url = 'http://' + self.base_url + del_url
-        async with aiohttp.ClientSession() as session:
-            async with session.delete(url, data=condition) as resp:
+        async with self._client_session() as session:
+            async with session.delete(url, data=body) as resp:
                 status_code = resp.status
                 jdoc = await resp.json()
                 if status_code not in range(200, 209):
@@ -262,7 +371,7 @@ class StorageClientAsync(AbstractStorage):
             get_url += '?{}'.format(query)
 
         url = 'http://' + self.base_url + get_url
-        async with aiohttp.ClientSession() as session:
+        async with self._client_session() as session:
             async with session.get(url) as resp:
                 status_code = resp.status
                 jdoc = await resp.json()
@@ -277,7 +386,7 @@ class StorageClientAsync(AbstractStorage):
         """ Complex SELECT query for the specified table with a payload
 
         :param tbl_name:
-        :param query_payload: payload in valid JSON format
+        :param query_payload: payload in valid JSON format, or the dict to send as one
         :return:
 
         :Example:
@@ -295,14 +404,15 @@ class StorageClientAsync(AbstractStorage):
         if not query_payload:
             raise ValueError("Query payload is missing")
 
-        if not Utils.is_json(query_payload):
+        body = Utils.serialize(query_payload)
+        if body is None:
             raise TypeError("Query payload must be a valid JSON")
 
         put_url = '/storage/table/{tbl_name}/query'.format(tbl_name=tbl_name)
 
         url = 'http://' + self.base_url + put_url
-        async with aiohttp.ClientSession() as session:
-            async with session.put(url, data=query_payload) as resp:
+        async with self._client_session() as session:
+            async with session.put(url, data=body) as resp:
                 status_code = resp.status
                 jdoc = await resp.json()
                 if status_code not in range(200, 209):
@@ -325,7 +435,7 @@ class StorageClientAsync(AbstractStorage):
         data = {"id": str(int(time.time()))}
 
         url = 'http://' + self.base_url + post_url
-        async with aiohttp.ClientSession() as session:
+        async with self._client_session() as session:
             async with session.post(url, data=json.dumps(data)) as resp:
                 status_code = resp.status
                 jdoc = await resp.text()
@@ -348,7 +458,7 @@ class StorageClientAsync(AbstractStorage):
         put_url = '/storage/table/{tbl_name}/snapshot/{id}'.format(tbl_name=tbl_name, id=snapshot_id)
 
         url = 'http://' + self.base_url + put_url
-        async with aiohttp.ClientSession() as session:
+        async with self._client_session() as session:
             async with session.put(url) as resp:
                 status_code = resp.status
                 jdoc = await resp.text()
@@ -371,7 +481,7 @@ class StorageClientAsync(AbstractStorage):
         delete_url = '/storage/table/{tbl_name}/snapshot/{id}'.format(tbl_name=tbl_name, id=snapshot_id)
 
         url = 'http://' + self.base_url + delete_url
-        async with aiohttp.ClientSession() as session:
+        async with self._client_session() as session:
             async with session.delete(url) as resp:
                 status_code = resp.status
                 jdoc = await resp.text()
@@ -393,7 +503,7 @@ class StorageClientAsync(AbstractStorage):
         get_url = '/storage/table/{tbl_name}/snapshot'.format(tbl_name=tbl_name)
 
         url = 'http://' + self.base_url + get_url
-        async with aiohttp.ClientSession() as session:
+        async with self._client_session() as session:
             async with session.get(url) as resp:
                 status_code = resp.status
                 jdoc = await resp.text()
@@ -414,7 +524,7 @@ class ReadingsStorageClientAsync(StorageClientAsync):
 
     async def append(self, readings):
         """
-        :param readings:
+        :param readings: JSON payload, or the {"readings": [...]} dict to send as one
         :return:
 
         :Example:
@@ -442,12 +552,13 @@ class ReadingsStorageClientAsync(StorageClientAsync):
         if not readings:
             raise ValueError("Readings payload is missing")
 
-        if not Utils.is_json(readings):
+        body = Utils.serialize(readings)
+        if body is None:
             raise TypeError("Readings payload must be a valid JSON")
 
         url = 'http://' + self._base_url + '/storage/reading'
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, data=readings) as resp:
+        async with self._client_session() as session:
+            async with session.post(url, data=body) as resp:
                 status_code = resp.status
                 jdoc = await resp.json()
                 if status_code not in range(200, 209):
@@ -481,7 +592,7 @@ class ReadingsStorageClientAsync(StorageClientAsync):
 
         get_url = '/storage/reading?id={}&count={}'.format(reading_id, count)
         url = 'http://' + self._base_url + get_url
-        async with aiohttp.ClientSession() as session:
+        async with self._client_session() as session:
             async with session.get(url) as resp:
                 status_code = resp.status
                 jdoc = await resp.json()
@@ -513,12 +624,13 @@ class ReadingsStorageClientAsync(StorageClientAsync):
         if not query_payload:
             raise ValueError("Query payload is missing")
 
-        if not Utils.is_json(query_payload):
+        body = Utils.serialize(query_payload)
+        if body is None:
             raise TypeError("Query payload must be a valid JSON")
 
         url = 'http://' + self._base_url + '/storage/reading/query'
-        async with aiohttp.ClientSession() as session:
-            async with session.put(url, data=query_payload) as resp:
+        async with self._client_session() as session:
+            async with session.put(url, data=body) as resp:
                 status_code = resp.status
                 jdoc = await resp.json()
                 if status_code not in range(200, 209):
@@ -576,7 +688,7 @@ class ReadingsStorageClientAsync(StorageClientAsync):
             put_url += "&flags={}".format(flag.lower())
 
         url = 'http://' + self._base_url + put_url
-        async with aiohttp.ClientSession() as session:
+        async with self._client_session() as session:
             async with session.put(url, data=None) as resp:
                 status_code = resp.status
                 jdoc = await resp.json()
@@ -20,6 +20,9 @@ import json
 
 class Utils(object):
 
+    validate_payload = False
+    """ Parse already serialized payloads to check they are valid JSON before sending them, for debugging only """
+
     @staticmethod
     def is_json(payload):
         try:
@@ -27,3 +30,22 @@ class Utils(object):
         except (TypeError, ValueError):  # JSONDecodeError is a subclass of ValueError
             return False
         return True
+
+    @classmethod
+    def serialize(cls, payload):
+        """ Request body for a storage payload, serialized once
+
+        dict / list payloads are dumped to JSON here; str and bytes payloads are trusted as already valid JSON
+        and sent as they are, unless validate_payload is set.
+
+        :param payload: Python object or JSON document
+        :return: the JSON request body, None if the payload can not be used as one
+        """
+        if isinstance(payload, (str, bytes, bytearray)):
+            if cls.validate_payload and not cls.is_json(payload):
+                return None
+            return payload
+        try:
+            return json.dumps(payload)
+        except (TypeError, ValueError):
+            return None
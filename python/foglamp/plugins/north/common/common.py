@@ -9,6 +9,8 @@
 """
 
 import asyncio
+import collections
+import math
 
 from foglamp.common.configuration_manager import ConfigurationManager
 
@@ -68,6 +70,52 @@ def convert_to_type(value):
     return value_converted
 
 
+_INTEGER_EXACT = 2 ** 53
+""" Integers up to this absolute value are represented exactly as float, convert_to_type keeps them as they are """
+
+
+def convert_reading_to_type(asset_code, reading, schemas):
+    """Converts in place the values of a reading to their types, as convert_to_type does for a single value
+
+    The datapoints having an int or float value are already of their type and they are checked all together,
+    only the other ones are evaluated value by value. What to check is worked out from the schema of the reading,
+    its datapoints and the types of their values, and it is cached per asset code to be reused while the schema
+    of the asset does not change.
+
+     Args:
+        asset_code : asset code of the reading
+        reading : reading to convert, a dictionary datapoint - value
+        schemas : cache of the schema of each asset code, kept by the caller across the blocks
+     Returns:
+     Raises:
+     """
+
+    keys = tuple(reading)
+    types = tuple(map(type, reading.values()))
+
+    schema = schemas.get(asset_code)
+    if schema is None or schema[0] != keys or schema[1] != types:
+        ints = [key for key, value_type in zip(keys, types) if value_type is int]
+        floats = [key for key, value_type in zip(keys, types) if value_type is float]
+        others = [key for key, value_type in zip(keys, types) if value_type is not int and value_type is not float]
+        schema = (keys, types, ints, floats, others)
+        schemas[asset_code] = schema
+
+    _, _, ints, floats, others = schema
+    to_convert = others
+
+    # Integers too large to be represented exactly as float and not finite floats are evaluated value by value
+    if ints:
+        values = list(map(reading.__getitem__, ints))
+        if min(values) < -_INTEGER_EXACT or max(values) > _INTEGER_EXACT:
+            to_convert = to_convert + ints
+    if floats and not math.isfinite(sum(map(reading.__getitem__, floats))):
+        to_convert = to_convert + floats
+
+    for key in to_convert:
+        reading[key] = convert_to_type(reading[key])
+
+
 def evaluate_type(value):
     """Evaluates the type in relation to its value
 
@@ -109,34 +157,54 @@ def evaluate_type(value):
     return evaluated_type
 
 
-def identify_unique_asset_codes(raw_data):
-    """Identify unique asset codes in the data block
+def index_asset_codes(raw_data):
+    """Indexes the asset codes of the data block in a single pass
 
     Args:
         raw_data : data block retrieved from the Storage layer that should be evaluated
     Returns:
-        unique_asset_codes : list of unique codes
-
+        index : OrderedDict asset code - information about the asset code in the block, in the order the asset codes
+                are found, the information is a dictionary having :
+                    asset_code, asset_data : asset code and the reading of its first row, as a sample of its values
+                    count : number of rows of the asset code
+                    first, last : position in the block of the first and of the last row of the asset code
     Raises:
     """
 
-    unique_asset_codes = []
+    index = collections.OrderedDict()
 
-    for row in raw_data:
+    for position, row in enumerate(raw_data):
         asset_code = row['asset_code']
-        asset_data = row['reading']
+        item = index.get(asset_code)
+
+        if item is None:
+            index[asset_code] = {
+                "asset_code": asset_code,
+                "asset_data": row['reading'],
+                "count": 1,
+                "first": position,
+                "last": position
+            }
+        else:
+            item["count"] += 1
+            item["last"] = position
 
-        # Evaluates if the asset_code is already in the list
-        if not any(item["asset_code"] == asset_code for item in unique_asset_codes):
+    return index
+
+
+def identify_unique_asset_codes(raw_data):
+    """Identify unique asset codes in the data block
 
-            unique_asset_codes.append(
-                {
-                    "asset_code": asset_code,
-                    "asset_data": asset_data
-                }
-            )
+    Args:
+        raw_data : data block retrieved from the Storage layer that should be evaluated
+    Returns:
+        unique_asset_codes : list of unique codes
+
+    Raises:
+    """
 
-    return unique_asset_codes
+    return [{"asset_code": item["asset_code"], "asset_data": item["asset_data"]}
+            for item in index_asset_codes(raw_data).values()]
 
 
 def retrieve_configuration(_storage, _category_name, _default, _category_description):
@@ -11,6 +11,7 @@
 """
 
 from datetime import datetime
+import asyncio
 import sys
 import copy
 import ast
@@ -74,6 +75,12 @@ _config = {}
 # Forces the recreation of PIServer objects when the first error occurs
 _recreate_omf_objects = True
 
+# OCSNorthPlugin instance kept for the plugin lifetime, it holds the HTTP session and the OMF types created
+_ocs_north = None
+
+# Close of the HTTP session of the instance dropped by plugin_init, awaited by plugin_send and plugin_shutdown
+_ocs_north_closing = None
+
 # Messages used for Information, Warning and Error notice
 _MESSAGES_LIST = {
     # Information messages
@@ -129,6 +136,12 @@ _CONFIG_DEFAULT_OMF = {
         "default": "false",
         "displayName": "Compression"
     },
+    "compressionLevel": {
+        "description": "gzip compression level of the message body, from 1 (fastest) to 9 (smallest)",
+        "type": "integer",
+        "default": "6",
+        "displayName": "Compression Level"
+    },
     "StaticData": {
         "description": "Static data to include in each sensor reading sent to OMF.",
         "type": "JSON",
@@ -357,6 +370,7 @@ def plugin_init(data):
     global _logger
     global _recreate_omf_objects
     global _log_debug_level, _log_performance, _stream_id
+    global _ocs_north, _ocs_north_closing
 
     _log_debug_level = data['debug_level']
     _log_performance = data['log_performance']
@@ -407,6 +421,7 @@ def plugin_init(data):
     _config['notBlockingErrors'] = ast.literal_eval(data['notBlockingErrors']['value'])
 
     _config['compression'] = data['compression']['value']
+    _config['compressionLevel'] = int(data['compressionLevel']['value'])
 
     # TODO: compare instance fetching via inspect vs as param passing
     # import inspect
@@ -437,6 +452,10 @@ def plugin_init(data):
 
     try:
         _recreate_omf_objects = True
+        if _ocs_north is not None:
+            # plugin_init is not a coroutine, the HTTP session of the instance dropped is closed in the background
+            _ocs_north_closing = asyncio.ensure_future(_ocs_north.close())
+        _ocs_north = None
 
     except Exception as ex:
         _logger.error(plugin_common.MESSAGES_LIST["e000011"].format(ex))
@@ -460,6 +479,7 @@ async def plugin_send(data, raw_data, stream_id):
     """
     
     global _recreate_omf_objects
+    global _ocs_north
 
     is_data_sent = False
     config_category_name = data['_CONFIG_CATEGORY_NAME']
@@ -470,12 +490,15 @@ async def plugin_send(data, raw_data, stream_id):
     pi_server._log_debug_level = _log_debug_level
     pi_server._log_performance = _log_performance
 
-    ocs_north = OCSNorthPlugin(data['sending_process_instance'], data, _config_omf_types, _logger)
+    await _wait_closing()
+
+    # The instance is reused across the blocks, to keep its HTTP session and the OMF types created
+    if _ocs_north is None:
+        _ocs_north = OCSNorthPlugin(data['sending_process_instance'], data, _config_omf_types, _logger)
+    ocs_north = _ocs_north
 
     try:
-        # Alloc the in memory buffer
-        buffer_size = len(raw_data)
-        data_to_send = [None for x in range(buffer_size)]
+        data_to_send = []
 
         is_data_available, new_position, num_sent = ocs_north.transform_in_memory_data(data_to_send, raw_data)
 
@@ -504,19 +527,33 @@ async def plugin_send(data, raw_data, stream_id):
 
 
 # noinspection PyUnusedLocal
-def plugin_shutdown(data):
-    """ Terminates the plugin
+async def plugin_shutdown(data):
+    """ Terminates the plugin, closing its HTTP session to OCS
     Returns:
     Raises:
     """
+    global _ocs_north
+
     try:
         _logger.debug("{0} - plugin_shutdown".format(_MODULE_NAME))
-
+        await _wait_closing()
+        if _ocs_north is not None:
+            instance, _ocs_north = _ocs_north, None
+            await instance.close()
     except Exception as ex:
         _logger.error(plugin_common.MESSAGES_LIST["e000013"].format(ex))
         raise
 
 
+async def _wait_closing():
+    """ Waits for the close of the HTTP session of the instance dropped by plugin_init """
+    global _ocs_north_closing
+
+    if _ocs_north_closing is not None:
+        closing, _ocs_north_closing = _ocs_north_closing, None
+        await closing
+
+
 def plugin_reconfigure():
     """ Reconfigures the plugin, it should be called when the configuration of the plugin is changed during the
         operation of the South service.
@@ -11,6 +11,7 @@ PICROMF = PI Connector Relay OMF"""
 
 import aiohttp
 import asyncio
+import collections
 import gzip
 import sys
 import copy
@@ -73,6 +74,12 @@ _config = {}
 # Forces the recreation of PIServer objects when the first error occurs
 _recreate_omf_objects = True
 
+# PIServerNorthPlugin instance kept for the plugin lifetime, it holds the HTTP session and the OMF types created
+_omf_north = None
+
+# Close of the HTTP session of the instance dropped by plugin_init, awaited by plugin_send and plugin_shutdown
+_omf_north_closing = None
+
 # Messages used for Information, Warning and Error notice
 _MESSAGES_LIST = {
     # Information messages
@@ -117,6 +124,12 @@ _CONFIG_DEFAULT_OMF = {
         "default": "true",
         "displayName": "Compression"
     },
+    "compressionLevel": {
+        "description": "gzip compression level of the message body, from 1 (fastest) to 9 (smallest)",
+        "type": "integer",
+        "default": "6",
+        "displayName": "Compression Level"
+    },
     "StaticData": {
         "description": "Static data to include in each sensor reading sent via OMF",
         "type": "JSON",
@@ -209,6 +222,9 @@ CONFIG_DEFAULT_OMF_TYPES = {
 _OMF_PREFIX_MEASUREMENT = "measurement_"
 _OMF_SUFFIX_TYPENAME = "_typename"
 
+# Messages larger than this, in bytes, are compressed in the default executor instead of on the event loop
+_COMPRESSION_OFF_LOOP_SIZE = 65536
+
 OMF_TEMPLATE_TYPE = {
     "typename": [
         {
@@ -371,6 +387,7 @@ def plugin_init(data):
     global _logger
     global _recreate_omf_objects
     global _log_debug_level, _log_performance, _stream_id
+    global _omf_north, _omf_north_closing
 
     _log_debug_level = data['debug_level']
     _log_performance = data['log_performance']
@@ -406,6 +423,7 @@ def plugin_init(data):
     _config['formatInteger'] = data['formatInteger']['value']
 
     _config['compression'] = data['compression']['value']
+    _config['compressionLevel'] = int(data['compressionLevel']['value'])
 
     # TODO: compare instance fetching via inspect vs as param passing
     # import inspect
@@ -431,6 +449,10 @@ def plugin_init(data):
     _logger.debug("{0} - URL {1}".format("plugin_init", _config['URL']))
     try:
         _recreate_omf_objects = True
+        if _omf_north is not None:
+            # plugin_init is not a coroutine, the HTTP session of the instance dropped is closed in the background
+            _omf_north_closing = asyncio.ensure_future(_omf_north.close())
+        _omf_north = None
     except Exception as ex:
         _logger.error(plugin_common.MESSAGES_LIST["e000011"].format(ex))
         raise plugin_exceptions.PluginInitializeFailed(ex)
@@ -452,16 +474,20 @@ async def plugin_send(data, raw_data, stream_id):
     """
 
     global _recreate_omf_objects
+    global _omf_north
 
     is_data_sent = False
     config_category_name = data['_CONFIG_CATEGORY_NAME']
     type_id = _config_omf_types['type-id']['value']
 
-    omf_north = PIServerNorthPlugin(data['sending_process_instance'], data, _config_omf_types, _logger)
+    await _wait_closing()
+
+    # The instance is reused across the blocks, to keep its HTTP session and the OMF types created
+    if _omf_north is None:
+        _omf_north = PIServerNorthPlugin(data['sending_process_instance'], data, _config_omf_types, _logger)
+    omf_north = _omf_north
 
-    # Alloc the in memory buffer
-    buffer_size = len(raw_data)
-    data_to_send = [None for _ in range(buffer_size)]
+    data_to_send = []
 
     is_data_available, new_position, num_sent = omf_north.transform_in_memory_data(data_to_send, raw_data)
 
@@ -485,18 +511,33 @@ async def plugin_send(data, raw_data, stream_id):
     return is_data_sent, new_position, num_sent
 
 
-def plugin_shutdown(data):
-    """ Terminates the plugin
+async def plugin_shutdown(data):
+    """ Terminates the plugin, closing its HTTP session to PICROMF
     Returns:
     Raises:
     """
+    global _omf_north
+
     try:
         _logger.debug("{0} - plugin_shutdown".format(_MODULE_NAME))
+        await _wait_closing()
+        if _omf_north is not None:
+            instance, _omf_north = _omf_north, None
+            await instance.close()
     except Exception as ex:
         _logger.error(plugin_common.MESSAGES_LIST["e000013"].format(ex))
         raise
 
 
+async def _wait_closing():
+    """ Waits for the close of the HTTP session of the instance dropped by plugin_init """
+    global _omf_north_closing
+
+    if _omf_north_closing is not None:
+        closing, _omf_north_closing = _omf_north_closing, None
+        await closing
+
+
 def plugin_reconfigure():
     """ plugin_reconfigure """
 
@@ -514,6 +555,25 @@ class PIServerNorthPlugin(object):
         self._config_omf_types = config_omf_types
         self._logger = _logger
 
+        self._session = None
+        """ aiohttp.ClientSession reused for all the requests to PICROMF, keeps the connection alive """
+        self._omf_types_created = None
+        """ Asset codes having the OMF objects already created, loaded from the Storage layer on the first block """
+        self._omf_types_lock = asyncio.Lock()
+        """ Serializes the creation of the OMF objects between blocks sent concurrently """
+
+    def _get_session(self):
+        """ Returns the HTTP session to PICROMF, opening it on the first request """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(verify_ssl=False))
+        return self._session
+
+    async def close(self):
+        """ Closes the HTTP session to PICROMF """
+        if self._session is not None:
+            session, self._session = self._session, None
+            await session.close()
+
     async def deleted_omf_types_already_created(self, config_category_name, type_id):
         """ Deletes OMF types/objects tracked as already created, it is used to force the recreation of the types
          Args:
@@ -529,6 +589,9 @@ class PIServerNorthPlugin(object):
 
         await self._sending_process_instance._storage_async.delete_from_tbl("omf_created_objects", payload)
 
+        # Loads them again from the Storage layer on the next block
+        self._omf_types_created = None
+
     async def _retrieve_omf_types_already_created(self, configuration_key, type_id):
         """ Retrieves the list of OMF types already defined/sent to the PICROMF
          Args:
@@ -786,13 +849,33 @@ class PIServerNorthPlugin(object):
         Raises:
         """
         asset_codes_to_evaluate = plugin_common.identify_unique_asset_codes(raw_data)
-        asset_codes_already_created = await self._retrieve_omf_types_already_created(config_category_name, type_id)
+
+        # Nothing to create, the OMF objects of all the asset codes are known
+        if self._omf_types_created is not None and \
+                all(item["asset_code"] in self._omf_types_created for item in asset_codes_to_evaluate):
+            return
+
+        async with self._omf_types_lock:
+            await self._create_omf_objects_new(asset_codes_to_evaluate, config_category_name, type_id)
+
+    async def _create_omf_objects_new(self, asset_codes_to_evaluate, config_category_name, type_id):
+        """ Creates the OMF objects of the asset codes not already created, see create_omf_objects
+        Args:
+            asset_codes_to_evaluate: asset codes of the block, with a sample value of the asset
+            config_category_name:    used to identify OMF objects already created
+            type_id:                 used to identify OMF objects already created
+        Returns:
+        Raises:
+        """
+        if self._omf_types_created is None:
+            self._omf_types_created = set(
+                await self._retrieve_omf_types_already_created(config_category_name, type_id))
 
         for item in asset_codes_to_evaluate:
             asset_code = item["asset_code"]
 
             # Evaluates if it is a new OMF type
-            if not any(tmp_item == asset_code for tmp_item in asset_codes_already_created):
+            if asset_code not in self._omf_types_created:
 
                 asset_code_omf_type = ""
                 try:
@@ -812,6 +895,7 @@ class PIServerNorthPlugin(object):
                     await self._create_omf_objects_automatic(item)
 
                 await self._flag_created_omf_type(config_category_name, type_id, asset_code)
+                self._omf_types_created.add(asset_code)
             else:
                 self._logger.debug("asset already created - asset |{0}| ".format(asset_code))
 
@@ -836,6 +920,8 @@ class PIServerNorthPlugin(object):
                       'messageformat': 'JSON',
                       'omfversion': '1.0'}
         omf_data_json = json.dumps(omf_data)
+        use_compression = True if self._config['compression'].upper() == 'TRUE' else False
+        msg_body = None
 
         self._logger.debug("OMF message length |{0}| ".format(len(omf_data_json)))
 
@@ -845,26 +931,26 @@ class PIServerNorthPlugin(object):
         while num_retry <= self._config['OMFMaxRetry']:
             _error = False
             try:
-                use_compression = True if self._config['compression'].upper() == 'TRUE' else False
-                if use_compression:
-                    msg_body = gzip.compress(bytes(omf_data_json, 'utf-8'))
-                    msg_header.update({'compression': 'gzip'})
-                    # https://docs.aiohttp.org/en/stable/client_advanced.html#uploading-pre-compressed-data
-                    msg_header.update({'Content-Encoding': 'gzip'})
-                else:
-                    msg_body = omf_data_json
+                # The message body is prepared once and reused by the retries
+                if msg_body is None:
+                    if use_compression:
+                        msg_body = await self._compress_message(bytes(omf_data_json, 'utf-8'))
+                        msg_header.update({'compression': 'gzip'})
+                        # https://docs.aiohttp.org/en/stable/client_advanced.html#uploading-pre-compressed-data
+                        msg_header.update({'Content-Encoding': 'gzip'})
+                    else:
+                        msg_body = omf_data_json
 
                 self._logger.info("SEND requested with compression: %s started at: %s", str(use_compression), datetime.datetime.now().isoformat())
-                async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(verify_ssl=False)) as session:
-                    async with session.post(
-                                            url=self._config['URL'],
-                                            headers=msg_header,
-                                            data=msg_body,
-                                            timeout=self._config['OMFHttpTimeout']
-                                            ) as resp:
-
-                        status_code = resp.status
-                        text = await resp.text()
+                async with self._get_session().post(
+                                                    url=self._config['URL'],
+                                                    headers=msg_header,
+                                                    data=msg_body,
+                                                    timeout=self._config['OMFHttpTimeout']
+                                                    ) as resp:
+
+                    status_code = resp.status
+                    text = await resp.text()
             except (TimeoutError, asyncio.TimeoutError) as ex:
                 _message = plugin_common.MESSAGES_LIST["e000024"].format(self._config['URL'], "connection Timeout")
                 _error = plugin_exceptions.URLConnectionError(_message)
@@ -905,11 +991,26 @@ class PIServerNorthPlugin(object):
         if _error:
             raise _error
 
+    async def _compress_message(self, message):
+        """ Compresses an OMF message using gzip, the large ones are compressed in the default executor
+            to avoid blocking the event loop
+        Args:
+            message: OMF message to compress, as bytes
+        Returns:
+            the compressed message
+        Raises:
+        """
+        level = self._config['compressionLevel']
+        if len(message) < _COMPRESSION_OFF_LOOP_SIZE:
+            return gzip.compress(message, level)
+        return await asyncio.get_event_loop().run_in_executor(None, gzip.compress, message, level)
+
     @_performance_log
     def transform_in_memory_data(self, data_to_send, raw_data):
-        """ Transforms the in memory data into a new structure that could be converted into JSON for the PICROMF
+        """ Transforms the in memory data into a new structure that could be converted into JSON for the PICROMF,
+            the readings are grouped in a single OMF Data object for each container
         Args:
-            data_to_send - Transformed/generated data
+            data_to_send - Transformed/generated data, filled with the OMF Data objects in place
             raw_data - Input data
         Returns:
             data_available - True, there are new data
@@ -924,14 +1025,20 @@ class PIServerNorthPlugin(object):
         # statistics
         _num_sent = 0
 
-        idx = 0
+        # containerid -> values of the readings of the container, in the order they were read
+        containers = collections.OrderedDict()
+        measurement_ids = {}
 
         try:
 
             for row in raw_data:
 
                 # Identification of the object/sensor
-                measurement_id = self._generate_omf_measurement(row['asset_code'])
+                asset_code = row['asset_code']
+                measurement_id = measurement_ids.get(asset_code)
+                if measurement_id is None:
+                    measurement_id = self._generate_omf_measurement(asset_code)
+                    measurement_ids[asset_code] = measurement_id
 
                 try:
                     # The expression **row['reading'] - joins the 2 dictionaries
@@ -940,23 +1047,21 @@ class PIServerNorthPlugin(object):
                     # without using python date library for performance reason and
                     # because it is expected to receive the date in a precise/fixed format :
                     #   2018-05-28 16:56:55.000000+00
-                    data_to_send[idx] = {
-                            "containerid": measurement_id,
-                            "values": [
-                                {
-                                    "Time": row['user_ts'][0:10] + "T" + row['user_ts'][11:23] + "Z",
-                                    **row['reading']
-                                }
-                            ]
-                        }
+                    value = {
+                                "Time": row['user_ts'][0:10] + "T" + row['user_ts'][11:23] + "Z",
+                                **row['reading']
+                            }
+
+                    values = containers.get(measurement_id)
+                    if values is None:
+                        values = containers[measurement_id] = []
+                    values.append(value)
 
                     if _log_debug_level == 3:
                         self._logger.debug("stream ID : |{0}| sensor ID : |{1}| row ID : |{2}|  "
                                            .format(measurement_id, row['asset_code'], str(row['id'])))
 
-                        self._logger.debug("in memory info |{0}| ".format(data_to_send[idx]))
-
-                    idx += 1
+                        self._logger.debug("in memory info |{0}| ".format(value))
 
                     # Used for the statistics update
                     _num_sent += 1
@@ -969,8 +1074,11 @@ class PIServerNorthPlugin(object):
                 except Exception as e:
                     self._logger.warning(plugin_common.MESSAGES_LIST["e000023"].format(e))
 
+            data_to_send[:] = [{"containerid": containerid, "values": values}
+                               for containerid, values in containers.items()]
+
         except Exception:
             self._logger.error(plugin_common.MESSAGES_LIST["e000021"])
             raise
 
-        return data_available, _new_position, _num_sent
\ No newline at end of file
+        return data_available, _new_position, _num_sent
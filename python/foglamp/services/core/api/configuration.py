@@ -33,6 +33,7 @@ _help = """
     | GET POST       | /foglamp/category/{category_name}/children                  |
     | DELETE         | /foglamp/category/{category_name}/children/{child_category} |
     | DELETE         | /foglamp/category/{category_name}/parent                    |
+    | GET            | /foglamp/configuration/cache                                |
     --------------------------------------------------------------------------------
 """
 
@@ -627,6 +628,21 @@ async def upload_script(request):
         return web.json_response(result)
 
 
+async def get_cache_statistics(request):
+    """
+    Args:
+         request:
+
+    Returns:
+            the size, capacity and hit, miss, eviction and expiry counters of the configuration cache
+
+    :Example:
+            curl -sX GET http://localhost:8081/foglamp/configuration/cache
+    """
+    cf_mgr = ConfigurationManager(connect.get_storage_async())
+    return web.json_response(cf_mgr._cacheManager.statistics)
+
+
 def hide_password(config: dict) -> Dict:
     new_config = copy.deepcopy(config)
     try:
@@ -13,6 +13,7 @@ from foglamp.services.core.scheduler.entities import Schedule, StartUpSchedule,
 from foglamp.services.core.scheduler.exceptions import *
 from foglamp.services.core import connect
 from foglamp.common.storage_client.payload_builder import PayloadBuilder
+from foglamp.services.core.api import south
 
 __author__ = "Amarendra K. Sinha"
 __copyright__ = "Copyright (c) 2017 OSIsoft, LLC"
@@ -389,6 +390,7 @@ async def enable_schedule_with_name(request):
     except (KeyError, ValueError, ScheduleNotFoundError) as e:
         raise web.HTTPNotFound(reason=str(e))
     else:
+        south._invalidate_response_cache()
         return web.json_response(schedule)
 
 
@@ -434,6 +436,7 @@ async def disable_schedule_with_name(request):
     except (KeyError, ValueError, ScheduleNotFoundError) as e:
         raise web.HTTPNotFound(reason=str(e))
     else:
+        south._invalidate_response_cache()
         return web.json_response(schedule)
 
 
@@ -461,6 +464,7 @@ async def enable_schedule(request):
             'message': reason
         }
 
+        south._invalidate_response_cache()
         return web.json_response(schedule)
     except (ValueError, ScheduleNotFoundError) as ex:
         raise web.HTTPNotFound(reason=str(ex))
@@ -490,6 +494,7 @@ async def disable_schedule(request):
             'message': reason
         }
 
+        south._invalidate_response_cache()
         return web.json_response(schedule)
     except (ValueError, ScheduleNotFoundError) as ex:
         raise web.HTTPNotFound(reason=str(ex))
@@ -619,6 +624,7 @@ async def update_schedule(request):
             'enabled': sch.enabled
         }
 
+        south._invalidate_response_cache()
         return web.json_response({'schedule': schedule})
     except (ScheduleNotFoundError, ScheduleProcessNameNotFoundError) as ex:
         raise web.HTTPNotFound(reason=str(ex))
@@ -20,6 +20,7 @@ from foglamp.common.configuration_manager import ConfigurationManager
 from foglamp.services.core import server
 from foglamp.services.core import connect
 from foglamp.services.core.api import utils as apiutils
+from foglamp.services.core.api import south
 from foglamp.services.core.scheduler.entities import StartUpSchedule
 from foglamp.services.core.service_registry.service_registry import ServiceRegistry
 from foglamp.services.core.service_registry import exceptions as service_registry_exceptions
@@ -126,6 +127,7 @@ async def delete_service(request):
     except Exception as ex:
         raise web.HTTPInternalServerError(reason=ex)
     else:
+        south._invalidate_response_cache()
         return web.json_response({'result': 'Service {} deleted successfully.'.format(svc)})
 
 
@@ -324,6 +326,7 @@ async def add_service(request):
     except KeyError as ex:
         raise web.HTTPNotFound(reason=str(ex))
     else:
+        south._invalidate_response_cache()
         return web.json_response({'name': name, 'id': str(schedule.schedule_id)})
 
 
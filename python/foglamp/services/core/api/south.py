@@ -4,6 +4,7 @@
 # See: http://foglamp.readthedocs.io/
 # FOGLAMP_END
 
+import time
 from functools import lru_cache
 
 from aiohttp import web
@@ -29,10 +30,21 @@ _help = """
 """
 
 
-async def _get_schedule_status(storage_client, svc_name):
-    payload = PayloadBuilder().SELECT("enabled").WHERE(['schedule_name', '=', svc_name]).payload()
+_RESPONSE_CACHE_TTL_SECONDS = 2
+""" Seconds a GET /foglamp/south response is served again, 0 disables the cache; ?cached=false bypasses it """
+
+_response_cache = {'expires': 0, 'services': None}
+
+
+def _invalidate_response_cache():
+    """ Drops the cached GET /foglamp/south response, called once a service or schedule has changed """
+    _response_cache['services'] = None
+
+
+async def _get_schedules_status(storage_client):
+    payload = PayloadBuilder().SELECT(["schedule_name", "enabled"]).payload()
     result = await storage_client.query_tbl_with_payload('schedules', payload)
-    return True if result['rows'][0]['enabled'] == 't' else False
+    return {r['schedule_name']: r['enabled'] == 't' for r in result['rows']}
 
 
 @lru_cache(maxsize=1024)
@@ -40,92 +52,79 @@ def _get_installed_plugins():
     return PluginDiscovery.get_plugins_installed("south", False)
 
 
-async def _services_with_assets(storage_client, south_services):
-    sr_list = list()
-    try:
-        try:
-            services_from_registry = ServiceRegistry.get(s_type="Southbound")
-        except DoesNotExist:
-            services_from_registry = []
+async def _get_tracked_plugins_and_assets(storage_client):
+    """ Returns the plugin and the list of assets ingested, in tracking order, by service name """
+    payload = PayloadBuilder().SELECT(["asset", "plugin", "service"]).WHERE(['event', '=', 'Ingest']).payload()
+    result = await storage_client.query_tbl_with_payload('asset_tracker', payload)
 
-        def is_svc_in_service_registry(name):
-            return next((svc for svc in services_from_registry if svc._name == name), None)
+    tracked = {}
+    for r in result['rows']:
+        plugin, assets = tracked.setdefault(r['service'], (r['plugin'], []))
+        assets.append(r['asset'])
+    return tracked
 
-        installed_plugins = _get_installed_plugins()
 
-        for s_record in services_from_registry:
-            plugin, assets = await _get_tracked_plugin_assets_and_readings(storage_client, s_record._name)
+async def _get_readings_count(storage_client, assets):
+    """ Returns the statistics value of the given assets, by statistics key """
+    keys = list({asset.upper() for asset in assets})
+    if not keys:
+        return {}
+    payload = PayloadBuilder().SELECT(["key", "value"]).WHERE(["key", "in", keys]).payload()
+    result = await storage_client.query_tbl_with_payload("statistics", payload)
+    return {r['key']: r['value'] for r in result['rows']}
 
-            plugin_version = ''
-            for p in installed_plugins:
-                if p["name"] == plugin:
-                    plugin_version = p["version"]
-                    break
 
+async def _services_with_assets(storage_client, south_services):
+    try:
+        services_from_registry = ServiceRegistry.get(s_type="Southbound")
+    except DoesNotExist:
+        services_from_registry = []
+
+    plugin_versions = {p["name"]: p["version"] for p in _get_installed_plugins()}
+    tracked = await _get_tracked_plugins_and_assets(storage_client)
+    readings_count = await _get_readings_count(
+        storage_client, [asset for _, assets in tracked.values() for asset in assets])
+    schedules_status = await _get_schedules_status(storage_client)
+
+    def plugin_and_assets(svc_name):
+        plugin, assets = tracked.get(svc_name, ('', []))
+        asset_json = [{"count": readings_count[asset.upper()], "asset": asset}
+                      for asset in assets if asset.upper() in readings_count]
+        return {'name': plugin, 'version': plugin_versions.get(plugin, '')}, asset_json
+
+    sr_list = list()
+    for s_record in services_from_registry:
+        plugin, assets = plugin_and_assets(s_record._name)
+        sr_list.append(
+            {
+                'name': s_record._name,
+                'address': s_record._address,
+                'management_port': s_record._management_port,
+                'service_port': s_record._port,
+                'protocol': s_record._protocol,
+                'status': ServiceRecord.Status(int(s_record._status)).name.lower(),
+                'assets': assets,
+                'plugin': plugin,
+                'schedule_enabled': schedules_status[s_record._name]
+            })
+
+    registered_names = {svc._name for svc in services_from_registry}
+    for s_name in south_services:
+        if s_name not in registered_names:
+            plugin, assets = plugin_and_assets(s_name)
             sr_list.append(
                 {
-                    'name': s_record._name,
-                    'address': s_record._address,
-                    'management_port': s_record._management_port,
-                    'service_port': s_record._port,
-                    'protocol': s_record._protocol,
-                    'status': ServiceRecord.Status(int(s_record._status)).name.lower(),
+                    'name': s_name,
+                    'address': '',
+                    'management_port': '',
+                    'service_port': '',
+                    'protocol': '',
+                    'status': '',
                     'assets': assets,
-                    'plugin': {'name': plugin, 'version': plugin_version},
-                    'schedule_enabled': await _get_schedule_status(storage_client, s_record._name)
+                    'plugin': plugin,
+                    'schedule_enabled': schedules_status[s_name]
                 })
-        for s_name in south_services:
-            south_svc = is_svc_in_service_registry(s_name)
-
-            if not south_svc:
-                plugin, assets = await _get_tracked_plugin_assets_and_readings(storage_client, s_name)
-
-                plugin_version = ''
-                for p in installed_plugins:
-                    if p["name"] == plugin:
-                        plugin_version = p["version"]
-                        break
-
-                sr_list.append(
-                    {
-                        'name': s_name,
-                        'address': '',
-                        'management_port': '',
-                        'service_port': '',
-                        'protocol': '',
-                        'status': '',
-                        'assets': assets,
-                        'plugin': {'name': plugin, 'version': plugin_version},
-                        'schedule_enabled': await _get_schedule_status(storage_client, s_name)
-                    })
-    except:
-        raise
-    else:
-        return sr_list
-
-
-async def _get_tracked_plugin_assets_and_readings(storage_client, svc_name):
-    asset_json = []
-    payload = PayloadBuilder().SELECT(["asset", "plugin"]).WHERE(['service', '=', svc_name]).\
-        AND_WHERE(['event', '=', 'Ingest']).payload()
-    try:
-        result = await storage_client.query_tbl_with_payload('asset_tracker', payload)
-        asset_records = result['rows']
-
-        plugin = ''
-        if len(result['rows']):
-            plugin = result['rows'][0]['plugin']
-
-        for r in asset_records:
-            payload = PayloadBuilder().SELECT("value").WHERE(["key", "=", r["asset"].upper()]).payload()
-            results = await storage_client.query_tbl_with_payload("statistics", payload)
-            if int(results['count']):
-                asset_result = results['rows'][0]
-                asset_json.append({"count": asset_result['value'], "asset": r["asset"]})
-    except:
-        raise
-    else:
-        return plugin, asset_json
+    return sr_list
 
 
 async def get_south_services(request):
@@ -139,8 +138,11 @@ async def get_south_services(request):
     :Example:
             curl -X GET http://localhost:8081/foglamp/south
     """
-    if 'cached' in request.query and request.query['cached'].lower() == 'false':
+    use_cache = not ('cached' in request.query and request.query['cached'].lower() == 'false')
+    if not use_cache:
         _get_installed_plugins.cache_clear()
+    elif _response_cache['services'] is not None and time.monotonic() < _response_cache['expires']:
+        return web.json_response({'services': _response_cache['services']})
 
     storage_client = connect.get_storage_async()
     cf_mgr = ConfigurationManager(storage_client)
@@ -151,4 +153,6 @@ async def get_south_services(request):
         return web.json_response({'services': []})
 
     response = await _services_with_assets(storage_client, south_categories)
+    _response_cache['services'] = response
+    _response_cache['expires'] = time.monotonic() + _RESPONSE_CACHE_TTL_SECONDS
     return web.json_response({'services': response})
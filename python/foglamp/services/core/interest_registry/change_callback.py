@@ -22,16 +22,67 @@ __version__ = "${VERSION}"
 
 _LOGGER = logger.setup(__name__)
 
+_NOTIFY_TIMEOUT = 10
+""" Seconds allowed to each interested microservice to acknowledge a change notification """
+
+_session = None
+""" Client session shared by all notifications, created on first use """
+
+_session_loop = None
+""" Event loop the client session was created in """
+
+_in_flight = set()
+""" Categories whose change notification is being sent """
+
+_changed_again = set()
+""" Categories changed again while their notification was in flight, to be notified once more with the latest value """
+
+
+def _get_session():
+    global _session, _session_loop
+    loop = asyncio.get_event_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=_NOTIFY_TIMEOUT))
+        _session_loop = loop
+    return _session
+
+
+async def close():
+    """ Close the client session used to notify microservices """
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
 
 async def run(category_name):
     """ Callback run by configuration category to notify changes to interested microservices
 
     Note: this method is async as needed
 
+    All interested microservices are notified concurrently. A change to a category whose notification is still in
+    flight returns at once, and the in flight notification is then sent once more with the latest value.
+
     Args:
         configuration_name (str): name of category that was changed
     """
+    if category_name in _in_flight:
+        _changed_again.add(category_name)
+        return
+
+    _in_flight.add(category_name)
+    try:
+        while True:
+            _changed_again.discard(category_name)
+            await _notify(category_name)
+            if category_name not in _changed_again:
+                break
+    finally:
+        _in_flight.discard(category_name)
+        _changed_again.discard(category_name)
 
+
+async def _notify(category_name):
     # get all interest records regarding category_name
     cfg_mgr = ConfigurationManager()
     interest_registry = InterestRegistry(cfg_mgr)
@@ -41,28 +92,35 @@ async def run(category_name):
         return
 
     category_value = await cfg_mgr.get_category_all_items(category_name)
-    payload = {"category" : category_name, "items" : category_value}
-    headers = {'content-type': 'application/json'}
+    payload = json.dumps({"category": category_name, "items": category_value}, sort_keys=True)
 
     # for each microservice interested in category_name, notify change
+    notifications = []
     for i in interest_records:
         # get microservice management server info of microservice through service registry
-        try: 
+        try:
             service_record = ServiceRegistry.get(idx=i._microservice_uuid)[0]
         except service_registry_exceptions.DoesNotExist:
             _LOGGER.exception("Unable to notify microservice with uuid %s as it is not found in the service registry", i._microservice_uuid)
             continue
         url = "{}://{}:{}/foglamp/change".format(service_record._protocol, service_record._address, service_record._management_port)
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(url, data=json.dumps(payload, sort_keys=True), headers=headers) as resp:
-                    result = await resp.text()
-                    status_code = resp.status
-                    if status_code in range(400, 500):
-                        _LOGGER.error("Bad request error code: %d, reason: %s", status_code, resp.reason)
-                    if status_code in range(500, 600):
-                        _LOGGER.error("Server error code: %d, reason: %s", status_code, resp.reason)
-            except Exception as ex:
-                _LOGGER.exception("Unable to notify microservice with uuid %s due to exception: %s", i._microservice_uuid, str(ex))
-                continue
+        notifications.append(_post_change(url, payload, i._microservice_uuid))
 
+    if notifications:
+        await asyncio.gather(*notifications)
+
+
+async def _post_change(url, payload, microservice_uuid):
+    headers = {'content-type': 'application/json'}
+    try:
+        async with _get_session().post(url, data=payload, headers=headers) as resp:
+            result = await resp.text()
+            status_code = resp.status
+            if status_code in range(400, 500):
+                _LOGGER.error("Bad request error code: %d, reason: %s", status_code, resp.reason)
+            if status_code in range(500, 600):
+                _LOGGER.error("Server error code: %d, reason: %s", status_code, resp.reason)
+    except asyncio.TimeoutError:
+        _LOGGER.error("Unable to notify microservice with uuid %s within %s seconds", microservice_uuid, _NOTIFY_TIMEOUT)
+    except Exception as ex:
+        _LOGGER.exception("Unable to notify microservice with uuid %s due to exception: %s", microservice_uuid, str(ex))
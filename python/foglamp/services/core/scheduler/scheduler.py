@@ -9,6 +9,7 @@
 import asyncio
 import collections
 import datetime
+import heapq
 import logging
 import math
 import time
@@ -27,6 +28,7 @@ from foglamp.common.storage_client.storage_client import StorageClientAsync
 from foglamp.common.configuration_manager import ConfigurationManager
 from foglamp.services.core.scheduler.entities import *
 from foglamp.services.core.scheduler.exceptions import *
+from foglamp.services.core.scheduler.worker_pool import WorkerPool
 from foglamp.services.core.service_registry.service_registry import ServiceRegistry
 from foglamp.services.core.service_registry import exceptions as service_registry_exceptions
 from foglamp.services.common import utils
@@ -85,17 +87,47 @@ class Scheduler(object):
     # in _ScheduleExecution.
 
     class _ScheduleExecution(object):
-        """Tracks information about schedules"""
+        """Tracks information about schedules
 
-        __slots__ = ['next_start_time', 'task_processes', 'start_now']
+        When created with a scheduler, changes to next_start_time and start_now
+        push the schedule on the scheduler's heap of due times
+        """
 
-        def __init__(self):
-            self.next_start_time = None
+        __slots__ = ['_next_start_time', 'task_processes', '_start_now', 'schedule_id', 'scheduler', 'due_time']
+
+        def __init__(self, schedule_id=None, scheduler=None):
+            self._next_start_time = None
             """When to next start a task for the schedule"""
             self.task_processes = dict()
             """dict of task id to _TaskProcess"""
-            self.start_now = False
+            self._start_now = False
             """True when a task is queued to start via :meth:`start_task`"""
+            self.schedule_id = schedule_id
+            """Id of the schedule this execution tracks"""
+            self.scheduler = scheduler  # type: Scheduler
+            """Scheduler whose heap of due times is kept up to date"""
+            self.due_time = None
+            """Time of the live heap entry for the schedule, 0 when queued to start now"""
+
+        @property
+        def next_start_time(self):
+            return self._next_start_time
+
+        @next_start_time.setter
+        def next_start_time(self, value):
+            self._next_start_time = value
+            if self.scheduler is not None:
+                self.scheduler._push_schedule_execution(self)
+
+        @property
+        def start_now(self):
+            return self._start_now
+
+        @start_now.setter
+        def start_now(self, value):
+            self._start_now = value
+            if self.scheduler is not None:
+                self.scheduler._push_schedule_execution(self)
 
     # Constant class attributes
     _DEFAULT_MAX_RUNNING_TASKS = 50
@@ -104,6 +136,8 @@ class Scheduler(object):
     """Maximum age of rows in the task table that have finished, in days"""
     _DELETE_TASKS_LIMIT = 500
     """The maximum number of rows to delete in the tasks table in a single transaction"""
+    _DEFAULT_WARM_WORKERS = 0
+    """Number of warm workers kept for scheduled Python tasks, 0 starts a new process for every task"""
 
     _HOUR_SECONDS = 3600
     _DAY_SECONDS = 3600 * 24
@@ -155,6 +189,10 @@ class Scheduler(object):
         """When the scheduler started"""
         self._max_running_tasks = None  # type: int
         """Maximum number of tasks that can execute at any given time"""
+        self._warm_workers = self._DEFAULT_WARM_WORKERS
+        """Number of warm workers kept for scheduled Python tasks"""
+        self._worker_pool = None  # type: WorkerPool
+        """Warm workers for scheduled Python tasks, None when disabled"""
         self._paused = False
         """When True, the scheduler will not start any new tasks"""
         self._process_scripts = dict()
@@ -163,6 +201,10 @@ class Scheduler(object):
         """Dictionary of schedules.id to _ScheduleRow"""
         self._schedule_executions = dict()
         """Dictionary of schedules.id to _ScheduleExecution"""
+        self._schedule_heap = []
+        """Heap of (due time, schedules.id), entries not matching _ScheduleExecution.due_time are stale"""
+        self._blocked_schedules = set()
+        """schedules.id of due exclusive schedules waiting for their running task to finish"""
         self._task_processes = dict()
         """Dictionary of tasks.id to _TaskProcess"""
         self._check_processes_pending = False
@@ -307,7 +349,11 @@ class Scheduler(object):
         task_process.start_time = time.time()
 
         try:
-            process = await asyncio.create_subprocess_exec(*args_to_exec, cwd=_SCRIPTS_DIR)
+            process = None
+            if self._worker_pool is not None:
+                process = await self._worker_pool.start_task(args_to_exec)
+            if process is None:
+                process = await asyncio.create_subprocess_exec(*args_to_exec, cwd=_SCRIPTS_DIR)
         except EnvironmentError:
             self._logger.exception(
                 "Unable to start schedule '%s' process '%s'\n%s",
@@ -385,77 +431,138 @@ class Scheduler(object):
                     time.time() - self._last_task_purge_time) >= self._PURGE_TASKS_FREQUENCY_SECONDS):
             self._purge_tasks_task = asyncio.ensure_future(self.purge_tasks())
 
-    async def _check_schedules(self):
-        """Starts tasks according to schedules based on the current time"""
-        earliest_start_time = None
+    def _push_schedule_execution(self, schedule_execution):
+        """Pushes the time a schedule is next due on the heap used by :meth:`_check_schedules`
 
-        # Can not iterate over _schedule_executions - it can change mid-iteration
-        for schedule_id in list(self._schedule_executions.keys()):
-            if self._paused or len(self._task_processes) >= self._max_running_tasks:
-                return None
+        Entries are never removed from the heap; an entry whose time no longer
+        matches schedule_execution.due_time is skipped when it is popped.
+        """
+        due_time = 0 if schedule_execution.start_now else schedule_execution.next_start_time
+        if due_time == schedule_execution.due_time:
+            return
+        schedule_execution.due_time = due_time
+        if due_time is not None:
+            heapq.heappush(self._schedule_heap, (due_time, schedule_execution.schedule_id))
 
+    def _requeue_schedule(self, schedule_id):
+        """Pushes a schedule on the heap again, e.g. when it may no longer be blocked or disabled"""
+        try:
             schedule_execution = self._schedule_executions[schedule_id]
+        except KeyError:
+            return
+        schedule_execution.due_time = None
+        self._push_schedule_execution(schedule_execution)
 
-            try:
-                schedule = self._schedules[schedule_id]
-            except KeyError:
-                # The schedule has been deleted
-                if not schedule_execution.task_processes:
-                    del self._schedule_executions[schedule_id]
-                continue
+    async def _check_schedules(self):
+        """Starts tasks according to schedules based on the current time
 
-            if schedule.enabled is False:
-                continue
+        Only the schedules that are due are popped from the heap, so the cost
+        does not grow with the number of schedules that are waiting.
+        """
+        # Blocked exclusive schedules are few; look at them again on every check
+        blocked_schedules = self._blocked_schedules
+        self._blocked_schedules = set()
+        for schedule_id in blocked_schedules:
+            self._requeue_schedule(schedule_id)
 
-            if schedule.exclusive and schedule_execution.task_processes:
-                continue
+        # A schedule is checked at most once per call, as it was when scanning all schedules
+        checked_schedules = set()
+        deferred_schedules = []
 
-            # next_start_time is None when repeat is None until the
-            # task completes, at which time schedule_execution is removed
-            next_start_time = schedule_execution.next_start_time
-            if not next_start_time and not schedule_execution.start_now:
-                if not schedule_execution.task_processes:
-                    del self._schedule_executions[schedule_id]
-                continue
+        try:
+            while self._schedule_heap:
+                if self._paused or len(self._task_processes) >= self._max_running_tasks:
+                    return None
+
+                due_time, schedule_id = self._schedule_heap[0]
+                schedule_execution = self._schedule_executions.get(schedule_id)
+                if schedule_execution is None or schedule_execution.due_time != due_time:
+                    # Stale entry
+                    heapq.heappop(self._schedule_heap)
+                    continue
 
-            if next_start_time and not schedule_execution.start_now:
                 now = self.current_time if self.current_time else time.time()
-                right_time = now >= next_start_time
-            else:
-                right_time = False
-
-            if right_time or schedule_execution.start_now:
-                # Start a task
-
-                if not right_time:
-                    # Manual start - don't change next_start_time
-                    pass
-                elif schedule.exclusive:
-                    # Exclusive tasks won't start again until they terminate
-                    # Or the schedule doesn't repeat
-                    next_start_time = None
+                if due_time > now:
+                    break
+
+                heapq.heappop(self._schedule_heap)
+                schedule_execution.due_time = None
+
+                if schedule_id in checked_schedules:
+                    deferred_schedules.append(schedule_id)
+                    continue
+                checked_schedules.add(schedule_id)
+
+                try:
+                    schedule = self._schedules[schedule_id]
+                except KeyError:
+                    # The schedule has been deleted
+                    if not schedule_execution.task_processes:
+                        del self._schedule_executions[schedule_id]
+                    continue
+
+                # Enabling the schedule pushes it again
+                if schedule.enabled is False:
+                    continue
+
+                if schedule.exclusive and schedule_execution.task_processes:
+                    self._blocked_schedules.add(schedule_id)
+                    continue
+
+                # next_start_time is None when repeat is None until the
+                # task completes, at which time schedule_execution is removed
+                next_start_time = schedule_execution.next_start_time
+                if not next_start_time and not schedule_execution.start_now:
+                    if not schedule_execution.task_processes:
+                        del self._schedule_executions[schedule_id]
+                    continue
+
+                if next_start_time and not schedule_execution.start_now:
+                    right_time = now >= next_start_time
                 else:
-                    # _schedule_next_task alters next_start_time
-                    self._schedule_next_task(schedule)
-                    next_start_time = schedule_execution.next_start_time
+                    right_time = False
 
-                await self._start_task(schedule)
+                if right_time or schedule_execution.start_now:
+                    # Start a task
 
-                # Queued manual execution is ignored when it was
-                # already time to run the task. The task doesn't
-                # start twice even when nonexclusive.
-                # The choice to put this after "await" above was
-                # deliberate. The above "await" could have allowed
-                # queue_task() to run. The following line
-                # will undo that because, after all, the task started.
-                schedule_execution.start_now = False
+                    if not right_time:
+                        # Manual start - don't change next_start_time
+                        pass
+                    elif schedule.exclusive:
+                        # Exclusive tasks won't start again until they terminate
+                        # Or the schedule doesn't repeat
+                        pass
+                    else:
+                        # _schedule_next_task alters next_start_time
+                        self._schedule_next_task(schedule)
+
+                    await self._start_task(schedule)
+
+                    # Queued manual execution is ignored when it was
+                    # already time to run the task. The task doesn't
+                    # start twice even when nonexclusive.
+                    # The choice to put this after "await" above was
+                    # deliberate. The above "await" could have allowed
+                    # queue_task() to run. The following line
+                    # will undo that because, after all, the task started.
+                    schedule_execution.start_now = False
+        finally:
+            for schedule_id in deferred_schedules:
+                self._requeue_schedule(schedule_id)
+
+        # Drop stale entries so the head is the earliest next_start_time
+        while self._schedule_heap:
+            due_time, schedule_id = self._schedule_heap[0]
+            schedule_execution = self._schedule_executions.get(schedule_id)
+            if schedule_execution is not None and schedule_execution.due_time == due_time:
+                break
+            heapq.heappop(self._schedule_heap)
 
-            # Keep track of the earliest next_start_time
-            if next_start_time and (earliest_start_time is None or
-                                            earliest_start_time > next_start_time):
-                earliest_start_time = next_start_time
+        if not self._schedule_heap:
+            return None
 
-        return earliest_start_time
+        # A task queued to start now has a due time of 0
+        return self._schedule_heap[0][0] or time.time()
 
     async def _scheduler_loop(self):
         """Main loop for the scheduler"""
@@ -608,7 +715,7 @@ class Scheduler(object):
         try:
             schedule_execution = self._schedule_executions[schedule.id]
         except KeyError:
-            schedule_execution = self._ScheduleExecution()
+            schedule_execution = self._ScheduleExecution(schedule.id, self)
             self._schedule_executions[schedule.id] = schedule_execution
 
         if schedule.type == Schedule.Type.INTERVAL:
@@ -730,6 +837,13 @@ class Scheduler(object):
                 "default": str(self._DEFAULT_MAX_COMPLETED_TASK_AGE_DAYS),
                 "displayName": "Max Age Of Task (In days)"
             },
+            "warm_workers": {
+                "description": "Number of processes started ahead of time to run scheduled Python tasks, "
+                               "0 to start a new process for every task",
+                "type": "integer",
+                "default": str(self._DEFAULT_WARM_WORKERS),
+                "displayName": "Warm Task Workers"
+            },
         }
 
         cfg_manager = ConfigurationManager(self._storage_async)
@@ -739,6 +853,7 @@ class Scheduler(object):
         self._max_running_tasks = int(config['max_running_tasks']['value'])
         self._max_completed_task_age = datetime.timedelta(
             seconds=int(config['max_completed_task_age_days']['value']) * self._DAY_SECONDS)
+        self._warm_workers = int(config['warm_workers']['value'])
 
     async def start(self):
         """Starts the scheduler
@@ -790,6 +905,10 @@ class Scheduler(object):
         await self._mark_tasks_interrupted()
         await self._read_storage()
 
+        if not self._is_safe_mode and self._warm_workers > 0:
+            self._worker_pool = WorkerPool(self._warm_workers, self._core_management_port)
+            await self._worker_pool.start()
+
         self._ready = True
         if not self._is_safe_mode:
             self._scheduler_loop_task = asyncio.ensure_future(self._scheduler_loop())
@@ -882,7 +1001,13 @@ class Scheduler(object):
             if task_count != 0:
                 raise TimeoutError("Timeout Error: Could not stop scheduler as {} tasks are pending".format(task_count))
 
+        if self._worker_pool is not None:
+            await self._worker_pool.stop()
+            self._worker_pool = None
+
         self._schedule_executions = None
+        self._schedule_heap = []
+        self._blocked_schedules = set()
         self._task_processes = None
         self._schedules = None
         self._process_scripts = None
@@ -1108,6 +1233,8 @@ class Scheduler(object):
             process_name=schedule.process_name)
 
         self._schedules[schedule.schedule_id] = schedule_row
+        # enabled or exclusive may have changed; have the schedule checked again
+        self._requeue_schedule(schedule.schedule_id)
 
         # Add process to self._process_scripts if not present.
         try:
@@ -1374,7 +1501,7 @@ class Scheduler(object):
         try:
             schedule_execution = self._schedule_executions[schedule_id]
         except KeyError:
-            schedule_execution = self._ScheduleExecution()
+            schedule_execution = self._ScheduleExecution(schedule_row.id, self)
             self._schedule_executions[schedule_row.id] = schedule_execution
 
         schedule_execution.start_now = True
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+"""Pool of warm workers for scheduled Python tasks"""
+
+import asyncio
+import collections
+import json
+import os
+import sys
+import time
+
+from foglamp.common import logger
+from foglamp.tasks.common import warm_worker
+
+__author__ = "Ashish Jabble"
+__copyright__ = "Copyright (c) 2026 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_logger = logger.setup(__name__)
+
+# FOGLAMP_ROOT env variable
+_FOGLAMP_ROOT = os.getenv("FOGLAMP_ROOT", default='/usr/local/foglamp')
+_PYTHON_DIR = os.path.expanduser(_FOGLAMP_ROOT + '/python')
+
+
+class WorkerPool(object):
+    """Keeps interpreters started ahead of time to run scheduled Python tasks
+
+    Each worker (see :mod:`foglamp.tasks.common.warm_worker`) runs a single task and exits, so
+    the process handed out by :meth:`start_task` is tracked and cancelled like a task process
+    started by the scheduler. A new worker is started in the background whenever one is used.
+    """
+
+    _MAX_IDLE_SECONDS = 600
+    """Idle workers older than this are replaced, e.g. in case the storage service moved"""
+
+    def __init__(self, size, core_management_port):
+        self._size = size
+        """Number of idle workers to keep"""
+        self._core_management_port = core_management_port
+        self._idle = collections.deque()
+        """(process, start time) of the idle workers, oldest first"""
+        self._fill_task = None  # type: asyncio.Task
+        self._stopped = False
+
+    @property
+    def idle_count(self):
+        return len(self._idle)
+
+    async def _start_worker(self):
+        return await asyncio.create_subprocess_exec(
+            sys.executable, '-m', 'foglamp.tasks.common.warm_worker',
+            '--address=127.0.0.1', '--port={}'.format(self._core_management_port),
+            stdin=asyncio.subprocess.PIPE, cwd=_PYTHON_DIR)
+
+    async def _fill(self):
+        while not self._stopped and len(self._idle) < self._size:
+            try:
+                process = await self._start_worker()
+            except EnvironmentError:
+                _logger.exception("Unable to start a warm worker")
+                return
+            if self._stopped:
+                await self._retire(process)
+                return
+            self._idle.append((process, time.time()))
+
+    def _refill(self):
+        if self._fill_task is None or self._fill_task.done():
+            self._fill_task = asyncio.ensure_future(self._fill())
+
+    async def _retire(self, process):
+        try:
+            process.terminate()
+        except ProcessLookupError:
+            pass
+        await process.wait()
+
+    async def start(self):
+        """Starts the idle workers"""
+        await self._fill()
+
+    async def start_task(self, args):
+        """Hands a task to an idle worker
+
+        Args:
+            args: script and arguments of the scheduled process
+
+        Returns:
+            asyncio.subprocess.Process of the worker running the task, None when the script
+            can not run in a warm worker or no idle worker is available
+        """
+        module = warm_worker.TASK_MODULES.get(args[0])
+        if module is None:
+            return None
+
+        invocation = (json.dumps({"module": module, "argv": list(args)}) + "\n").encode()
+        try:
+            while self._idle:
+                process, started = self._idle.popleft()
+                if process.returncode is not None:
+                    continue
+                if time.time() - started > self._MAX_IDLE_SECONDS:
+                    asyncio.ensure_future(self._retire(process))
+                    continue
+                try:
+                    process.stdin.write(invocation)
+                    await process.stdin.drain()
+                    process.stdin.close()
+                except ConnectionError:
+                    # The worker died since returncode was checked
+                    continue
+                return process
+            return None
+        finally:
+            self._refill()
+
+    async def stop(self):
+        """Stops the idle workers, workers running tasks are left to the scheduler"""
+        self._stopped = True
+        if self._fill_task is not None and not self._fill_task.done():
+            self._fill_task.cancel()
+        while self._idle:
+            process, _ = self._idle.popleft()
+            await self._retire(process)
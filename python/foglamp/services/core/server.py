@@ -38,6 +38,7 @@ from foglamp.services.core.service_registry.service_registry import ServiceRegis
 from foglamp.services.core.service_registry import exceptions as service_registry_exceptions
 from foglamp.services.core.interest_registry.interest_registry import InterestRegistry
 from foglamp.services.core.interest_registry import exceptions as interest_registry_exceptions
+from foglamp.services.core.interest_registry import change_callback
 from foglamp.services.core.scheduler.scheduler import Scheduler
 from foglamp.services.core.service_registry.monitor import Monitor
 from foglamp.services.common.service_announcer import ServiceAnnouncer
@@ -143,6 +144,23 @@ class Server:
             'default': 'FogLAMP administrative API',
             'displayName': 'Description',
             'order': '2'
+        },
+        'configCacheSize': {
+            'description': 'Maximum number of configuration categories held in the configuration cache',
+            'type': 'integer',
+            'default': '100',
+            'displayName': 'Configuration Cache Size',
+            'minimum': '1',
+            'order': '3'
+        },
+        'configCacheTTL': {
+            'description': 'Number of seconds after which a cached configuration category is read again from storage, '
+                           '0 to never expire',
+            'type': 'integer',
+            'default': '0',
+            'displayName': 'Configuration Cache TTL',
+            'minimum': '0',
+            'order': '4'
         }
     }
 
@@ -440,6 +458,11 @@ class Server:
                 cls._service_description = config['description']['value']
             except KeyError:
                 cls._service_description = 'FogLAMP REST Services'
+            try:
+                cls._configuration_manager._cacheManager.configure(max_cache_size=int(config['configCacheSize']['value']),
+                                                                   ttl=int(config['configCacheTTL']['value']))
+            except (KeyError, ValueError):
+                _logger.warning("Invalid configuration cache size or TTL, using the defaults")
         except Exception as ex:
             _logger.exception(str(ex))
             raise
@@ -878,6 +901,9 @@ class Server:
             # poll microservices for unregister
             await cls.poll_microservices_unregister()
 
+            # no more microservices to notify of configuration changes
+            await change_callback.close()
+
             # stop the REST api (exposed on service port)
             await cls.stop_rest_server()
 
@@ -1029,10 +1055,15 @@ class Server:
 
     @classmethod
     async def ping(cls, request):
-        """ health check
+        """ health check, with the health check round durations and ping round trip times of the service monitor
+
+        Durations are histograms in seconds, services are keyed by service id.
         """
         since_started = time.time() - cls._start_time
-        return web.json_response({'uptime': int(since_started)})
+        response = {'uptime': int(since_started)}
+        if cls.service_monitor is not None:
+            response['monitor'] = cls.service_monitor.get_statistics()
+        return web.json_response(response)
 
     @classmethod
     async def register(cls, request):
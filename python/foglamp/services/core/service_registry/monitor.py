@@ -8,7 +8,9 @@
 
 import asyncio
 import aiohttp
+import bisect
 import json
+import time
 from foglamp.common import logger
 from foglamp.common.audit_logger import AuditLogger
 from foglamp.common.configuration_manager import ConfigurationManager
@@ -22,6 +24,27 @@ __license__ = "Apache 2.0"
 __version__ = "${VERSION}"
 
 
+class _Histogram(object):
+    """Counts of observed durations, in seconds, per upper bound bucket"""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def to_dict(self):
+        buckets = {str(bound): count for bound, count in zip(self.BUCKETS, self.counts)}
+        buckets['+Inf'] = self.counts[-1]
+        return {'buckets': buckets, 'count': self.count, 'sum': round(self.total, 6)}
+
+
 class Monitor(object):
 
     _DEFAULT_SLEEP_INTERVAL = 5
@@ -35,6 +58,15 @@ class Monitor(object):
     _DEFAULT_RESTART_FAILED = "auto"
     """Restart failed microservice - manual/auto"""
 
+    _DEFAULT_MAX_CONCURRENT_PROBES = 8
+    """Number of micro-services pinged at the same time"""
+
+    _DEFAULT_ADAPTIVE_INTERVAL = "false"
+    """Back off pings of healthy micro-services and ping unresponsive ones more often"""
+
+    _MAX_PROBE_BACKOFF = 4
+    """With adaptive interval, a healthy micro-service is pinged at most every _MAX_PROBE_BACKOFF health checks"""
+
     _logger = None
 
     def __init__(self):
@@ -50,12 +82,32 @@ class Monitor(object):
         """Number of max attempts for finding a heartbeat of service"""
         self._restart_failed = None  # type: str
         """Restart failed microservice - manual/auto"""
+        self._max_concurrent_probes = None  # type: int
+        """Number of micro-services pinged at the same time"""
+        self._adaptive_interval = False  # type: bool
+        """Back off pings of healthy micro-services and ping unresponsive ones more often"""
+
+        self._session = None  # type: aiohttp.ClientSession
+        """Client session shared by all pings"""
+        self._next_probe = {}
+        """service id -> monotonic time of its next ping, with adaptive interval"""
+        self._healthy_streak = {}
+        """service id -> number of consecutive successful pings"""
+        self._rtt_histograms = {}
+        """service id -> _Histogram of ping round trip times"""
+        self._round_histogram = _Histogram()
+        """_Histogram of the durations of the health check rounds"""
 
         self.restarted_services = []
 
     async def _sleep(self, sleep_time):
         await asyncio.sleep(sleep_time)
 
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
     async def _monitor_loop(self):
         """async Monitor loop to monitor registered services"""
         # check health of all micro-services every N seconds
@@ -63,10 +115,13 @@ class Monitor(object):
         check_count = {}  # dict to hold current count of current status.
                           # In case of ok and running status, count will always be 1.
                           # In case of of non running statuses, count shows since when this status is set.
+        semaphore = asyncio.Semaphore(self._max_concurrent_probes or self._DEFAULT_MAX_CONCURRENT_PROBES)
         while True:
             round_cnt += 1
             self._logger.debug("Starting next round#{} of service monitoring, sleep/i:{} ping/t:{} max/a:{}".format(
                 round_cnt, self._sleep_interval, self._ping_timeout, self._max_attempts))
+            round_start = time.monotonic()
+            probes = []
             for service_record in ServiceRegistry.all():
                 if service_record._id not in check_count:
                     check_count.update({service_record._id: 1})
@@ -86,44 +141,100 @@ class Monitor(object):
                             asyncio.ensure_future(self.restart_service(service_record))
                     continue
 
-                try:
-                    url = "{}://{}:{}/foglamp/service/ping".format(
-                        service_record._protocol, service_record._address, service_record._management_port)
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(url, timeout=self._ping_timeout) as resp:
-                            text = await resp.text()
-                            res = json.loads(text)
-                            if res["uptime"] is None:
-                                raise ValueError('res.uptime is None')
-                except (asyncio.TimeoutError, aiohttp.client_exceptions.ServerTimeoutError) as ex:
-                    service_record._status = ServiceRecord.Status.Unresponsive
-                    check_count[service_record._id] += 1
-                    self._logger.info("ServerTimeoutError: %s, %s", str(ex), service_record.__repr__())
-                except aiohttp.client_exceptions.ClientConnectorError as ex:
-                    service_record._status = ServiceRecord.Status.Unresponsive
-                    check_count[service_record._id] += 1
-                    self._logger.info("ClientConnectorError: %s, %s", str(ex), service_record.__repr__())
-                except ValueError as ex:
-                    service_record._status = ServiceRecord.Status.Unresponsive
-                    check_count[service_record._id] += 1
-                    self._logger.info("Invalid response: %s, %s", str(ex), service_record.__repr__())
-                except Exception as ex:
-                    service_record._status = ServiceRecord.Status.Unresponsive
-                    check_count[service_record._id] += 1
-                    self._logger.info("Exception occurred: %s, %s", str(ex), service_record.__repr__())
-                else:
-                    service_record._status = ServiceRecord.Status.Running
-                    check_count[service_record._id] = 1
-
-                if check_count[service_record._id] > self._max_attempts:
-                    ServiceRegistry.mark_as_failed(service_record._id)
-                    check_count[service_record._id] = 0
-                    try:
-                        audit = AuditLogger(connect.get_storage_async())
-                        await audit.failure('SRVFL', {'name':service_record._name})
-                    except Exception as ex:
-                        self._logger.info("Failed to audit service failure %s", str(ex))
-            await self._sleep(self._sleep_interval)
+                if not self._is_probe_due(service_record._id, round_start):
+                    continue
+
+                probes.append(self._check_service(service_record, check_count, semaphore))
+
+            if probes:
+                await asyncio.gather(*probes)
+            round_duration = time.monotonic() - round_start
+            self._round_histogram.observe(round_duration)
+            self._logger.debug("Round#{} of service monitoring pinged {} services in {:.3f}s".format(
+                round_cnt, len(probes), round_duration))
+            await self._sleep(self._next_sleep_interval())
+
+    async def _check_service(self, service_record, check_count, semaphore):
+        """Ping a service and update its status, marking it as failed after max_attempts unsuccessful pings"""
+        try:
+            url = "{}://{}:{}/foglamp/service/ping".format(
+                service_record._protocol, service_record._address, service_record._management_port)
+            async with semaphore:
+                start = time.monotonic()
+                async with self._get_session().get(url, timeout=self._ping_timeout) as resp:
+                    text = await resp.text()
+                    res = json.loads(text)
+                    if res["uptime"] is None:
+                        raise ValueError('res.uptime is None')
+                rtt = time.monotonic() - start
+        except (asyncio.TimeoutError, aiohttp.client_exceptions.ServerTimeoutError) as ex:
+            service_record._status = ServiceRecord.Status.Unresponsive
+            check_count[service_record._id] += 1
+            self._logger.info("ServerTimeoutError: %s, %s", str(ex), service_record.__repr__())
+        except aiohttp.client_exceptions.ClientConnectorError as ex:
+            service_record._status = ServiceRecord.Status.Unresponsive
+            check_count[service_record._id] += 1
+            self._logger.info("ClientConnectorError: %s, %s", str(ex), service_record.__repr__())
+        except ValueError as ex:
+            service_record._status = ServiceRecord.Status.Unresponsive
+            check_count[service_record._id] += 1
+            self._logger.info("Invalid response: %s, %s", str(ex), service_record.__repr__())
+        except Exception as ex:
+            service_record._status = ServiceRecord.Status.Unresponsive
+            check_count[service_record._id] += 1
+            self._logger.info("Exception occurred: %s, %s", str(ex), service_record.__repr__())
+        else:
+            service_record._status = ServiceRecord.Status.Running
+            check_count[service_record._id] = 1
+            if service_record._id not in self._rtt_histograms:
+                self._rtt_histograms[service_record._id] = _Histogram()
+            self._rtt_histograms[service_record._id].observe(rtt)
+
+        self._schedule_next_probe(service_record._id, service_record._status == ServiceRecord.Status.Running)
+
+        if check_count[service_record._id] > self._max_attempts:
+            ServiceRegistry.mark_as_failed(service_record._id)
+            check_count[service_record._id] = 0
+            try:
+                audit = AuditLogger(connect.get_storage_async())
+                await audit.failure('SRVFL', {'name':service_record._name})
+            except Exception as ex:
+                self._logger.info("Failed to audit service failure %s", str(ex))
+
+    def _suspect_interval(self):
+        return max(1, self._sleep_interval // 2)
+
+    def _is_probe_due(self, service_id, now):
+        if not self._adaptive_interval:
+            return True
+        # Allow for rounds starting slightly before the exact due time
+        return self._next_probe.get(service_id, 0) <= now + self._suspect_interval() / 2
+
+    def _schedule_next_probe(self, service_id, healthy):
+        if healthy:
+            self._healthy_streak[service_id] = self._healthy_streak.get(service_id, 0) + 1
+        else:
+            self._healthy_streak[service_id] = 0
+        if not self._adaptive_interval:
+            return
+        if healthy:
+            interval = self._sleep_interval * min(self._healthy_streak[service_id], self._MAX_PROBE_BACKOFF)
+        else:
+            interval = self._suspect_interval()
+        self._next_probe[service_id] = time.monotonic() + interval
+
+    def _next_sleep_interval(self):
+        """With adaptive interval, health checks run more often while any service is unresponsive"""
+        if self._adaptive_interval and any(s._status == ServiceRecord.Status.Unresponsive for s in ServiceRegistry.all()):
+            return self._suspect_interval()
+        return self._sleep_interval
+
+    def get_statistics(self):
+        """Return the round duration histogram and, per service id, the ping round trip time histogram"""
+        return {'rounds': self._round_histogram.to_dict(),
+                'services': {service_id: {'rtt': histogram.to_dict(),
+                                          'healthyStreak': self._healthy_streak.get(service_id, 0)}
+                             for service_id, histogram in self._rtt_histograms.items()}}
 
     async def _read_config(self):
         """Reads configuration"""
@@ -156,6 +267,19 @@ class Monitor(object):
                 'options': ['auto', 'manual'],
                 "default": self._DEFAULT_RESTART_FAILED,
                 "displayName": "Restart Failed"
+            },
+            "max_concurrent_probes": {
+                "description": "Maximum number of micro-services pinged at the same time",
+                "type": "integer",
+                "default": str(self._DEFAULT_MAX_CONCURRENT_PROBES),
+                "displayName": "Max Concurrent Pings",
+                "minimum": "1"
+            },
+            "adaptive_interval": {
+                "description": "Ping healthy micro-services less often and unresponsive ones more often",
+                "type": "boolean",
+                "default": self._DEFAULT_ADAPTIVE_INTERVAL,
+                "displayName": "Adaptive Health Check Interval"
             }
         }
 
@@ -169,6 +293,8 @@ class Monitor(object):
         self._ping_timeout = int(config['ping_timeout']['value'])
         self._max_attempts = int(config['max_attempts']['value'])
         self._restart_failed = config['restart_failed']['value']
+        self._max_concurrent_probes = int(config['max_concurrent_probes']['value'])
+        self._adaptive_interval = config['adaptive_interval']['value'] == 'true'
 
     async def restart_service(self, service_record):
         from foglamp.services.core import server  # To avoid cyclic import as server also imports monitor
@@ -185,3 +311,6 @@ class Monitor(object):
             self._monitor_loop_task.cancel()
         except asyncio.CancelledError:
             pass
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
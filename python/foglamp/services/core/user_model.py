@@ -9,6 +9,7 @@
 """
 import uuid
 import hashlib
+import time
 from datetime import datetime, timedelta
 import jwt
 
@@ -31,6 +32,8 @@ JWT_ALGORITHM = 'HS256'
 JWT_EXP_DELTA_SECONDS = 30*60  # 30 minutes
 ERROR_MSG = 'Something went wrong'
 USED_PASSWORD_HISTORY_COUNT = 3
+TOKEN_CACHE_TTL_SECONDS = 60  # validated tokens, users and role ids are reused for this long
+TOKEN_EXPIRY_WRITE_INTERVAL_SECONDS = 60  # a token's refreshed expiry is written at most once in this interval
 
 _logger = logger.setup(__name__)
 
@@ -75,6 +78,54 @@ class User:
 
     class Objects:
 
+        _token_cache = {}
+        """ token -> (user id, time cached) of validated tokens """
+
+        _user_cache = {}
+        """ str(user id) -> (user row, time cached) """
+
+        _role_cache = {}
+        """ role name -> (role id rows, time cached) """
+
+        _pending_token_refreshes = set()
+        """ tokens used since their expiry was last written """
+
+        _token_expiry_written = {}
+        """ token -> time its expiry was last written """
+
+        @classmethod
+        def _get_cached(cls, cache, key):
+            entry = cache.get(key)
+            if entry is None:
+                return None
+            value, cached_at = entry
+            if time.monotonic() - cached_at > TOKEN_CACHE_TTL_SECONDS:
+                del cache[key]
+                return None
+            return value
+
+        @classmethod
+        def _forget_token(cls, token):
+            cls._token_cache.pop(token, None)
+            cls._pending_token_refreshes.discard(token)
+            cls._token_expiry_written.pop(token, None)
+
+        @classmethod
+        def _forget_user(cls, user_id):
+            cls._user_cache.pop(str(user_id), None)
+            for token, (uid, _) in list(cls._token_cache.items()):
+                if str(uid) == str(user_id):
+                    cls._forget_token(token)
+
+        @classmethod
+        def clear_cache(cls):
+            """ Forgets all cached tokens, users and roles """
+            cls._token_cache.clear()
+            cls._user_cache.clear()
+            cls._role_cache.clear()
+            cls._pending_token_refreshes.clear()
+            cls._token_expiry_written.clear()
+
         @classmethod
         async def get_roles(cls):
             storage_client = connect.get_storage_async()
@@ -83,9 +134,14 @@ class User:
 
         @classmethod
         async def get_role_id_by_name(cls, name):
+            rows = cls._get_cached(cls._role_cache, name)
+            if rows is not None:
+                return rows
+
             storage_client = connect.get_storage_async()
             payload = PayloadBuilder().SELECT("id").WHERE(['name', '=', name]).payload()
             result = await storage_client.query_tbl_with_payload('roles', payload)
+            cls._role_cache[name] = (result["rows"], time.monotonic())
             return result["rows"]
 
         @classmethod
@@ -133,6 +189,7 @@ class User:
 
                 payload = PayloadBuilder().SET(enabled="f").WHERE(['id', '=', user_id]).AND_WHERE(['enabled', '=', 't']).payload()
                 result = await storage_client.update_tbl("users", payload)
+                cls._forget_user(user_id)
             except StorageServerError as ex:
                 if ex.error["retryable"]:
                     pass  # retry INSERT
@@ -170,6 +227,7 @@ class User:
                 payload = PayloadBuilder().SET(**kwargs).WHERE(['id', '=', user_id]).AND_WHERE(
                     ['enabled', '=', 't']).payload()
                 result = await storage_client.update_tbl("users", payload)
+                cls._forget_user(user_id)
                 if result['rows_affected']:
                     # FIXME: FOGL-1226 active session delete only in case of role_id and password updation
 
@@ -228,6 +286,13 @@ class User:
 
         @classmethod
         async def get(cls, uid=None, username=None):
+            # Lookups by id alone, as done for every authenticated request, are cached
+            by_uid = uid is not None and username is None
+            if by_uid:
+                user = cls._get_cached(cls._user_cache, str(uid))
+                if user is not None:
+                    return user
+
             users = await cls.filter(uid=uid, username=username)
             if len(users) == 0:
                 msg = ''
@@ -239,15 +304,47 @@ class User:
                     msg = "User with id:<{}> and name:<{}> does not exist".format(uid, username)
 
                 raise User.DoesNotExist(msg)
+            if by_uid:
+                cls._user_cache[str(uid)] = (users[0], time.monotonic())
             return users[0]
 
         @classmethod
         async def refresh_token_expiry(cls, token):
+            """ Extends the expiry of the token
+
+            The new expiry is written at most once every TOKEN_EXPIRY_WRITE_INTERVAL_SECONDS for a token,
+            together with all the other tokens used since their last write, in one update.
+            """
+            cls._pending_token_refreshes.add(token)
+            written = cls._token_expiry_written.get(token)
+            if written is not None and time.monotonic() - written < TOKEN_EXPIRY_WRITE_INTERVAL_SECONDS:
+                return
+            await cls.write_token_expiry()
+
+        @classmethod
+        async def write_token_expiry(cls):
+            """ Writes the refreshed expiry of the tokens used since their last write """
+            if not cls._pending_token_refreshes:
+                return
+            tokens = list(cls._pending_token_refreshes)
+            cls._pending_token_refreshes.clear()
+
             storage_client = connect.get_storage_async()
             exp = datetime.now() + timedelta(seconds=JWT_EXP_DELTA_SECONDS)
-            payload = PayloadBuilder().SET(token_expiration=str(exp)).WHERE(['token', '=', token]).payload()
+            if len(tokens) == 1:
+                where = ['token', '=', tokens[0]]
+            else:
+                where = ['token', 'in', tokens]
+            payload = PayloadBuilder().SET(token_expiration=str(exp)).WHERE(where).payload()
             await storage_client.update_tbl("user_logins", payload)
 
+            now = time.monotonic()
+            for token, written in list(cls._token_expiry_written.items()):
+                if now - written > JWT_EXP_DELTA_SECONDS:
+                    del cls._token_expiry_written[token]
+            for token in tokens:
+                cls._token_expiry_written[token] = now
+
         @classmethod
         async def validate_token(cls, token):
             """ check existence and validity of token
@@ -256,6 +353,11 @@ class User:
             :param token:
             :return:
             """
+            uid = cls._get_cached(cls._token_cache, token)
+            if uid is not None:
+                # A token used within the TTL was refreshed to expire long after it
+                return uid
+
             storage_client = connect.get_storage_async()
             payload = PayloadBuilder().SELECT("token_expiration") \
                 .ALIAS("return", ("token_expiration", 'token_expiration')) \
@@ -281,6 +383,7 @@ class User:
             # as we want to refresh token on each successful request
             # and extend it to keep session alive
             user_payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM], options={'verify_exp': False})
+            cls._token_cache[token] = (user_payload["uid"], time.monotonic())
             return user_payload["uid"]
 
         @classmethod
@@ -391,6 +494,8 @@ class User:
                 if not ex.error["retryable"]:
                     pass
                 raise ValueError(ERROR_MSG)
+            finally:
+                cls._forget_user(user_id)
 
             return res
 
@@ -404,6 +509,8 @@ class User:
                 if not ex.error["retryable"]:
                     pass
                 raise ValueError(ERROR_MSG)
+            finally:
+                cls._forget_token(token)
 
             return res
 
@@ -411,6 +518,7 @@ class User:
         async def delete_all_user_tokens(cls):
             storage_client = connect.get_storage_async()
             await storage_client.delete_from_tbl("user_logins")
+            cls.clear_cache()
 
         @classmethod
         def hash_password(cls, password):
@@ -8,6 +8,7 @@
 
 import asyncio
 import datetime
+import sys
 import time
 import uuid
 from typing import List, Union
@@ -15,6 +16,8 @@ import json
 
 from foglamp.common import logger
 from foglamp.common import statistics
+from foglamp.common.microservice_management_client.microservice_management_client import MicroserviceManagementClient
+from foglamp.common.microservice_management_client.exceptions import MicroserviceManagementClientError
 from foglamp.common.storage_client.exceptions import StorageServerError
 
 __author__ = "Terris Linenbach, Amarendra K Sinha"
@@ -59,13 +62,20 @@ class Ingest(object):
     """True when the server has been started"""
 
     _readings_lists = None  # type: List
-    """A list of readings lists. Each list contains the inputs to :meth:`add_readings`."""
+    """A list of readings lists. Each list contains the inputs to :meth:`add_readings` as
+    (asset_code, read_key, reading, user_ts) tuples, read_key being None when not given."""
+
+    _asset_codes = {}  # type: dict
+    """Asset codes seen since startup, mapped to their interned (asset code, statistics key)"""
 
     _current_readings_list_index = 0
     """Which readings list to insert into next"""
 
     _insert_readings_tasks = None  # type: List[asyncio.Task]
-    """asyncio tasks for :meth:`_insert_readings`"""
+    """asyncio tasks for :meth:`_insert_readings`, one per readings list"""
+
+    _insert_readings_stats = None  # type: List[dict]
+    """Per readings list insert counters, see :meth:`get_insert_statistics`"""
 
     _readings_list_batch_size_reached = None  # type: List[asyncio.Event]
     """Fired when a readings list has reached _readings_insert_batch_size entries"""
@@ -103,10 +113,41 @@ class Ingest(object):
     _max_readings_insert_batch_reconnect_wait_seconds = 10
     """The maximum number of seconds to wait before reconnecting to storage when inserting readings"""
 
+    _write_statistics_frequency_seconds = 5
+    """The number of seconds to wait before writing readings-related statistics to storage"""
+
+    _write_statistics_threshold = 4096
+    """Write readings-related statistics before the frequency has elapsed once this many readings are counted"""
+
     # Configuration (end)
 
-    _payload_events = []
-    """The list of unique reading payload for asset tracker"""
+    _write_statistics_task = None  # type: asyncio.Task
+    """asyncio task for :meth:`_write_statistics_loop`"""
+
+    _write_statistics_sleep_task = None  # type: asyncio.Task
+    """asyncio task blocking :meth:`_write_statistics_loop` that can be canceled"""
+
+    _write_statistics_threshold_reached = None  # type: asyncio.Event
+    """Fired when _write_statistics_threshold readings have been counted"""
+
+    _asset_tracker_records = set()
+    """(asset, event, service, plugin) of the asset tracker records registered, or queued for registration"""
+
+    _asset_tracker_pending = []
+    """Asset tracker records waiting for :meth:`_register_asset_tracker_records`"""
+
+    _asset_tracker_pending_event = None  # type: asyncio.Event
+    """Fired when asset tracker records are queued"""
+
+    _asset_tracker_task = None  # type: asyncio.Task
+    """asyncio task for :meth:`_register_asset_tracker_records`"""
+
+    _asset_tracker_client = None  # type: MicroserviceManagementClient
+    """Core management client used, from a worker thread, to register asset tracker records"""
+
+    _asset_tracker_service = None
+    _asset_tracker_plugin = None
+    """Service and plugin of the Ingest asset tracker records"""
 
     stats = None
     """Statistics class instance"""
@@ -159,6 +200,20 @@ class Ingest(object):
                 "type": "integer",
                 "default": str(cls._max_readings_insert_batch_reconnect_wait_seconds)
             },
+            "write_statistics_frequency_seconds": {
+                "description": "Number of seconds to wait before writing readings statistics "
+                               "to storage",
+                "displayName": "Statistics Write Frequency",
+                "type": "integer",
+                "default": str(cls._write_statistics_frequency_seconds)
+            },
+            "write_statistics_threshold": {
+                "description": "Number of readings counted that causes readings statistics to be "
+                               "written to storage before the frequency has elapsed",
+                "displayName": "Statistics Write Threshold",
+                "type": "integer",
+                "default": str(cls._write_statistics_threshold)
+            },
         }
 
         # Create configuration category and any new keys within it
@@ -192,8 +247,8 @@ class Ingest(object):
             ['value'])
         cls._max_readings_insert_batch_reconnect_wait_seconds = int(
             config['max_readings_insert_batch_reconnect_wait_seconds']['value'])
-
-        cls._payload_events = []
+        cls._write_statistics_frequency_seconds = int(config['write_statistics_frequency_seconds']['value'])
+        cls._write_statistics_threshold = int(config['write_statistics_threshold']['value'])
 
     @classmethod
     async def start(cls, parent):
@@ -213,6 +268,13 @@ class Ingest(object):
         cls._readings_insert_batch_size = 1024 if not cls._readings_insert_batch_size else cls._readings_insert_batch_size
         cls._max_concurrent_readings_inserts = 4 if not cls._max_concurrent_readings_inserts else cls._max_concurrent_readings_inserts
 
+        # Keep-alive connections to the storage service shared by all the inserts, instead of a new connection
+        # per batch; idle connections are closed after max_readings_insert_batch_connection_idle_seconds
+        cls.readings_storage_async.enable_connection_pool(
+            limit=cls._max_concurrent_readings_inserts,
+            idle_timeout=cls._max_readings_insert_batch_connection_idle_seconds)
+        cls.storage_async.enable_connection_pool(idle_timeout=cls._max_readings_insert_batch_connection_idle_seconds)
+
         cls._readings_list_size = int(cls._readings_buffer_size / (
             cls._max_concurrent_readings_inserts))
 
@@ -231,17 +293,34 @@ class Ingest(object):
         cls._readings_list_batch_size_reached = []
         cls._readings_list_not_empty = []
         cls._readings_lists = []
+        cls._insert_readings_stats = []
 
         for _ in range(cls._max_concurrent_readings_inserts):
             cls._readings_lists.append([])
             cls._insert_readings_wait_tasks.append(None)
             cls._readings_list_batch_size_reached.append(asyncio.Event())
             cls._readings_list_not_empty.append(asyncio.Event())
+            cls._insert_readings_stats.append({'batches': 0, 'readings': 0, 'failures': 0,
+                                               'last_latency': 0.0, 'total_latency': 0.0})
 
-        cls._insert_readings_task = asyncio.ensure_future(cls._insert_readings())
         cls._readings_lists_not_full = asyncio.Event()
-
-        cls._payload_events = cls._parent_service._core_microservice_management_client.get_asset_tracker_events()['track']
+        cls._asset_codes = {}
+
+        # One insert worker per readings list: up to _max_concurrent_readings_inserts appends are in flight
+        cls._insert_readings_tasks = [asyncio.ensure_future(cls._insert_readings(list_index))
+                                      for list_index in range(cls._max_concurrent_readings_inserts)]
+
+        cls._asset_tracker_service = cls._parent_service._name
+        cls._asset_tracker_plugin = cls._parent_service._plugin_info['config']['plugin']['default']
+        cls._asset_tracker_records = {
+            (r['asset'], r['event'], r['service'], r['plugin'])
+            for r in cls._parent_service._core_microservice_management_client.get_asset_tracker_events()['track']}
+        cls._asset_tracker_pending = []
+        cls._asset_tracker_pending_event = asyncio.Event()
+        # A client of its own, as the management client connection can not be shared with the event loop thread
+        cls._asset_tracker_client = MicroserviceManagementClient(cls._parent_service._core_management_host,
+                                                                 cls._parent_service._core_management_port)
+        cls._asset_tracker_task = asyncio.ensure_future(cls._register_asset_tracker_records())
 
         cls.stats = await statistics.create_statistics(cls.storage_async)
 
@@ -251,6 +330,10 @@ class Ingest(object):
                                               'discarded before being placed in the buffer. This may be due to some '
                                               'error in the readings themselves.')
 
+        # Statistics are counted in memory and written by a single task, off the path of the readings inserts
+        cls._write_statistics_threshold_reached = asyncio.Event()
+        cls._write_statistics_task = asyncio.ensure_future(cls._write_statistics_loop())
+
         cls._stop = False
         cls._started = True
 
@@ -270,11 +353,32 @@ class Ingest(object):
                     task.cancel()
                 except asyncio.CancelledError:
                     pass
+        for task in cls._insert_readings_tasks:
+            try:
+                await task
+            except Exception:
+                _LOGGER.exception('An exception was raised by Ingest._insert_readings')
+
+        if cls._write_statistics_sleep_task is not None:
+            cls._write_statistics_sleep_task.cancel()
         try:
-            await cls._insert_readings_task
-            cls._insert_readings_task = None
+            await cls._write_statistics_task
         except Exception:
-            _LOGGER.exception('An exception was raised by Ingest._insert_readings')
+            _LOGGER.exception('An exception was raised by Ingest._write_statistics_loop')
+        cls._write_statistics_task = None
+
+        # Commit what was counted since the last write, e.g. the last batches inserted
+        await cls._write_statistics()
+
+        # Not cancelled, so that a registration running in a worker thread completes and the records
+        # that failed are queued again before the last flush
+        cls._asset_tracker_pending_event.set()
+        try:
+            await cls._asset_tracker_task
+        except Exception:
+            _LOGGER.exception('An exception was raised by Ingest._register_asset_tracker_records')
+        cls._asset_tracker_task = None
+        await cls._flush_asset_tracker_records()
 
         cls._insert_readings_wait_tasks = None
         cls._insert_readings_tasks = None
@@ -283,6 +387,12 @@ class Ingest(object):
         cls._readings_list_not_empty = None
         cls._readings_lists_not_full = None
 
+        try:
+            await cls.readings_storage_async.close()
+            await cls.storage_async.close()
+        except Exception:
+            _LOGGER.exception('An exception was raised while closing the storage connections')
+
         cls._started = False
 
     @classmethod
@@ -291,81 +401,55 @@ class Ingest(object):
         cls._discarded_readings_stats += 1
 
     @classmethod
-    async def _insert_readings(cls):
-        """Inserts rows into the readings table
+    async def _insert_readings(cls, list_index):
+        """Inserts the rows of one readings list into the readings table
 
+        An instance runs for each readings list, so batches of different lists are inserted concurrently.
         Use ReadingsStorageClientAsync().append(json_payload_of_readings)
         """
-        _LOGGER.info('Insert readings loop started')
-
-        list_index = 0
-
-        while list_index <= cls._max_concurrent_readings_inserts-1:
-            if cls._stop:
-                readings = 0
-                for i in range(cls._max_concurrent_readings_inserts):
-                    readings += len(cls._readings_lists[i])
-                if cls._discarded_readings_stats + readings == 0:
-                    break  # Terminate this method as there are no pending readings available
+        _LOGGER.info('Insert readings loop started for list index: %s', list_index)
 
-            list_index += 1
-            if list_index > cls._max_concurrent_readings_inserts-1:
-                list_index = 0
-
-            # _LOGGER.debug('Insert readings for list_index: %s', list_index)
+        readings_list = cls._readings_lists[list_index]
+        min_readings_reached = cls._readings_list_batch_size_reached[list_index]
+        lists_not_full = cls._readings_lists_not_full
 
-            readings_list = cls._readings_lists[list_index]
-            min_readings_reached = cls._readings_list_batch_size_reached[list_index]
-            lists_not_full = cls._readings_lists_not_full
+        while True:
+            if cls._stop and not len(readings_list):
+                break  # Terminate this method as there are no pending readings available
 
             # Wait for enough items in the list to fill a batch
             # for some minimum amount of time
-            while not cls._stop:
-                if len(readings_list) >= cls._readings_insert_batch_size:
-                    break
-
+            if not cls._stop and len(readings_list) < cls._readings_insert_batch_size:
                 min_readings_reached.clear()
                 waiter = asyncio.ensure_future(min_readings_reached.wait())
                 cls._insert_readings_wait_tasks[list_index] = waiter
 
-                # _LOGGER.debug('Waiting for entire batch: Queue index: %s Size: %s', list_index, len(readings_list))
-
                 try:
                     await asyncio.wait_for(waiter, cls._readings_insert_batch_timeout_seconds)
-                    # _LOGGER.debug('Released: Queue index: %s Size: %s', list_index, len(readings_list))
-                except asyncio.CancelledError:
-                    # _LOGGER.debug('Cancelled: Queue index: %s Size: %s', list_index, len(readings_list))
-                    break
-                except asyncio.TimeoutError:
-                    # _LOGGER.debug('Timed out: Queue index: %s Size: %s', list_index, len(readings_list))
-                    break
+                except (asyncio.CancelledError, asyncio.TimeoutError):
+                    pass
                 finally:
                     cls._insert_readings_wait_tasks[list_index] = None
 
-            # If list is still empty, then proceed to next list
+            # If list is still empty, then wait again
             if not len(readings_list):
                 continue
 
-            # If batch size still not reached and if there is time then let this list wait and move to next list
-            if (not cls._stop) and (len(readings_list) < cls._readings_insert_batch_size) and ((
-                    time.time() - cls._last_insert_time) < cls._readings_insert_batch_timeout_seconds):
-                continue
-
             attempt = 0
-            cls._last_insert_time = time.time()
+            inserted = 0
+            insert_start_time = time.time()
+            cls._last_insert_time = insert_start_time
 
             # Perform insert. Retry when fails.
             while True:
                 try:
                     batch_size = len(readings_list)
-                    payload = json.dumps({"readings": readings_list[:batch_size]})
-                    # insert_start_time = time.time()
-                    # _LOGGER.debug('Begin insert: Queue index: %s Batch size: %s', list_index, batch_size)
+                    # Serialized once, by the storage client, straight into the request body
+                    payload = cls._readings_payload(readings_list, batch_size)
                     try:
                         await cls.readings_storage_async.append(payload)
-                        # insert_end_time = time.time()
-                        # _LOGGER.debug('Inserted %s records in time %s', batch_size, insert_end_time - insert_start_time)
                         cls._readings_stats += batch_size
+                        inserted = batch_size
                     except StorageServerError as ex:
                         err_response = ex.error
                         # if key error in next, it will be automatically in parent except block
@@ -378,7 +462,6 @@ class Ingest(object):
                             _LOGGER.error("%s, %s", err_response["source"], err_response["message"])
                             batch_size = len(readings_list)
                             cls._discarded_readings_stats += batch_size
-                    # _LOGGER.debug('End insert: Queue index: %s Batch size: %s', list_index, batch_size)
                     break
                 except Exception as ex:
                     attempt += 1
@@ -392,21 +475,88 @@ class Ingest(object):
                         _LOGGER.warning('Insert failed: Queue index: %s Batch size: %s', list_index, batch_size)
                         break
 
-            await cls._write_statistics()
+            cls._update_insert_readings_stats(list_index, inserted, batch_size - inserted,
+                                              time.time() - insert_start_time)
+
+            if cls._readings_stats + cls._discarded_readings_stats >= cls._write_statistics_threshold:
+                cls._write_statistics_threshold_reached.set()
 
             del readings_list[:batch_size]
 
             if not lists_not_full.is_set():
                 lists_not_full.set()
 
-            # insert_end_time = time.time()
-            # _LOGGER.debug('Inserted %s records + stat in time %s', batch_size, insert_end_time - insert_start_time)
+        _LOGGER.info('Insert readings loop stopped for list index: %s', list_index)
+
+    @staticmethod
+    def _readings_payload(readings_list, batch_size):
+        """Returns the /storage/reading payload of the first batch_size readings of a readings list"""
+        return {"readings": [
+            {"asset_code": asset_code, "reading": reading, "user_ts": user_ts} if read_key is None else
+            {"asset_code": asset_code, "read_key": read_key, "reading": reading, "user_ts": user_ts}
+            for asset_code, read_key, reading, user_ts in readings_list[:batch_size]]}
+
+    @classmethod
+    def _update_insert_readings_stats(cls, list_index, inserted, discarded, latency):
+        """Accounts a batch insert of a readings list"""
+        stats = cls._insert_readings_stats[list_index]
+        stats['batches'] += 1
+        stats['readings'] += inserted
+        stats['failures'] += 1 if discarded else 0
+        stats['last_latency'] = latency
+        stats['total_latency'] += latency
+
+    @classmethod
+    def get_insert_statistics(cls) -> List[dict]:
+        """Per readings list insert counters
+
+        Returns:
+            For each readings list: the number of batches sent, readings inserted, failed batches,
+            the last and average insert latency in seconds and the throughput in readings per second of insert time
+        """
+        if cls._insert_readings_stats is None:
+            return []
+
+        insert_statistics = []
+        for list_index, stats in enumerate(cls._insert_readings_stats):
+            total_latency = stats['total_latency']
+            insert_statistics.append({
+                'list_index': list_index,
+                'pending': len(cls._readings_lists[list_index]) if cls._readings_lists else 0,
+                'batches': stats['batches'],
+                'readings': stats['readings'],
+                'failures': stats['failures'],
+                'last_latency': stats['last_latency'],
+                'average_latency': total_latency / stats['batches'] if stats['batches'] else 0.0,
+                'readings_per_second': stats['readings'] / total_latency if total_latency else 0.0
+            })
+        return insert_statistics
+
+    @classmethod
+    async def _write_statistics_loop(cls):
+        """Writes the readings statistics every _write_statistics_frequency_seconds, or sooner
+        when _write_statistics_threshold readings have been counted, until the server stops"""
+        while not cls._stop:
+            cls._write_statistics_sleep_task = asyncio.ensure_future(
+                asyncio.wait_for(cls._write_statistics_threshold_reached.wait(),
+                                 cls._write_statistics_frequency_seconds))
+            try:
+                await cls._write_statistics_sleep_task
+            except (asyncio.CancelledError, asyncio.TimeoutError):
+                pass
+            cls._write_statistics_sleep_task = None
+            cls._write_statistics_threshold_reached.clear()
+
+            # stop() writes what is left once the inserts are done
+            if cls._stop:
+                break
 
-        _LOGGER.info('Insert readings loop stopped')
+            await cls._write_statistics()
 
     @classmethod
     async def _write_statistics(cls):
-        """Periodically commits collected readings statistics"""
+        """Commits collected readings statistics as one bulk update. Counters that could not be
+        written are kept for the next write."""
 
         updates = {}
 
@@ -418,15 +568,21 @@ class Ingest(object):
         cls._discarded_readings_stats -= discarded_readings
         updates.update({'DISCARDED': discarded_readings})
 
-        """ Register the statistics keys as this may be the first time the key has come into existence """
-        sensor_readings = cls._sensor_stats.copy()
+        # Take the counters before any await, as insert workers may write statistics concurrently
+        sensor_readings = {key: value for key, value in cls._sensor_stats.items() if value}
         for key in sensor_readings:
-            description = 'Readings received by FogLAMP since startup for sensor {}'.format(key)
-            await cls.stats.register(key, description)
             cls._sensor_stats[key] -= sensor_readings[key]
             updates.update({key: sensor_readings[key]})
 
+        if not any(updates.values()):
+            return
+
         try:
+            # Register the statistics keys as this may be the first time the key has come into existence
+            for key in sensor_readings:
+                description = 'Readings received by FogLAMP since startup for sensor {}'.format(key)
+                await cls.stats.register(key, description)
+
             await cls.stats.update_bulk(updates)
         except Exception as ex:
             cls._readings_stats += readings
@@ -435,6 +591,83 @@ class Ingest(object):
                 cls._sensor_stats[key] += sensor_readings[key]
             _LOGGER.exception('An error occurred while writing sensor statistics, Error: %s', str(ex))
 
+    @classmethod
+    def _track_asset(cls, asset):
+        """Queues the Ingest asset tracker record of an asset for registration, unless already known"""
+        record = (asset, 'Ingest', cls._asset_tracker_service, cls._asset_tracker_plugin)
+        if record in cls._asset_tracker_records:
+            return
+
+        cls._asset_tracker_records.add(record)
+        cls._asset_tracker_pending.append(record)
+        if cls._asset_tracker_pending_event is not None:
+            cls._asset_tracker_pending_event.set()
+
+    @classmethod
+    async def _register_asset_tracker_records(cls):
+        """Registers the queued asset tracker records with the core, off the ingest path
+
+        Records queued while a batch is registered are sent with the next batch.
+        """
+        while not cls._stop:
+            await cls._asset_tracker_pending_event.wait()
+            cls._asset_tracker_pending_event.clear()
+
+            # stop() registers what is left
+            if cls._stop:
+                break
+
+            if not await cls._flush_asset_tracker_records():
+                # Retry later, the records that failed are queued again. The wait ends early on stop().
+                try:
+                    await asyncio.wait_for(cls._asset_tracker_pending_event.wait(),
+                                           cls._max_readings_insert_batch_reconnect_wait_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                cls._asset_tracker_pending_event.set()
+
+    @classmethod
+    async def _flush_asset_tracker_records(cls) -> bool:
+        """Registers all the queued asset tracker records
+
+        Returns:
+            False if some records could not be registered and have been queued again, True otherwise
+        """
+        records = cls._asset_tracker_pending
+        if not records:
+            return True
+        cls._asset_tracker_pending = []
+
+        loop = asyncio.get_event_loop()
+        failed = await loop.run_in_executor(None, cls._create_asset_tracker_events, records)
+        cls._asset_tracker_pending.extend(failed)
+        return not failed
+
+    @classmethod
+    def _create_asset_tracker_events(cls, records):
+        """Sends asset tracker records to the core, runs in a worker thread
+
+        Returns:
+            The records to send again
+        """
+        failed = []
+        for record in records:
+            asset, event, service, plugin = record
+            try:
+                cls._asset_tracker_client.create_asset_tracker_event(
+                    {"asset": asset, "event": event, "service": service, "plugin": plugin})
+            except MicroserviceManagementClientError as ex:
+                if ex.status is not None and ex.status < 500:
+                    # Rejected by the core, a retry would fail as well
+                    _LOGGER.error('Asset tracker record %s not registered, %s', record, ex.reason)
+                    continue
+                _LOGGER.warning('Asset tracker record %s not registered, retrying later, %s', record, ex.reason)
+                failed.append(record)
+            except Exception as ex:
+                _LOGGER.warning('Asset tracker record %s not registered, retrying later, %s', record, str(ex))
+                failed.append(record)
+        return failed
+
     @classmethod
     def is_available(cls) -> bool:
         """Indicates whether all lists are currently full
@@ -491,33 +724,8 @@ class Ingest(object):
             # cls._logger = logger.setup(__name__, destination=logger.CONSOLE, level=logging.DEBUG)
 
         try:
-            if asset is None:
-                raise ValueError('asset can not be None')
-
-            if not isinstance(asset, str):
-                raise TypeError('asset must be a string')
-
-            if timestamp is None:
-                raise ValueError('timestamp can not be None')
-
-            # if not isinstance(timestamp, datetime.datetime):
-            #     # validate
-            #     timestamp = dateutil.parser.parse(timestamp)
-
-            if key is not None and not isinstance(key, uuid.UUID):
-                # Validate
-                if not isinstance(key, str):
-                    raise TypeError('key must be a uuid.UUID or a string')
-                # If key is not a string, uuid.UUID throws an Exception that appears to
-                # be a TypeError but can not be caught as a TypeError
-                key = uuid.UUID(key)
-
-            if readings is None:
-                readings = dict()
-            elif not isinstance(readings, dict):
-                # Postgres allows values like 5 be converted to JSON
-                # Downstream processors can not handle this
-                raise TypeError('readings must be a dictionary')
+            cls._validate_asset(asset)
+            key, readings = cls._validate_reading(timestamp, key, readings)
         except Exception:
             cls.increment_discarded_readings()
             raise
@@ -533,27 +741,12 @@ class Ingest(object):
         list_index = cls._current_readings_list_index
         readings_list = cls._readings_lists[list_index]
 
-        read = dict()
-        read['asset_code'] = asset
-        read['read_key'] = str(key)
-        read['reading'] = readings
-        read['user_ts'] = timestamp
-        readings_list.append(read)
+        # Increment the count of received readings to be used for statistics update
+        asset, _ = cls._count_readings(cls._asset_code(asset), 1)
 
-        list_size = len(readings_list)
+        readings_list.append((asset, key, readings, timestamp))
 
-        # Increment the count of received readings to be used for statistics update
-        if asset.upper() in cls._sensor_stats:
-            cls._sensor_stats[asset.upper()] += 1
-        else:
-            cls._sensor_stats[asset.upper()] = 1
-
-        # asset tracker checking
-        payload = {"asset": asset, "event": "Ingest", "service": cls._parent_service._name,
-                   "plugin": cls._parent_service._plugin_info['config']['plugin']['default']}
-        if payload not in cls._payload_events:
-            cls._parent_service._core_microservice_management_client.create_asset_tracker_event(payload)
-            cls._payload_events.append(payload)
+        list_size = len(readings_list)
 
         # _LOGGER.debug('Add readings list index: %s size: %s', cls._current_readings_list_index, list_size)
 
@@ -574,3 +767,229 @@ class Ingest(object):
                     # _LOGGER.debug('Change Ingest Queue: from #%s (len %s) to #%s', cls._current_readings_list_index,
                     #               len(cls._readings_lists[list_index]), list_index)
                     break
+
+    @classmethod
+    async def add_readings_bulk(cls, asset: str, readings: list) -> int:
+        """Adds readings records of one asset to FogLAMP in a single pass
+
+        Args:
+            asset: Identifies the asset to which the readings belong
+            readings:
+                A list of (timestamp, key, readings) tuples, each as the arguments of the same
+                name of :meth:`add_readings`
+
+        Returns:
+            The number of readings records added. The records that are invalid, or do not fit in
+            the buffer, are counted as discarded.
+
+        Raises:
+            RuntimeError:
+                The server has not been started
+
+            ValueError, TypeError:
+                An invalid asset or readings list was provided; all the readings are discarded
+        """
+        if cls._stop:
+            _LOGGER.warning('The South Service is stopping')
+            return 0
+
+        if not cls._started:
+            raise RuntimeError('The South Service was not started')
+
+        try:
+            cls._validate_asset(asset)
+            if not isinstance(readings, list):
+                raise TypeError('readings must be a list')
+        except Exception:
+            if isinstance(readings, list):
+                cls._discarded_readings_stats += len(readings)
+            else:
+                cls.increment_discarded_readings()
+            raise
+
+        if not readings:
+            return 0
+
+        asset_code = cls._asset_code(asset)
+        asset = asset_code[0]
+        records = []
+        error = None
+        for item in readings:
+            try:
+                timestamp, key, reading = item
+                key, reading = cls._validate_reading(timestamp, key, reading)
+            except Exception as ex:
+                error = ex
+                continue
+            records.append((asset, key, reading, timestamp))
+        if error is not None:
+            _LOGGER.warning('Discarded %s invalid readings of asset %s, %s', len(readings) - len(records), asset,
+                            str(error))
+
+        added = cls._buffer_readings(records)
+        if added:
+            cls._count_readings(asset_code, added)
+        cls._discarded_readings_stats += len(readings) - added
+        return added
+
+    @classmethod
+    async def add_readings_multi(cls, readings: list) -> int:
+        """Adds readings records of any number of assets to FogLAMP in a single pass
+
+        Args:
+            readings:
+                A list of {'asset', 'timestamp', 'key', 'readings'} dicts, as returned by the
+                plugin_poll of south plugins. The records are buffered in list order.
+
+        Returns:
+            The number of readings records added. The records that are invalid, or do not fit in
+            the buffer, are counted as discarded.
+
+        Raises:
+            RuntimeError:
+                The server has not been started
+
+            TypeError:
+                readings is not a list; it is discarded
+        """
+        if cls._stop:
+            _LOGGER.warning('The South Service is stopping')
+            return 0
+
+        if not cls._started:
+            raise RuntimeError('The South Service was not started')
+
+        if not isinstance(readings, list):
+            cls.increment_discarded_readings()
+            raise TypeError('readings must be a list')
+
+        records = []
+        error = None
+        for data in readings:
+            try:
+                asset = data['asset']
+                timestamp = data['timestamp']
+                cls._validate_asset(asset)
+                key, reading = cls._validate_reading(timestamp, data.get('key'), data.get('readings'))
+            except Exception as ex:
+                error = ex
+                continue
+            records.append((cls._asset_code(asset)[0], key, reading, timestamp))
+        if error is not None:
+            _LOGGER.warning('Discarded %s invalid readings, %s', len(readings) - len(records), str(error))
+
+        added = cls._buffer_readings(records)
+        for asset, _, _, _ in records[:added]:
+            cls._count_readings(cls._asset_code(asset), 1)
+        cls._discarded_readings_stats += len(readings) - added
+        return added
+
+    @classmethod
+    def _buffer_readings(cls, records: list) -> int:
+        """Adds validated (asset_code, read_key, reading, user_ts) records to the readings lists,
+        a slice per list rather than a record at a time
+
+        Returns:
+            The number of records added, a prefix of records; the rest did not fit in the buffer
+        """
+        added = 0
+        while added < len(records) and cls.is_available():
+            list_index = cls._current_readings_list_index
+            readings_list = cls._readings_lists[list_index]
+            list_size = len(readings_list)
+
+            # Fill up to the batch size, as add_readings does, unless all the lists have reached it
+            limit = cls._readings_list_size
+            if list_size < cls._readings_insert_batch_size:
+                limit = min(limit, cls._readings_insert_batch_size)
+            chunk = records[added:added + limit - list_size]
+            readings_list.extend(chunk)
+            added += len(chunk)
+
+            if list_size == 0:
+                cls._readings_list_not_empty[list_index].set()
+
+            if list_size < cls._readings_insert_batch_size <= len(readings_list):
+                cls._readings_list_batch_size_reached[list_index].set()
+
+            if cls._max_concurrent_readings_inserts > 1 and len(readings_list) >= cls._readings_insert_batch_size:
+                for list_index in range(cls._max_concurrent_readings_inserts):
+                    if len(cls._readings_lists[list_index]) < cls._readings_insert_batch_size:
+                        cls._current_readings_list_index = list_index
+                        break
+        return added
+
+    @classmethod
+    def _asset_code(cls, asset: str) -> tuple:
+        """Returns the asset code and statistics key of a valid asset
+
+        Once :meth:`_count_readings` has accepted a reading of the asset, buffered readings of the
+        asset share its interned asset code string.
+        """
+        asset_code = cls._asset_codes.get(asset)
+        if asset_code is None:
+            asset_code = (asset, asset.upper())
+        return asset_code
+
+    @classmethod
+    def _count_readings(cls, asset_code: tuple, count: int) -> tuple:
+        """Counts readings of an asset accepted into the readings lists in its statistics
+
+        The asset tracker record and statistics key of an asset are set up the first time one of
+        its readings is accepted, so that an asset whose readings are all discarded is not tracked.
+
+        Returns:
+            The interned asset code and statistics key of the asset
+        """
+        registered = cls._asset_codes.get(asset_code[0])
+        if registered is None:
+            asset = sys.intern(asset_code[0])
+            registered = cls._asset_codes[asset] = (asset, asset_code[1])
+            cls._sensor_stats.setdefault(registered[1], 0)
+            cls._track_asset(asset)
+        cls._sensor_stats[registered[1]] += count
+        return registered
+
+    @staticmethod
+    def _validate_asset(asset):
+        """Raises ValueError or TypeError when asset is not a valid asset code"""
+        if asset is None:
+            raise ValueError('asset can not be None')
+
+        if not isinstance(asset, str):
+            raise TypeError('asset must be a string')
+
+    @staticmethod
+    def _validate_reading(timestamp, key, readings) -> tuple:
+        """Validates the timestamp, key and readings of an asset readings record
+
+        Returns:
+            The read_key to buffer, None when there is no key, and the readings dictionary
+
+        Raises:
+            ValueError, TypeError:
+                An invalid value was provided
+        """
+        if timestamp is None:
+            raise ValueError('timestamp can not be None')
+
+        # if not isinstance(timestamp, datetime.datetime):
+        #     # validate
+        #     timestamp = dateutil.parser.parse(timestamp)
+
+        if key is not None and not isinstance(key, uuid.UUID):
+            # Validate
+            if not isinstance(key, str):
+                raise TypeError('key must be a uuid.UUID or a string')
+            # If key is not a string, uuid.UUID throws an Exception that appears to
+            # be a TypeError but can not be caught as a TypeError
+            key = uuid.UUID(key)
+
+        if readings is None:
+            readings = dict()
+        elif not isinstance(readings, dict):
+            # Postgres allows values like 5 be converted to JSON
+            # Downstream processors can not handle this
+            raise TypeError('readings must be a dictionary')
+
+        return None if key is None else str(key), readings
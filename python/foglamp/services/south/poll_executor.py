@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+"""Executors running the calls of a poll type south plugin
+
+A plugin_poll call that blocks, e.g. on a slow Modbus or serial device, stalls the event
+loop of the south service when it is made inline. The thread and process executors make
+the plugin calls elsewhere and await them, so that ingest, statistics and the management
+API keep running while the device is polled.
+
+    inline   the plugin is called on the event loop (default)
+    thread   the plugin is called on a dedicated thread
+    process  the plugin is loaded and called in a dedicated child process
+"""
+
+import asyncio
+import concurrent.futures
+import copy
+import importlib
+
+from foglamp.common import logger
+
+__author__ = "Ashish Jabble"
+__copyright__ = "Copyright (c) 2026 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_LOGGER = logger.setup(__name__)
+
+POLL_MODES = ['inline', 'thread', 'process']
+""" Values of the pollMode configuration item """
+
+
+class InlinePollExecutor(object):
+    """ Calls the plugin on the event loop """
+
+    def __init__(self, plugin):
+        self._plugin = plugin
+
+    async def start(self, config):
+        """ Initialises the plugin and returns its handle """
+        return self._plugin.plugin_init(config)
+
+    async def poll(self, handle):
+        return self._plugin.plugin_poll(handle)
+
+    async def reconfigure(self, handle, config):
+        return self._plugin.plugin_reconfigure(handle, config)
+
+    async def shutdown(self, handle):
+        self._plugin.plugin_shutdown(handle)
+
+
+class ThreadPollExecutor(InlinePollExecutor):
+    """ Calls the plugin on a single dedicated thread
+
+    All calls go to the same thread, one at a time, so plugins keeping thread bound state
+    (e.g. an open serial port) work as when called inline.
+    """
+
+    def __init__(self, plugin):
+        super().__init__(plugin)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    async def _call(self, func, *args):
+        return await asyncio.get_event_loop().run_in_executor(self._executor, func, *args)
+
+    async def start(self, config):
+        return await self._call(self._plugin.plugin_init, config)
+
+    async def poll(self, handle):
+        return await self._call(self._plugin.plugin_poll, handle)
+
+    async def reconfigure(self, handle, config):
+        return await self._call(self._plugin.plugin_reconfigure, handle, config)
+
+    async def shutdown(self, handle):
+        try:
+            await self._call(self._plugin.plugin_shutdown, handle)
+        finally:
+            self._executor.shutdown(wait=False)
+
+
+# Plugin state of the child process of a ProcessPollExecutor
+_child_plugin = None
+_child_handle = None
+
+
+def _child_load(module_name):
+    global _child_plugin
+    _child_plugin = importlib.import_module(module_name)
+
+
+def _child_start(config):
+    global _child_handle
+    _child_handle = _child_plugin.plugin_init(config)
+
+
+def _child_poll():
+    return _child_plugin.plugin_poll(_child_handle)
+
+
+def _child_reconfigure(config):
+    global _child_handle
+    _child_handle = _child_plugin.plugin_reconfigure(_child_handle, config)
+    return _child_handle.get('restart', 'no')
+
+
+def _child_shutdown():
+    _child_plugin.plugin_shutdown(_child_handle)
+
+
+class ProcessPollExecutor(object):
+    """ Loads and calls the plugin in a dedicated child process
+
+    The plugin handle lives in the child process, so it does not need to be picklable. The
+    handle returned to the service is a copy of the configuration it was initialised with,
+    holding the 'restart' value returned by plugin_reconfigure. Readings are pickled back.
+
+    The child process is started again if it dies, e.g. on a crash of a native device library,
+    the poll which was running fails and the next one initialises the plugin again.
+    """
+
+    def __init__(self, module_name):
+        self._module_name = module_name
+        self._config = None
+        self._executor = None  # type: concurrent.futures.ProcessPoolExecutor
+
+    def _create_executor(self):
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=1, initializer=_child_load, initargs=(self._module_name,))
+
+    async def _call(self, func, *args):
+        return await asyncio.get_event_loop().run_in_executor(self._executor, func, *args)
+
+    async def start(self, config):
+        self._config = config
+        self._create_executor()
+        await self._call(_child_start, config)
+        return copy.deepcopy(config)
+
+    async def poll(self, handle):
+        try:
+            return await self._call(_child_poll)
+        except concurrent.futures.process.BrokenProcessPool:
+            _LOGGER.error('Poll process of plugin %s died, starting it again', self._module_name)
+            self._executor.shutdown(wait=False)
+            await self.start(self._config)
+            raise
+
+    async def reconfigure(self, handle, config):
+        restart = await self._call(_child_reconfigure, config)
+        self._config = config
+        new_handle = copy.deepcopy(config)
+        new_handle['restart'] = restart
+        return new_handle
+
+    async def shutdown(self, handle):
+        try:
+            await self._call(_child_shutdown)
+        finally:
+            self._executor.shutdown(wait=True)
+
+
+class PollStatistics(object):
+    """ Durations and jitter of the polls of a plugin, in milliseconds """
+
+    def __init__(self):
+        self.polls = 0
+        self.overruns = 0
+        self._duration_total = 0.0
+        self._jitter_total = 0.0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self.last_jitter = 0.0
+        self.max_jitter = 0.0
+
+    def add_poll(self, jitter, duration):
+        """ Records a poll started jitter seconds past the time it was due and which took duration seconds """
+        jitter = max(jitter, 0.0) * 1000
+        duration = duration * 1000
+        self.polls += 1
+        self._jitter_total += jitter
+        self._duration_total += duration
+        self.last_jitter = jitter
+        self.last_duration = duration
+        self.max_jitter = max(self.max_jitter, jitter)
+        self.max_duration = max(self.max_duration, duration)
+
+    def add_overruns(self, count):
+        """ Records count polls skipped because a poll ran past their time """
+        self.overruns += count
+
+    def to_dict(self):
+        average = (lambda total: round(total / self.polls, 3) if self.polls else 0.0)
+        return {
+            'polls': self.polls,
+            'overruns': self.overruns,
+            'lastDuration': round(self.last_duration, 3),
+            'averageDuration': average(self._duration_total),
+            'maxDuration': round(self.max_duration, 3),
+            'lastJitter': round(self.last_jitter, 3),
+            'averageJitter': average(self._jitter_total),
+            'maxJitter': round(self.max_jitter, 3),
+        }
+
+
+def create(mode, plugin, module_name):
+    """ Returns the executor for the pollMode value mode
+
+    Args:
+        mode: one of POLL_MODES, any other value falls back to inline
+        plugin: the plugin module loaded by the service
+        module_name: name the plugin module is imported by, for the process executor
+    """
+    if mode == 'thread':
+        return ThreadPollExecutor(plugin)
+    if mode == 'process':
+        return ProcessPollExecutor(module_name)
+    if mode != 'inline':
+        _LOGGER.warning('Unknown poll mode %s, calling plugin %s inline', mode, module_name)
+    return InlinePollExecutor(plugin)
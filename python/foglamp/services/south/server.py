@@ -8,8 +8,11 @@
 
 import json
 import asyncio
+import math
 import sys
+import time
 from foglamp.services.south import exceptions
+from foglamp.services.south import poll_executor
 from foglamp.common import logger
 from foglamp.services.south.ingest import Ingest
 from foglamp.services.common.microservice import FoglampMicroservice
@@ -29,7 +32,17 @@ _CLEAR_PENDING_TASKS_TIMEOUT = 3
 class Server(FoglampMicroservice):
     """" Implements the South Microservice """
 
-    _DEFAULT_CONFIG = {}  # South Server configuration which will get updated with process configuration from DB.
+    _DEFAULT_CONFIG = {
+        'pollMode': {
+            'description': 'Where the calls of a poll plugin run, inline on the event loop, on a dedicated '
+                           'thread or in a dedicated process. Use thread or process for plugins that block '
+                           'while polling slow devices',
+            'type': 'enumeration',
+            'options': poll_executor.POLL_MODES,
+            'default': 'inline',
+            'displayName': 'Poll Mode'
+        }
+    }  # South Server configuration which will get updated with process configuration from DB.
 
     _PLUGIN_MODULE_PATH = "foglamp.plugins.south"
 
@@ -55,6 +68,17 @@ class Server(FoglampMicroservice):
     _plugin_handle = None
     """The value that is returned by the plugin_init"""
 
+    _plugin_module_name = None
+    """The name the plugin's module is imported by"""
+
+    _poll_executor = None
+    """Executor making the plugin calls, see foglamp.services.south.poll_executor"""
+
+    _poll_mode = None
+
+    _poll_statistics = None
+    """Durations and jitter of the polls of a poll plugin"""
+
     _type = "Southbound"
 
     _task_main = None
@@ -95,6 +119,7 @@ class Server(FoglampMicroservice):
                                                                 dir=plugin_module_name,
                                                                 file=plugin_module_name)
                 self._plugin = __import__(import_file_name, fromlist=[''])
+                self._plugin_module_name = import_file_name
             except Exception as ex:
                 message = self._MESSAGES_LIST['e000003'].format(plugin_module_name, self._name, str(ex))
                 _LOGGER.error(message)
@@ -144,7 +169,8 @@ class Server(FoglampMicroservice):
                 _LOGGER.error(message)
                 raise exceptions.InvalidPluginTypeError()
 
-            self._plugin_handle = self._plugin.plugin_init(self.config)
+            self._create_poll_executor(self.config)
+            self._plugin_handle = await self._poll_executor.start(self.config)
             await Ingest.start(self)
 
             # Executes the requested plugin type
@@ -162,6 +188,15 @@ class Server(FoglampMicroservice):
             _LOGGER.exception(error)
             asyncio.ensure_future(self._stop(loop))
 
+    def _create_poll_executor(self, config):
+        """Creates the executor for the plugin calls, from the pollMode item of config for a poll plugin
+        """
+        if self._plugin_info['mode'] == 'poll':
+            self._poll_mode = config.get('pollMode', {}).get('value', 'inline')
+        else:
+            self._poll_mode = 'inline'
+        self._poll_executor = poll_executor.create(self._poll_mode, self._plugin, self._plugin_module_name)
+
     async def _exec_plugin_async(self) -> None:
         """Executes async type plugin
         """
@@ -182,39 +217,47 @@ class Server(FoglampMicroservice):
         sleep_seconds = int(self._plugin_handle['pollInterval']['value']) / 1000.0
         _TIME_TO_WAIT_BEFORE_RETRY = sleep_seconds
 
+        if self._poll_statistics is None:
+            self._poll_statistics = poll_executor.PollStatistics()
+        loop = self._event_loop
+        # Polls are due at fixed intervals from next_poll, whatever the time a poll takes
+        next_poll = loop.time()
         while self._plugin and try_count <= _MAX_RETRY_POLL:
             try:
-                t1 = self._event_loop.time()
-                data = self._plugin.plugin_poll(self._plugin_handle)
+                started = loop.time()
+                data = await self._poll_executor.poll(self._plugin_handle)
+                self._poll_statistics.add_poll(jitter=started - next_poll, duration=loop.time() - started)
                 if len(data) > 0:
+                    # The whole poll is buffered in one call, in order; readings that do not fit are
+                    # counted as discarded before the next poll
                     if isinstance(data, list):
-                        for reading in data:
-                            asyncio.ensure_future(Ingest.add_readings(asset=reading['asset'],
-                                                                        timestamp=reading['timestamp'],
-                                                                        key=reading['key'],
-                                                                        readings=reading['readings']))
+                        await Ingest.add_readings_multi(data)
                     elif isinstance(data, dict):
-                        asyncio.ensure_future(Ingest.add_readings(asset=data['asset'],
-                                                                  timestamp=data['timestamp'],
-                                                                  key=data['key'],
-                                                                  readings=data['readings']))
-                delta = self._event_loop.time() - t1
-                # If delta somehow becomes > sleep_seconds, then ignore delta
-                sleep_for = sleep_seconds - delta if delta < sleep_seconds else sleep_seconds
-                await asyncio.sleep(sleep_for)
+                        await Ingest.add_readings_multi([data])
+                next_poll += sleep_seconds
+                now = loop.time()
+                if now > next_poll:
+                    # The poll overran its interval, skip the polls missed rather than running them back to back
+                    missed = math.ceil((now - next_poll) / sleep_seconds)
+                    self._poll_statistics.add_overruns(missed)
+                    next_poll += missed * sleep_seconds
+                await asyncio.sleep(next_poll - now)
             except asyncio.CancelledError:
-                pass
+                break
             except KeyError as ex:
                 try_count = 2
                 _LOGGER.exception('Key error plugin {} : {}'.format(self._name, str(ex)))
+                next_poll = loop.time()
             except exceptions.QuietError:
                 try_count = 2
                 await asyncio.sleep(_TIME_TO_WAIT_BEFORE_RETRY)
+                next_poll = loop.time()
             except (Exception, RuntimeError, exceptions.DataRetrievalError) as ex:
                 try_count = 2
                 _LOGGER.error('Failed to poll for plugin {}'.format(self._name))
                 _LOGGER.debug('Exception poll plugin {}'.format(str(ex)))
                 await asyncio.sleep(_TIME_TO_WAIT_BEFORE_RETRY)
+                next_poll = loop.time()
 
         _LOGGER.warning('Stopped all polling tasks for plugin: {}'.format(self._name))
 
@@ -229,7 +272,10 @@ class Server(FoglampMicroservice):
     async def _stop(self, loop):
         if self._plugin is not None:
             try:
-                self._plugin.plugin_shutdown(self._plugin_handle)
+                if self._poll_executor is None:
+                    self._plugin.plugin_shutdown(self._plugin_handle)
+                else:
+                    await self._poll_executor.shutdown(self._plugin_handle)
             except Exception as ex:
                 _LOGGER.exception("Unable to stop plugin '%s' | reason: %s", self._name, str(ex))
                 #  must not prevent FogLAMP shutting down cleanly via the API call.
@@ -237,6 +283,7 @@ class Server(FoglampMicroservice):
             finally:
                 self._plugin = None
                 self._plugin_handle = None
+                self._poll_executor = None
 
         try:
             await Ingest.stop()
@@ -292,6 +339,19 @@ class Server(FoglampMicroservice):
                 "message": "http://{}:{}/foglamp/service/shutdown".format(
                     self._microservice_management_host, self._microservice_management_port)})
 
+    async def ping(self, request):
+        """ health check, with the readings insert counters of the ingest lists and the poll statistics of
+        a poll plugin
+
+        Durations and jitter are in milliseconds. Jitter is the delay of a poll past the time it was due,
+        overruns counts the polls skipped because a poll took longer than pollInterval.
+        """
+        since_started = time.time() - self._start_time
+        response = {'uptime': since_started, 'ingest': Ingest.get_insert_statistics()}
+        if self._poll_statistics is not None:
+            response['poll'] = dict(self._poll_statistics.to_dict(), mode=self._poll_mode)
+        return web.json_response(response)
+
     async def change(self, request):
         """implementation of abstract method form foglamp.common.microservice.
         """
@@ -305,8 +365,20 @@ class Server(FoglampMicroservice):
             if 'filter' in new_config:
                 _LOGGER.warning('South Service [%s] does not support the use of a filter pipeline.', self._name)
 
-            # plugin_reconfigure and assign new handle
-            new_handle = self._plugin.plugin_reconfigure(self._plugin_handle, new_config)
+            new_mode = new_config.get('pollMode', {}).get('value', 'inline')
+            if self._plugin_info['mode'] == 'poll' and self._poll_executor is not None and new_mode != self._poll_mode:
+                # The plugin moves to another executor, it is shut down and initialised there with the new config
+                _LOGGER.info('Poll mode of South plugin %s changed from %s to %s', self._name, self._poll_mode, new_mode)
+                self._task_main.cancel()
+                await self._poll_executor.shutdown(self._plugin_handle)
+                self._create_poll_executor(new_config)
+                new_handle = await self._poll_executor.start(new_config)
+                new_handle['restart'] = 'yes'
+            elif self._poll_executor is not None:
+                # plugin_reconfigure and assign new handle
+                new_handle = await self._poll_executor.reconfigure(self._plugin_handle, new_config)
+            else:
+                new_handle = self._plugin.plugin_reconfigure(self._plugin_handle, new_config)
             self._plugin_handle = new_handle
 
             _LOGGER.info('Reconfiguration done for South plugin {}'.format(self._name))
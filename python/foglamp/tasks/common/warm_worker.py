@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+"""Warm worker for scheduled Python tasks
+
+The scheduler starts warm workers ahead of time. A worker imports the modules of the
+Python tasks and looks up the storage service, then waits on stdin for a single task
+invocation, a JSON line {"module": ..., "argv": [...]}. It runs the task module as
+__main__ in the same process and exits with it, so the scheduler keeps tracking the
+task by the worker pid and cancels it by terminating the worker.
+
+    python3 -m foglamp.tasks.common.warm_worker --address=127.0.0.1 --port=<core management port>
+"""
+
+import argparse
+import importlib
+import json
+import runpy
+import sys
+
+from foglamp.common import logger
+from foglamp.common.storage_client.storage_client import StorageClientAsync
+
+__author__ = "Ashish Jabble"
+__copyright__ = "Copyright (c) 2026 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_logger = logger.setup(__name__)
+
+TASK_MODULES = {
+    "tasks/purge": "foglamp.tasks.purge",
+    "tasks/north": "foglamp.tasks.north.sending_process",
+}
+"""Scheduled process script to the module run by a warm worker, scripts not listed always start a new process.
+
+tasks/statistics is not listed: its script runs the task under cpulimit on Raspbian, which a warm worker
+would bypass.
+"""
+
+_PRELOAD_MODULES = [
+    "aiohttp",
+    "foglamp.common.audit_logger",
+    "foglamp.common.jqfilter",
+    "foglamp.common.process",
+    "foglamp.common.statistics",
+    "foglamp.plugins.north.common.common",
+    "foglamp.services.core.api.plugins.common",
+    "foglamp.tasks.purge.purge",
+]
+"""Modules imported by a worker before it waits for its task.
+
+These are the dependencies of the task modules, not the modules run as __main__: runpy would run those a
+second time, and warns about it.
+"""
+
+
+def _preload():
+    for module in _PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+        except Exception as ex:
+            # The task will fail the same way once started, and report it
+            _logger.warning("Unable to preload module %s, %s", module, str(ex))
+
+
+def _resolve_storage(address, port):
+    try:
+        StorageClientAsync(address, port).keep_service(address, port)
+    except Exception as ex:
+        # Clients look the storage service up themselves
+        _logger.warning("Unable to look up the storage service, %s", str(ex))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--address", required=True)
+    parser.add_argument("--port", required=True, type=int)
+    namespace, _ = parser.parse_known_args()
+
+    _preload()
+    _resolve_storage(namespace.address, namespace.port)
+
+    line = sys.stdin.readline()
+    if not line:
+        # The pool was stopped before a task was handed over
+        return
+
+    invocation = json.loads(line)
+    sys.argv = invocation["argv"]
+    runpy.run_module(invocation["module"], run_name="__main__", alter_sys=True)
+
+
+if __name__ == '__main__':
+    main()
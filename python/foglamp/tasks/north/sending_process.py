@@ -16,6 +16,7 @@
 """
 
 import importlib
+import collections
 import aiohttp
 import resource
 import asyncio
@@ -196,6 +197,9 @@ class SendingProcess(FoglampProcess):
     _logger = None  # type: logging.Logger
     _stop_execution = False
     """ sets to True when a signal is captured and a termination is needed """
+    _readings_schemas = {}
+    """ asset code -> schema of its readings, filled as the assets are sent and used to convert the values to
+    their types """
     TASK_FETCH_SLEEP = 0.5
     """ The amount of time the fetch operation will sleep if there are no more data to load or in case of an error """
     TASK_SEND_SLEEP = 0.5
@@ -210,6 +214,20 @@ class SendingProcess(FoglampProcess):
     _AUDIT_CODE = "STRMN"
     """Audit code to use"""
 
+    _LAST_OBJECT_UPDATE_PAYLOAD = payload_builder.PayloadBuilder() \
+        .SET(last_object=payload_builder.Param('last_object'), ts='now()') \
+        .WHERE(['id', '=', payload_builder.Param('stream_id')]) \
+        .compile()
+    """Updates the position reached by a stream, rendered for every block sent"""
+
+    _STATISTICS_HISTORY_PAYLOAD = payload_builder.PayloadBuilder() \
+        .SELECT("id", "key", '{"column": "ts", "timezone": "UTC"}', "value", "history_ts") \
+        .WHERE(['id', '>', payload_builder.Param('last_object_id')]) \
+        .LIMIT(payload_builder.Param('block_size')) \
+        .ORDER_BY(['id', 'ASC']) \
+        .compile()
+    """Fetches a block of statistics history, rendered for every block loaded"""
+
     _CONFIG_CATEGORY_NAME = 'SEND_PR'
     _CONFIG_CATEGORY_DESCRIPTION = 'Sending Process'
     _CONFIG_DEFAULT = {
@@ -246,6 +264,14 @@ class SendingProcess(FoglampProcess):
             "default": "10",
             "order": "12",
             "displayName": "Memory Buffer Size"
+        },
+        "max_blocks_in_flight": {
+            "description": "Number of blocks the plugin sends concurrently, blocks are acknowledged in order. "
+                           "1 sends a block at a time",
+            "type": "integer",
+            "default": "1",
+            "order": "13",
+            "displayName": "Max Blocks In Flight"
         }
     }
 
@@ -260,6 +286,7 @@ class SendingProcess(FoglampProcess):
             'blockSize': int(self._CONFIG_DEFAULT['blockSize']['default']),
             'sleepInterval': float(self._CONFIG_DEFAULT['sleepInterval']['default']),
             'memory_buffer_size': int(self._CONFIG_DEFAULT['memory_buffer_size']['default']),
+            'max_blocks_in_flight': int(self._CONFIG_DEFAULT['max_blocks_in_flight']['default']),
         }
         self._config_from_manager = ""
         self._module_template = "foglamp.plugins.north." + "empty." + "empty"
@@ -295,6 +322,10 @@ class SendingProcess(FoglampProcess):
         self._memory_buffer_fetch_idx = 0
         self._memory_buffer_send_idx = 0
         """" Used to to managed the in memory buffer for the fetch/send operations """
+        self._pipeline_stats = {'in_flight': 0, 'max_in_flight': 0, 'blocks_sent': 0, 'blocks_failed': 0}
+        """" Queue depths and counters of the fetch/send operations, see get_pipeline_statistics """
+        self._jqfilter = JQFilter()
+        """" Applies filterRule to the blocks of data, keeps the filter compiled across blocks """
         self._event_loop = asyncio.get_event_loop() if loop is None else loop
 
     @staticmethod
@@ -326,10 +357,8 @@ class SendingProcess(FoglampProcess):
     async def _last_object_id_update(self, new_last_object_id):
         """ Updates reached position"""
         try:
-            payload = payload_builder.PayloadBuilder() \
-                .SET(last_object=new_last_object_id, ts='now()') \
-                .WHERE(['id', '=', self._stream_id]) \
-                .payload()
+            payload = self._LAST_OBJECT_UPDATE_PAYLOAD.render(last_object=new_last_object_id,
+                                                              stream_id=self._stream_id)
             await self._storage_async.update_tbl("streams", payload)
         except Exception as _ex:
             SendingProcess._logger.error(_MESSAGES_LIST["e000020"].format(_ex))
@@ -360,6 +389,8 @@ class SendingProcess(FoglampProcess):
                     new_last_object_id = None
                     num_sent = 0
                     if self._memory_buffer[self._memory_buffer_send_idx] is not None:  # if there are data to send
+                        self._pipeline_stats['in_flight'] = 1
+                        self._pipeline_stats['max_in_flight'] = 1
                         try:
                             data_sent, new_last_object_id, num_sent = \
                                 await self._plugin.plugin_send(self._plugin_handle,
@@ -371,24 +402,21 @@ class SendingProcess(FoglampProcess):
                             data_sent = False
                             slept = True
                             await asyncio.sleep(sleep_time)
+                        self._pipeline_stats['in_flight'] = 0
 
                         if data_sent:
-                            # asset tracker checking
-                            for _reads in self._memory_buffer[self._memory_buffer_send_idx]:
-                                payload = {"asset": _reads['asset_code'], "event": "Egress", "service": self._name,
-                                           "plugin": self._config['plugin']}
-                                if payload not in self._tracked_assets:
-                                    self._core_microservice_management_client.create_asset_tracker_event(
-                                        payload)
-                                    self._tracked_assets.append(payload)
+                            self._track_egress_assets(self._memory_buffer[self._memory_buffer_send_idx])
 
                             db_update = True
                             update_last_object_id = new_last_object_id
                             tot_num_sent = tot_num_sent + num_sent
                             self._memory_buffer[self._memory_buffer_send_idx] = None
                             self._memory_buffer_send_idx += 1
+                            self._pipeline_stats['blocks_sent'] += 1
                             self._task_send_data_sem.release()
                             self.performance_track("task _task_send_data")
+                        else:
+                            self._pipeline_stats['blocks_failed'] += 1
                     else:
                         # Updates the position before going to wait for the semaphore
                         if db_update:
@@ -428,6 +456,132 @@ class SendingProcess(FoglampProcess):
             await self._audit.failure(self._AUDIT_CODE, {"error - on _task_send_data": _message})
             raise
 
+    async def _task_send_data_pipelined(self):
+        """ Sends the data from the in memory structure to the destination using the loaded plugin, with up to
+        max_blocks_in_flight blocks sent concurrently
+
+        Blocks are acknowledged in the order they were loaded, so the position reached is only moved past a block
+        once it and all the blocks before it have been sent. When a block fails, the blocks sent after it are sent
+        again with it.
+        """
+        max_in_flight = min(self._config['max_blocks_in_flight'], self._config['memory_buffer_size'])
+        in_flight = collections.deque()
+        """ (memory buffer index, plugin_send future) of the blocks being sent, oldest first """
+        db_update = False
+        update_last_object_id = 0
+        tot_num_sent = 0
+        update_position_idx = 0
+        _message = None
+
+        try:
+            self._memory_buffer_send_idx = 0
+            sleep_time = self.TASK_SEND_SLEEP
+            sleep_num_increments = 1
+
+            while self._task_send_data_run or in_flight:
+                # Starts sending the loaded blocks, up to max_in_flight
+                while self._task_send_data_run and len(in_flight) < max_in_flight and \
+                        self._memory_buffer[self._memory_buffer_send_idx] is not None:
+                    idx = self._memory_buffer_send_idx
+                    in_flight.append((idx, asyncio.ensure_future(
+                        self._plugin.plugin_send(self._plugin_handle, self._memory_buffer[idx], self._stream_id))))
+                    self._memory_buffer_send_idx = (idx + 1) % self._config['memory_buffer_size']
+                self._pipeline_stats['in_flight'] = len(in_flight)
+                self._pipeline_stats['max_in_flight'] = max(self._pipeline_stats['max_in_flight'], len(in_flight))
+
+                if not in_flight:
+                    # Updates the position before going to wait for the semaphore
+                    if db_update:
+                        await self._update_position_reached(update_last_object_id, tot_num_sent)
+                        update_position_idx = 0
+                        tot_num_sent = 0
+                        db_update = False
+                    await self._task_fetch_data_sem.acquire()
+                    continue
+
+                # Acknowledges the oldest block
+                idx, send_future = in_flight.popleft()
+                try:
+                    data_sent, new_last_object_id, num_sent = await send_future
+                except Exception as ex:
+                    _message = _MESSAGES_LIST["e000021"].format(ex)
+                    SendingProcess._logger.error(_message)
+                    await self._audit.failure(self._AUDIT_CODE, {"error - on _task_send_data": _message})
+                    data_sent = False
+
+                if data_sent:
+                    self._track_egress_assets(self._memory_buffer[idx])
+                    db_update = True
+                    update_last_object_id = new_last_object_id
+                    tot_num_sent = tot_num_sent + num_sent
+                    self._memory_buffer[idx] = None
+                    self._pipeline_stats['blocks_sent'] += 1
+                    self._task_send_data_sem.release()
+                    self.performance_track("task _task_send_data")
+
+                    # Updates the Storage layer every 'self.UPDATE_POSITION_MAX' interactions
+                    if update_position_idx >= self.TASK_SEND_UPDATE_POSITION_MAX:
+                        await self._update_position_reached(update_last_object_id, tot_num_sent)
+                        update_position_idx = 0
+                        tot_num_sent = 0
+                        db_update = False
+                    else:
+                        update_position_idx += 1
+                else:
+                    # Sends the block again, with the ones after it that are still loaded
+                    self._pipeline_stats['blocks_failed'] += 1
+                    if in_flight:
+                        await asyncio.wait([future for _, future in in_flight])
+                        for _, future in in_flight:
+                            # The outcome does not matter, the block is sent again
+                            future.exception()
+                        in_flight.clear()
+                    self._memory_buffer_send_idx = idx
+                    if not self._task_send_data_run:
+                        break
+
+                    await asyncio.sleep(sleep_time)
+                    # Handles the sleep time, it is doubled every time up to a limit
+                    sleep_num_increments += 1
+                    sleep_time *= 2
+                    if sleep_num_increments > self.TASK_SLEEP_MAX_INCREMENTS:
+                        sleep_time = self.TASK_SEND_SLEEP
+                        sleep_num_increments = 1
+
+            # Checks if the information on the Storage layer needs to be updates
+            if db_update:
+                await self._update_position_reached(update_last_object_id, tot_num_sent)
+            self._pipeline_stats['in_flight'] = 0
+        except Exception as ex:
+            _message = _MESSAGES_LIST["e000021"].format(ex)
+            SendingProcess._logger.error(_message)
+            for _, future in in_flight:
+                future.cancel()
+            if db_update:
+                await self._update_position_reached(update_last_object_id, tot_num_sent)
+            await self._audit.failure(self._AUDIT_CODE, {"error - on _task_send_data": _message})
+            raise
+
+    def _track_egress_assets(self, block):
+        """ Registers the Egress asset tracker records of the assets of a block sent """
+        for asset_code in {_reads['asset_code'] for _reads in block} - self._tracked_assets:
+            payload = {"asset": asset_code, "event": "Egress", "service": self._name,
+                       "plugin": self._config['plugin']}
+            self._core_microservice_management_client.create_asset_tracker_event(
+                payload)
+            self._tracked_assets.add(asset_code)
+
+    def get_pipeline_statistics(self):
+        """ Returns the queue depths and counters of the fetch/send operations
+
+        fetched: blocks loaded in memory, waiting to be sent or being sent
+        in_flight: blocks being sent, max_in_flight: the highest in_flight reached
+        blocks_sent, blocks_failed: blocks acknowledged, blocks failed and sent again
+        """
+        stats = dict(self._pipeline_stats)
+        stats['fetched'] = sum(1 for block in self._memory_buffer if block is not None)
+        return stats
+
     @staticmethod
     def _transform_in_memory_data_statistics(raw_data):
         converted_data = []
@@ -458,12 +612,8 @@ class SendingProcess(FoglampProcess):
         """ Extracts statistics data from the DB Layer, converts it into the proper format"""
         raw_data = None
         try:
-            payload = payload_builder.PayloadBuilder() \
-                .SELECT("id", "key", '{"column": "ts", "timezone": "UTC"}', "value", "history_ts") \
-                .WHERE(['id', '>', last_object_id]) \
-                .LIMIT(self._config['blockSize']) \
-                .ORDER_BY(['id', 'ASC']) \
-                .payload()
+            payload = self._STATISTICS_HISTORY_PAYLOAD.render(last_object_id=last_object_id,
+                                                              block_size=self._config['blockSize'])
             statistics_history = await self._storage_async.query_tbl_with_payload('statistics_history', payload)
             raw_data = statistics_history['rows']
             converted_data = self._transform_in_memory_data_statistics(raw_data)
@@ -493,10 +643,7 @@ class SendingProcess(FoglampProcess):
                 if asset_code != "":
                     # Converts values to the proper types, for example "180.2" to float 180.2
                     payload = row['reading']
-
-                    for key in list(payload.keys()):
-                        value = payload[key]
-                        payload[key] = plugin_common.convert_to_type(value)
+                    plugin_common.convert_reading_to_type(asset_code, payload, SendingProcess._readings_schemas)
                     timestamp = apply_date_format(row['user_ts'])  # Adds timezone UTC
                     new_row = {
                         'id': row['id'],
@@ -586,17 +733,9 @@ class SendingProcess(FoglampProcess):
                         if data_to_send:
                             # Handles the JQFilter functionality
                             if self._config_from_manager['applyFilter']["value"].upper() == "TRUE":
-                                jqfilter = JQFilter()
-                                # Steps needed to proper format the data generated by the JQFilter
-                                # to the one expected by the SP
-                                data_to_send_2 = jqfilter.transform(data_to_send,
+                                # The filter output is already in the format expected by the SP
+                                data_to_send = self._jqfilter.apply(data_to_send,
                                                                     self._config_from_manager['filterRule']["value"])
-                                data_to_send_3 = json.dumps(data_to_send_2)
-                                del data_to_send_2
-                                data_to_send_4 = eval(data_to_send_3)
-                                del data_to_send_3
-                                data_to_send = data_to_send_4[0]
-                                del data_to_send_4
                             # Loads the block of data into the in memory buffer
                             self._memory_buffer[self._memory_buffer_fetch_idx] = data_to_send
                             last_position = len(data_to_send) - 1
@@ -633,8 +772,12 @@ class SendingProcess(FoglampProcess):
         self._memory_buffer = [None for _ in range(self._config['memory_buffer_size'])]
         self._task_fetch_data_sem = asyncio.Semaphore(0)
         self._task_send_data_sem = asyncio.Semaphore(0)
+        self._pipeline_stats = {'in_flight': 0, 'max_in_flight': 0, 'blocks_sent': 0, 'blocks_failed': 0}
         self._task_fetch_data_task_id = asyncio.ensure_future(self._task_fetch_data())
-        self._task_send_data_task_id = asyncio.ensure_future(self._task_send_data())
+        if self._config.get('max_blocks_in_flight', 1) > 1:
+            self._task_send_data_task_id = asyncio.ensure_future(self._task_send_data_pipelined())
+        else:
+            self._task_send_data_task_id = asyncio.ensure_future(self._task_send_data())
         self._task_fetch_data_run = True
         self._task_send_data_run = True
 
@@ -667,6 +810,12 @@ class SendingProcess(FoglampProcess):
             await self._task_send_data_task_id
         except Exception as ex:
             SendingProcess._logger.error(_MESSAGES_LIST["e000029"].format(ex))
+        # Reports the queue depths and counters of the run, in the syslog for a pipelined run
+        pipeline = self.get_pipeline_statistics()
+        if self._config.get('max_blocks_in_flight', 1) > 1:
+            SendingProcess._logger.info("{0} - pipeline {1}".format("send_data", pipeline))
+        else:
+            SendingProcess._logger.debug("{0} - pipeline {1}".format("send_data", pipeline))
 
     async def _get_stream_id(self, config_stream_id):
         async def get_rows_from_stream_id(stream_id):
@@ -858,6 +1007,8 @@ class SendingProcess(FoglampProcess):
                 self._config['plugin'] = _config_from_manager['plugin']['value']
 
             self._config['memory_buffer_size'] = int(_config_from_manager['memory_buffer_size']['value'])
+            if 'max_blocks_in_flight' in _config_from_manager:
+                self._config['max_blocks_in_flight'] = max(1, int(_config_from_manager['max_blocks_in_flight']['value']))
             _config_from_manager['_CONFIG_CATEGORY_NAME'] = cat_name
 
             if 'stream_id' in _config_from_manager:
@@ -950,8 +1101,8 @@ class SendingProcess(FoglampProcess):
             await self._audit.failure(self._AUDIT_CODE, {"error - on start": _message})
             raise
 
-        # The list of unique reading payload for asset tracker
-        self._tracked_assets = []
+        # The asset codes having the Egress asset tracker record registered, service and plugin do not change
+        self._tracked_assets = set()
 
         return exec_sending_process
 
@@ -970,6 +1121,9 @@ class SendingProcess(FoglampProcess):
         try:
             self._storage_async = StorageClientAsync(self._core_management_host, self._core_management_port)
             self._readings = ReadingsStorageClientAsync(self._core_management_host, self._core_management_port)
+            # Fetch and send tasks reuse keep-alive connections to the storage service for the whole run
+            self._storage_async.enable_connection_pool()
+            self._readings.enable_connection_pool()
             self._audit = AuditLogger(self._storage_async)
         except Exception as ex:
             SendingProcess._logger.exception(_MESSAGES_LIST["e000023"].format(str(ex)))
@@ -985,24 +1139,35 @@ class SendingProcess(FoglampProcess):
                 is_started = await self._start()
                 if is_started:
                     await self.send_data()
-                self.stop()
+                await self.stop()
+                await self._close_storage_connections()
                 SendingProcess._logger.info("Execution completed.")
                 sys.exit(0)
             except (ValueError, Exception) as ex:
                 SendingProcess._logger.exception(_MESSAGES_LIST["e000002"].format(str(ex)))
                 sys.exit(1)
 
-    def stop(self):
+    async def stop(self):
         """ Terminates the sending process and the related plugin"""
         try:
-            self._plugin.plugin_shutdown(self._plugin_handle)
+            result = self._plugin.plugin_shutdown(self._plugin_handle)
+            # The plugins holding connections, e.g. pi_server and ocs, close them in a coroutine
+            if asyncio.iscoroutine(result):
+                await result
         except Exception:
             SendingProcess._logger.error(_MESSAGES_LIST["e000007"])
-            self._event_loop.run_until_complete(
-                self._audit.failure(self._AUDIT_CODE, {"error - on stop": _MESSAGES_LIST["e000007"]}))
+            await self._audit.failure(self._AUDIT_CODE, {"error - on stop": _MESSAGES_LIST["e000007"]})
             raise
         SendingProcess._logger.info("Stopped")
 
+    async def _close_storage_connections(self):
+        """ Closes the pooled connections to the Storage Layer"""
+        try:
+            await self._readings.close()
+            await self._storage_async.close()
+        except Exception as ex:
+            SendingProcess._logger.error(_MESSAGES_LIST["e000029"].format(ex))
+
 
 if __name__ == "__main__":
 
@@ -69,6 +69,8 @@ class Purge(FoglampProcess):
     _CONFIG_CATEGORY_NAME = 'PURGE_READ'
     _CONFIG_CATEGORY_DESCRIPTION = 'Purge the readings table'
 
+    _MIN_LAST_OBJECT_PAYLOAD = PayloadBuilder().AGGREGATE(["min", "last_object"]).compile()
+
     def __init__(self):
         super().__init__()
         self._logger = logger.setup("Data Purge")
@@ -109,7 +111,7 @@ class Purge(FoglampProcess):
         unsent_retained = 0
         start_time = time.strftime('%Y-%m-%d %H:%M:%S.%s', time.localtime(time.time()))
 
-        payload = PayloadBuilder().AGGREGATE(["min", "last_object"]).payload()
+        payload = self._MIN_LAST_OBJECT_PAYLOAD.render()
         result = await self._storage_async.query_tbl_with_payload("streams", payload)
         last_object = result["rows"][0]["min_last_object"]
         if result["count"] == 1:
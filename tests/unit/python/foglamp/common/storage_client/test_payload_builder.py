@@ -8,7 +8,7 @@ import json
 import os
 import pytest
 import py
-from foglamp.common.storage_client.payload_builder import PayloadBuilder
+from foglamp.common.storage_client.payload_builder import PayloadBuilder, Param
 
 __author__ = "Vaibhav Singhal"
 __copyright__ = "Copyright (c) 2017 OSIsoft, LLC"
@@ -448,3 +448,41 @@ class TestPayloadBuilderDelete:
     def test_delete_where_payload(self, input_where, input_table, expected):
         res = PayloadBuilder().DELETE(input_table).WHERE(input_where).payload()
         assert expected == json.loads(res)
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("payload_builder")
+class TestPayloadBuilderInstances:
+    """
+    This class tests that builders do not share state, and compiled payloads
+    """
+    def test_interleaved_builders(self):
+        b1 = PayloadBuilder().SELECT("id")
+        b2 = PayloadBuilder().SELECT("name")
+        b1.WHERE(["id", "=", 1])
+        assert {"return": ["id"], "where": {"column": "id", "condition": "=", "value": 1}} == json.loads(b1.payload())
+        assert {"return": ["name"]} == json.loads(b2.payload())
+
+    def test_chain_payload(self):
+        chain = PayloadBuilder().SELECT("id").chain_payload()
+        res = PayloadBuilder(chain).LIMIT(1).payload()
+        assert {"return": ["id"], "limit": 1} == json.loads(res)
+        assert 1 == chain["limit"]
+
+    def test_compile(self):
+        template = PayloadBuilder().SELECT("id").WHERE(["key", "=", Param("key")]).LIMIT(Param("limit")).compile()
+        assert ["key", "limit"] == template.names
+        for key, limit in [("READINGS", 1), ('a"b', 2)]:
+            res = template.render(key=key, limit=limit)
+            assert isinstance(res, bytes)
+            assert PayloadBuilder().SELECT("id").WHERE(["key", "=", key]).LIMIT(limit).payload().encode() == res
+
+    def test_compile_without_params(self):
+        template = PayloadBuilder().SELECT("id").compile()
+        assert [] == template.names
+        assert b'{"return": ["id"]}' == template.render()
+
+    def test_render_missing_param(self):
+        template = PayloadBuilder().WHERE(["key", "=", Param("key")]).compile()
+        with pytest.raises(KeyError):
+            template.render()
@@ -16,6 +16,7 @@ from functools import partial
 
 from foglamp.common.service_record import ServiceRecord
 from foglamp.common.storage_client.storage_client import _LOGGER, StorageClientAsync, ReadingsStorageClientAsync
+from foglamp.common.storage_client.utils import Utils
 
 from foglamp.common.storage_client.exceptions import *
 
@@ -171,6 +172,17 @@ class TestStorageClientAsync:
             assert "local:1000" == sc.base_url
             assert "local:2000" == sc.management_api_url
 
+    def test_keep_service(self):
+        svc = {"id": 1, "name": "foo", "address": "local", "service_port": 1000, "management_port": 2000,
+               "type": "Storage", "protocol": "http"}
+        with patch.dict(StorageClientAsync._kept_services, clear=True):
+            with patch.object(StorageClientAsync, '_get_storage_service', return_value=svc) as get_service:
+                StorageClientAsync(1, 2).keep_service(1, 2)
+                sc = ReadingsStorageClientAsync(1, 2)
+                assert "local:1000" == sc.base_url
+                StorageClientAsync(1, 3)
+            assert 2 == get_service.call_count
+
     def test_init_with_invalid_storage_service(self):
         svc = {"id": 1, "name": "foo", "address": "local", "service_port": 1000, "management_port": 2000,
                "type": "xStorage", "protocol": "http"}
@@ -239,11 +251,22 @@ class TestStorageClientAsync:
         assert "Data to insert is missing" in str(excinfo.value)
 
         with pytest.raises(Exception) as excinfo:
-            args = "aTable", {"k": "v"}
+            args = "aTable", {"k": {"v"}}
             await sc.insert_into_tbl(*args)
         assert excinfo.type is TypeError
         assert "Provided data to insert must be a valid JSON" in str(excinfo.value)
 
+        with pytest.raises(Exception) as excinfo:
+            with patch.object(Utils, "validate_payload", True):
+                args = "aTable", '{"k": "v"'
+                await sc.insert_into_tbl(*args)
+        assert excinfo.type is TypeError
+        assert "Provided data to insert must be a valid JSON" in str(excinfo.value)
+
+        args = "aTable", {"k": "v"}
+        response = await sc.insert_into_tbl(*args)
+        assert {"k": "v"} == response["called"]
+
         args = "aTable", json.dumps({"k": "v"})
         response = await sc.insert_into_tbl(*args)
         assert {"k": "v"} == response["called"]
@@ -297,11 +320,22 @@ class TestStorageClientAsync:
         assert "Data to update is missing" in str(excinfo.value)
 
         with pytest.raises(Exception) as excinfo:
-            args = "aTable", {"k": "v"}
+            args = "aTable", {"k": {"v"}}
             await sc.update_tbl(*args)
         assert excinfo.type is TypeError
         assert "Provided data to update must be a valid JSON" in str(excinfo.value)
 
+        with pytest.raises(Exception) as excinfo:
+            with patch.object(Utils, "validate_payload", True):
+                args = "aTable", '{"k": "v"'
+                await sc.update_tbl(*args)
+        assert excinfo.type is TypeError
+        assert "Provided data to update must be a valid JSON" in str(excinfo.value)
+
+        args = "aTable", {"k": "v"}
+        response = await sc.update_tbl(*args)
+        assert {"k": "v"} == response["called"]
+
         args = "aTable", json.dumps({"k": "v"})
         response = await sc.update_tbl(*args)
         assert {"k": "v"} == response["called"]
@@ -353,11 +387,15 @@ class TestStorageClientAsync:
         assert 1 == response["called"]
 
         with pytest.raises(Exception) as excinfo:
-            args = "aTable", {"condition": "v"}
+            args = "aTable", {"condition": {"v"}}
             await sc.delete_from_tbl(*args)
         assert excinfo.type is TypeError
         assert "condition payload must be a valid JSON" in str(excinfo.value)
 
+        args = "aTable", {"condition": "v"}
+        response = await sc.delete_from_tbl(*args)
+        assert {"condition": "v"} == response["called"]
+
         args = "aTable", json.dumps({"condition": "v"})
         response = await sc.delete_from_tbl(*args)
         assert {"condition": "v"} == response["called"]
@@ -461,11 +499,22 @@ class TestStorageClientAsync:
         assert "Query payload is missing" in str(excinfo.value)
 
         with pytest.raises(Exception) as excinfo:
-            args = "aTable", {"k": "v"}
+            args = "aTable", {"k": {"v"}}
             await sc.query_tbl_with_payload(*args)
         assert excinfo.type is TypeError
         assert "Query payload must be a valid JSON" in str(excinfo.value)
 
+        with pytest.raises(Exception) as excinfo:
+            with patch.object(Utils, "validate_payload", True):
+                args = "aTable", '{"k": "v"'
+                await sc.query_tbl_with_payload(*args)
+        assert excinfo.type is TypeError
+        assert "Query payload must be a valid JSON" in str(excinfo.value)
+
+        args = "aTable", {"k": "v"}
+        response = await sc.query_tbl_with_payload(*args)
+        assert {"k": "v"} == response["called"]
+
         args = "aTable", json.dumps({"k": "v"})
         response = await sc.query_tbl_with_payload(*args)
         assert {"k": "v"} == response["called"]
@@ -492,6 +541,43 @@ class TestStorageClientAsync:
 
         await fake_storage_srvr.stop()
 
+    @pytest.mark.asyncio
+    async def test_connection_pool(self, event_loop):
+        fake_storage_srvr = FakeFoglampStorageSrvr(loop=event_loop)
+        await fake_storage_srvr.start()
+
+        mockServiceRecord = MagicMock(ServiceRecord)
+        mockServiceRecord._address = HOST
+        mockServiceRecord._type = "Storage"
+        mockServiceRecord._port = PORT
+        mockServiceRecord._management_port = 2000
+
+        sc = StorageClientAsync(1, 2, mockServiceRecord)
+        assert sc.connection_pool is None
+
+        sc.enable_connection_pool(limit=2, idle_timeout=5)
+        assert 2 == sc.connection_pool.limit
+        assert 5 == sc.connection_pool.idle_timeout
+
+        with patch.object(aiohttp, "ClientSession", wraps=aiohttp.ClientSession) as session_patch:
+            response = await sc.insert_into_tbl("aTable", json.dumps({"k": "v"}))
+            assert {"k": "v"} == response["called"]
+            response = await sc.query_tbl("aTable")
+            assert 1 == response["called"]
+            response = await sc.query_tbl_with_payload("aTable", json.dumps({"k": "v"}))
+            assert {"k": "v"} == response["called"]
+        # one long-lived session for all the requests made in this event loop
+        assert 1 == session_patch.call_count
+
+        await sc.close()
+        with patch.object(aiohttp, "ClientSession", wraps=aiohttp.ClientSession) as session_patch:
+            response = await sc.query_tbl("aTable")
+            assert 1 == response["called"]
+        assert 1 == session_patch.call_count
+        await sc.close()
+
+        await fake_storage_srvr.stop()
+
 
 @pytest.allure.feature("unit")
 @pytest.allure.story("common", "storage_client")
@@ -529,7 +615,13 @@ class TestReadingsStorageAsyncClient:
         assert "Readings payload is missing" in str(excinfo.value)
 
         with pytest.raises(Exception) as excinfo:
-            await rsc.append("blah")
+            with patch.object(Utils, "validate_payload", True):
+                await rsc.append("blah")
+        assert excinfo.type is TypeError
+        assert "Readings payload must be a valid JSON" in str(excinfo.value)
+
+        with pytest.raises(Exception) as excinfo:
+            await rsc.append({"readings": {"blah"}})
         assert excinfo.type is TypeError
         assert "Readings payload must be a valid JSON" in str(excinfo.value)
 
@@ -554,6 +646,9 @@ class TestReadingsStorageAsyncClient:
         response = await rsc.append(readings)
         assert {'readings': []} == response['appended']
 
+        response = await rsc.append({"readings": []})
+        assert {'readings': []} == response['appended']
+
         await fake_storage_srvr.stop()
 
     @pytest.mark.asyncio
@@ -633,7 +728,13 @@ class TestReadingsStorageAsyncClient:
         assert "Query payload is missing" in str(excinfo.value)
 
         with pytest.raises(Exception) as excinfo:
-            await rsc.query("blah")
+            with patch.object(Utils, "validate_payload", True):
+                await rsc.query("blah")
+        assert excinfo.type is TypeError
+        assert "Query payload must be a valid JSON" in str(excinfo.value)
+
+        with pytest.raises(Exception) as excinfo:
+            await rsc.query({"readings": {"blah"}})
         assert excinfo.type is TypeError
         assert "Query payload must be a valid JSON" in str(excinfo.value)
 
@@ -45,3 +45,26 @@ class TestUtils:
     def test_is_json_return_false_with_invalid_json(self, test_input):
         ret_val = Utils.is_json(test_input)
         assert ret_val is False
+
+    @pytest.mark.parametrize("test_input, expected", [({"k": "v"}, '{"k": "v"}'),
+                                                      ([{"k": 1}], '[{"k": 1}]'),
+                                                      ('{"k": "v"}', '{"k": "v"}'),
+                                                      (b'{"k": "v"}', b'{"k": "v"}'),
+                                                      # serialized payloads are trusted when not validating
+                                                      ('{k: v}', '{k: v}'),
+                                                      ({"k": {"v"}}, None)
+                                                      ])
+    def test_serialize(self, test_input, expected):
+        assert expected == Utils.serialize(test_input)
+
+    @pytest.mark.parametrize("test_input, expected", [({"k": "v"}, '{"k": "v"}'),
+                                                      ('{"k": "v"}', '{"k": "v"}'),
+                                                      ('{k: v}', None),
+                                                      (b'any', None)
+                                                      ])
+    def test_serialize_with_validation(self, test_input, expected):
+        Utils.validate_payload = True
+        try:
+            assert expected == Utils.serialize(test_input)
+        finally:
+            Utils.validate_payload = False
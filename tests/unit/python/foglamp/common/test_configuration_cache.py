@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+import time
+from unittest.mock import patch
 import pytest
 from foglamp.common.configuration_manager import ConfigurationCache
 
@@ -16,9 +18,12 @@ class TestConfigurationCache:
     def test_init(self):
         cached_manager = ConfigurationCache()
         assert {} == cached_manager.cache
-        assert 10 == cached_manager.max_cache_size
+        assert 100 == cached_manager.max_cache_size
+        assert cached_manager.ttl is None
         assert 0 == cached_manager.hit
         assert 0 == cached_manager.miss
+        assert 0 == cached_manager.eviction
+        assert 0 == cached_manager.expired
 
     def test_size(self):
         cached_manager = ConfigurationCache()
@@ -43,7 +48,7 @@ class TestConfigurationCache:
         assert cat_val == cached_manager.cache[cat_name]['value']
 
     def test_remove_oldest(self):
-        cached_manager = ConfigurationCache()
+        cached_manager = ConfigurationCache(max_cache_size=10)
         cached_manager.update("cat1", {'value': {}})
         cached_manager.update("cat2", {'value': {}})
         cached_manager.update("cat3", {'value': {}})
@@ -68,6 +73,55 @@ class TestConfigurationCache:
         assert 'cat10' in cached_manager.cache
         assert 'cat11' in cached_manager.cache
         assert 10 == cached_manager.size
+        assert 1 == cached_manager.eviction
+
+    def test_remove_least_recently_used(self):
+        cached_manager = ConfigurationCache(max_cache_size=3)
+        cached_manager.update("cat1", {'value': {}})
+        cached_manager.update("cat2", {'value': {}})
+        cached_manager.update("cat3", {'value': {}})
+        assert "cat1" in cached_manager
+        cached_manager.update("cat4", {'value': {}})
+        assert ['cat3', 'cat1', 'cat4'] == list(cached_manager.cache)
+        cached_manager.update("cat3", {'value': {'changed': {}}})
+        cached_manager.update("cat5", {'value': {}})
+        assert ['cat4', 'cat3', 'cat5'] == list(cached_manager.cache)
+        assert 2 == cached_manager.eviction
+
+    def test_ttl(self):
+        cached_manager = ConfigurationCache(ttl=60)
+        with patch.object(time, 'monotonic', return_value=1000.0):
+            cached_manager.update("cat1", {'value': {}})
+        with patch.object(time, 'monotonic', return_value=1059.0):
+            assert "cat1" in cached_manager
+        with patch.object(time, 'monotonic', return_value=1061.0):
+            assert "cat1" not in cached_manager
+        assert 'cat1' not in cached_manager.cache
+        assert 1 == cached_manager.hit
+        assert 1 == cached_manager.miss
+        assert 1 == cached_manager.expired
+
+    def test_configure(self):
+        cached_manager = ConfigurationCache()
+        for i in range(5):
+            cached_manager.update("cat{}".format(i), {'value': {}})
+        cached_manager.configure(max_cache_size=2, ttl=30)
+        assert ['cat3', 'cat4'] == list(cached_manager.cache)
+        assert 2 == cached_manager.max_cache_size
+        assert 30 == cached_manager.ttl
+        assert 3 == cached_manager.eviction
+
+    def test_statistics(self):
+        cached_manager = ConfigurationCache(max_cache_size=1)
+        assert {'size': 0, 'maxSize': 1, 'ttl': 0, 'hit': 0, 'miss': 0, 'eviction': 0, 'expired': 0,
+                'hitRatio': 0} == cached_manager.statistics
+        cached_manager.update("cat1", {'value': {}})
+        assert "cat1" in cached_manager
+        assert "cat1" in cached_manager
+        assert "cat2" not in cached_manager
+        cached_manager.update("cat2", {'value': {}})
+        assert {'size': 1, 'maxSize': 1, 'ttl': 0, 'hit': 2, 'miss': 1, 'eviction': 1, 'expired': 0,
+                'hitRatio': 0.6667} == cached_manager.statistics
 
     def test_remove(self):
         cached_manager = ConfigurationCache()
@@ -78,6 +132,8 @@ class TestConfigurationCache:
         assert 4 == cached_manager.size
         cached_manager.remove("cat2")
         assert 3 == cached_manager.size
+        cached_manager.remove("cat2")
+        assert 3 == cached_manager.size
         assert 'cat2' not in cached_manager.cache
         assert 'cat1' in cached_manager.cache
         assert 'cat3' in cached_manager.cache
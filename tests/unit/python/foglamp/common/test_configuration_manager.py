@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 
 import asyncio
+import collections
 import json
 import ipaddress
+import time
+from importlib import import_module
 from unittest.mock import MagicMock, patch, call
 import pytest
 
@@ -135,6 +138,17 @@ class TestConfigurationManager:
         c_mgr.register_interest('name', 'configuration_manager_callback')
         await c_mgr._run_callbacks('name')
 
+    @pytest.mark.asyncio
+    async def test__run_callbacks_module_cached(self, reset_singleton):
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        c_mgr = ConfigurationManager(storage_client_mock)
+        c_mgr.register_interest('name', 'configuration_manager_callback')
+        with patch('foglamp.common.configuration_manager.import_module', wraps=import_module) as import_patch:
+            await c_mgr._run_callbacks('name')
+            await c_mgr._run_callbacks('name')
+        import_patch.assert_called_once_with('configuration_manager_callback')
+        assert 'configuration_manager_callback' in c_mgr._callback_methods
+
     @pytest.mark.asyncio
     async def test__run_callbacks_invalid_module(self, reset_singleton):
         storage_client_mock = MagicMock(spec=StorageClientAsync)
@@ -1333,6 +1347,24 @@ class TestConfigurationManager:
         assert 1 == log_exc.call_count
         log_exc.assert_called_once_with('Unable to get all category names based on category_name %s', 'catname')
 
+    @pytest.mark.asyncio
+    async def test_get_category_all_items_from_cache(self, reset_singleton):
+        category_name = 'catname'
+        cat_info = {"script": {"type": "script", "default": "", "description": "Blah", "value": "7072696e74"}}
+        resolved = {"script": {"type": "script", "default": "", "description": "Blah", "value": "print", "file": ""}}
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        c_mgr = ConfigurationManager(storage_client_mock)
+        c_mgr._cacheManager.update(category_name, cat_info)
+        with patch.object(ConfigurationManager, '_handle_script_type', return_value=resolved) as patch_script:
+            with patch.object(ConfigurationManager, '_read_category_val') as readpatch:
+                assert resolved == await c_mgr.get_category_all_items(category_name)
+                assert resolved == await c_mgr.get_category_all_items(category_name)
+                assert resolved['script'] == await c_mgr.get_category_item(category_name, 'script')
+            readpatch.assert_not_called()
+        # script type items are resolved once per write, not on every hit
+        patch_script.assert_called_once_with(category_name, cat_info)
+        assert 3 == c_mgr._cacheManager.hit
+
     @pytest.mark.asyncio
     async def test_get_category_item_good(self, reset_singleton):
 
@@ -1550,6 +1582,80 @@ class TestConfigurationManager:
             assert expected_result == ret_val
         assert 2 == query_tbl_patch.call_count
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("value, expected_result", [
+        (True, [{'key': 'General', 'description': 'General', 'displayName': 'GEN', 'children': [
+                    {'key': 'service', 'description': 'FogLAMP service', 'displayName': 'SERV', 'children': [
+                        {'key': 'rest_api', 'description': 'User REST API', 'displayName': 'API', 'children': []}]}]},
+                {'key': 'Advanced', 'description': 'Advanced', 'displayName': 'ADV', 'children': []}]),
+        (False, [{'key': 'service', 'description': 'FogLAMP service', 'displayName': 'SERV', 'children': [
+                     {'key': 'rest_api', 'description': 'User REST API', 'displayName': 'API', 'children': []}]},
+                 {'key': 'rest_api', 'description': 'User REST API', 'displayName': 'API', 'children': []}])
+    ])
+    async def test__read_all_groups_with_children(self, reset_singleton, value, expected_result):
+        async def q_result(*args):
+            table = args[0]
+            payload = json.loads(args[1])
+            if table == "configuration":
+                assert {"return": ["key", "description", "display_name"]} == payload
+                return {"rows": [{"key": "General", "description": "General", "display_name": "GEN"}, {"key": "Advanced", "description": "Advanced", "display_name": "ADV"}, {"key": "service", "description": "FogLAMP service", "display_name": "SERV"}, {"key": "rest_api", "description": "User REST API", "display_name": "API"}], "count": 4}
+
+            if table == "category_children":
+                assert {"return": ["parent", "child"]} == payload
+                return {"rows": [{"parent": "General", "child": "service"}, {"parent": "service", "child": "rest_api"}, {"parent": "General", "child": "SMNTR"}], "count": 3}
+
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        c_mgr = ConfigurationManager(storage_client_mock)
+        with patch.object(storage_client_mock, 'query_tbl_with_payload', side_effect=q_result) as query_tbl_patch:
+            ret_val = await c_mgr._read_all_groups(root=value, children=True)
+            assert expected_result == ret_val
+            # Served from the cached category tree
+            ret_val = await c_mgr._read_all_groups(root=value, children=True)
+            assert expected_result == ret_val
+        assert 2 == query_tbl_patch.call_count
+
+    @pytest.mark.asyncio
+    async def test_category_tree_updated_on_child_changes(self, reset_singleton):
+        async def read_category_val(category_name):
+            return 'blah'
+
+        async def create_child(category_name, child):
+            return 'inserted'
+
+        async def delete_from_tbl(table, payload):
+            return {'response': 'deleted'}
+
+        async def read_children_before_delete(category_name):
+            return [{'parent': 'south', 'child': 'http'}]
+
+        async def read_children_after_delete(category_name):
+            return [{'parent': 'south', 'child': 'coap'}]
+
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        c_mgr = ConfigurationManager(storage_client_mock)
+        c_mgr._category_tree = {'categories': collections.OrderedDict([('south', ('South', 'South')), ('coap', ('CoAP', 'coap')),
+                                                                       ('http', ('HTTP', 'http'))]),
+                                'children': {'south': ['http']}, 'loaded_at': time.monotonic()}
+        with patch.object(ConfigurationManager, '_read_category_val', side_effect=read_category_val):
+            with patch.object(ConfigurationManager, '_read_all_child_category_names',
+                              side_effect=read_children_before_delete):
+                with patch.object(ConfigurationManager, '_create_child', side_effect=create_child):
+                    await c_mgr.create_child_category('south', ['coap'])
+        assert ['http', 'coap'] == c_mgr._category_tree['children']['south']
+        ret_val = await c_mgr._read_all_groups(root=True, children=True)
+        assert [{'key': 'south', 'description': 'South', 'displayName': 'South', 'children': [
+                    {'key': 'http', 'description': 'HTTP', 'displayName': 'http', 'children': []},
+                    {'key': 'coap', 'description': 'CoAP', 'displayName': 'coap', 'children': []}]}] == ret_val
+
+        with patch.object(ConfigurationManager, '_read_category_val', side_effect=read_category_val):
+            with patch.object(storage_client_mock, 'delete_from_tbl', side_effect=delete_from_tbl):
+                with patch.object(ConfigurationManager, '_read_all_child_category_names',
+                                  side_effect=read_children_after_delete):
+                    assert ['coap'] == await c_mgr.delete_child_category('south', 'http')
+        assert ['coap'] == c_mgr._category_tree['children']['south']
+        ret_val = await c_mgr._read_all_groups(root=True, children=True)
+        assert ['south', 'http'] == [c['key'] for c in ret_val]
+
     @pytest.mark.asyncio
     async def test__read_category_val_1_row(self, reset_singleton):
         @asyncio.coroutine
@@ -50,3 +50,25 @@ class TestJQFilter:
                     jqfilter_instance.transform(input_filter_string, input_reading_block)
         mock_pyjq.assert_called_once_with(input_reading_block, input_filter_string)
         log.assert_called_once_with(expected_log, '')
+
+    def test_apply(self):
+        jqfilter_instance = JQFilter()
+        reading_block = [{"id": 1, "reading": {"a": 1}, "valid": True, "unit": None}]
+        with patch.object(pyjq, "compile", wraps=pyjq.compile) as mock_compile:
+            ret = jqfilter_instance.apply(reading_block, "(.[]|.reading|.b)=2")
+            assert ret == [{"id": 1, "reading": {"a": 1, "b": 2}, "valid": True, "unit": None}]
+            assert jqfilter_instance.apply(reading_block, "(.[]|.reading|.b)=2") == ret
+            assert jqfilter_instance.apply(reading_block, ".[0].id") == 1
+        assert [(("(.[]|.reading|.b)=2",),), ((".[0].id",),)] == mock_compile.call_args_list
+
+    def test_apply_no_output(self):
+        jqfilter_instance = JQFilter()
+        assert jqfilter_instance.apply([], ".[]") is None
+
+    def test_apply_invalid_filter(self):
+        jqfilter_instance = JQFilter()
+        with patch.object(jqfilter_instance._logger, "error") as log:
+            with pytest.raises(ValueError):
+                jqfilter_instance.apply([], "..[")
+        args, kwargs = log.call_args
+        assert args[0] == 'Failed to compile, please check the transformation rule, exception %s'
@@ -4,8 +4,11 @@
 # See: http://foglamp.readthedocs.io/
 # FOGLAMP_END
 
+import io
 import pytest
 import logging
+from logging.handlers import QueueHandler
+from unittest.mock import patch
 
 from foglamp.common import logger
 
@@ -95,3 +98,103 @@ class TestLogger:
                     log.setLevel(level) 
                     log.propagate = propagate
                     assert log is logger.setup(name, propagate=propagate, level=level)
+
+
+@pytest.fixture
+def async_console():
+    """ Logs asynchronously to a buffer instead of stdout """
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(fmt='%(levelname)s: %(message)s'))
+
+    def enable(**kwargs):
+        logger.enable_async(**kwargs)
+        logger._async_writer.handlers[logger.CONSOLE] = handler
+        return stream
+
+    yield enable
+    logger.disable_async()
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("common", "logger")
+class TestAsyncLogger:
+    def test_enable_async_switches_existing_loggers(self, async_console):
+        instance = logger.setup('async_existing', destination=logger.CONSOLE, level=logging.INFO)
+        assert isinstance(instance.handlers[0], logging.StreamHandler)
+
+        stream = async_console()
+        assert 1 == len(instance.handlers)
+        assert isinstance(instance.handlers[0], QueueHandler)
+        instance.info("value %s", 1)
+
+        logger.disable_async()
+        assert "INFO: value 1\n" == stream.getvalue()
+        assert isinstance(instance.handlers[0], logging.StreamHandler)
+
+    def test_setup_when_async(self, async_console):
+        stream = async_console()
+        instance = logger.setup('async_new', destination=logger.CONSOLE)
+        assert isinstance(instance.handlers[0], QueueHandler)
+        instance.warning("warned")
+        statistics = logger.get_async_statistics()
+        logger.disable_async()
+        assert "WARNING: warned\n" == stream.getvalue()
+        assert {"queued", "written", "dropped", "rateLimited", "deduplicated"} == set(statistics)
+        assert logger.get_async_statistics() is None
+
+    def test_repeated_messages(self, async_console):
+        stream = async_console()
+        instance = logger.setup('async_repeat', destination=logger.CONSOLE, level=logging.INFO)
+        for _ in range(5):
+            instance.info("same")
+        instance.info("other")
+        logger.disable_async()
+        assert ["INFO: same", "INFO: Last message repeated 4 times", "INFO: other"] == stream.getvalue().splitlines()
+
+    def test_rate_limit(self, async_console):
+        stream = async_console(rate_limit=3)
+        instance = logger.setup('async_rate', destination=logger.CONSOLE, level=logging.INFO)
+        with patch.object(logger.time, 'monotonic', return_value=100):
+            for i in range(10):
+                instance.info("info %s", i)
+            instance.error("error")
+        writer = logger._async_writer
+        logger.disable_async()
+        assert ["INFO: info 0", "INFO: info 1", "INFO: info 2", "ERROR: error",
+                "WARNING: Dropped 7 log entries: 0 on a full queue, 7 over the rate limit of 3 per second"] == \
+            stream.getvalue().splitlines()
+        assert 7 == writer.rate_limited
+
+    def test_report_losses(self):
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter(fmt='%(levelname)s: %(message)s'))
+        writer = logger._AsyncWriter(queue_size=2, batch_size=10, rate_limit=100)
+        writer.handlers[logger.CONSOLE] = handler
+        writer.dropped = 3
+
+        # Not before _LOSS_REPORT_SECONDS, then once for the entries dropped since the last report
+        writer._report_losses()
+        assert "" == stream.getvalue()
+        with patch.object(logger.time, 'monotonic', return_value=writer._loss_report_time + 60):
+            writer._report_losses()
+            writer.rate_limited = 2
+            writer._report_losses()
+            writer._report_losses(final=True)
+            writer._report_losses(final=True)
+        handler.flush()
+        assert ["WARNING: Dropped 3 log entries: 3 on a full queue, 0 over the rate limit of 100 per second",
+                "WARNING: Dropped 2 log entries: 0 on a full queue, 2 over the rate limit of 100 per second"] == \
+            stream.getvalue().splitlines()
+
+    def test_queue_full(self):
+        writer = logger._AsyncWriter(queue_size=2, batch_size=10, rate_limit=100)
+        handler = writer.queue_handlers[logger.CONSOLE]
+        for i in range(5):
+            handler.handle(logging.makeLogRecord({'msg': 'entry %s', 'args': (i,), 'levelno': logging.WARNING}))
+        assert 2 == writer.queue.qsize()
+        assert 3 == writer.dropped
+        destination, record = writer.queue.get_nowait()
+        assert logger.CONSOLE == destination
+        assert 'entry 0' == record.msg
@@ -58,7 +58,7 @@ class TestStatistics:
         """ Test that register results in a database insert """
         storageMock = MagicMock(spec=StorageClientAsync)
         stats = statistics.Statistics(storageMock)
-        stats._registered_keys = []
+        stats._registered_keys = set()
 
         async def mock_coro():
             return {"response": "updated", "rows_affected": 1}
@@ -79,7 +79,7 @@ class TestStatistics:
         """ Test that register results in a database insert only once for same key"""
         storageMock = MagicMock(spec=StorageClientAsync)
         stats = statistics.Statistics(storageMock)
-        stats._registered_keys = []
+        stats._registered_keys = set()
 
         async def mock_coro():
             return {"response": "updated", "rows_affected": 1}
@@ -107,7 +107,7 @@ class TestStatistics:
         """Test the load key"""
         storage_client_mock = MagicMock(spec=StorageClientAsync)
         s = statistics.Statistics(storage_client_mock)
-        s._registered_keys = []
+        s._registered_keys = set()
 
         async def mock_coro():
             return {'rows': [{"previous_value": 0, "value": 1,
@@ -121,7 +121,7 @@ class TestStatistics:
         """Test the load key exception"""
         storage_client_mock = MagicMock(spec=StorageClientAsync)
         s = statistics.Statistics(storage_client_mock)
-        s._registered_keys = []
+        s._registered_keys = set()
 
         async def mock_coro():
             return Exception
@@ -139,14 +139,31 @@ class TestStatistics:
         async def mock_coro():
             return {"response": "updated", "rows_affected": 1}
 
-        payload = '{"where": {"column": "key", "condition": "=", "value": "READING"}, ' \
-                  '"expressions": [{"column": "value", "operator": "+", "value": 5}]}'
+        payload = b'{"where": {"column": "key", "condition": "=", "value": "READING"}, ' \
+                  b'"expressions": [{"column": "value", "operator": "+", "value": 5}]}'
         expected_result = {"response": "updated", "rows_affected": 1}
         with patch.object(s._storage, 'update_tbl', return_value=mock_coro()) as stat_update:
             await s.update('READING', 5)
             assert expected_result['response'] == "updated"
         stat_update.assert_called_once_with('statistics', payload)
 
+    async def test_update_bulk(self):
+        storage_client_mock = MagicMock(spec=StorageClientAsync)
+        s = statistics.Statistics(storage_client_mock)
+
+        async def mock_coro():
+            return {"response": "updated", "rows_affected": 2}
+
+        with patch.object(s._storage, 'update_tbl', return_value=mock_coro()) as stat_update:
+            await s.update_bulk({'READINGS': 5, 'PUMP1': 2})
+        args, kwargs = stat_update.call_args
+        assert args[0] == 'statistics'
+        assert json.loads(args[1].decode()) == {"updates": [
+            {"where": {"column": "key", "condition": "=", "value": "READINGS"},
+             "expressions": [{"column": "value", "operator": "+", "value": 5}]},
+            {"where": {"column": "key", "condition": "=", "value": "PUMP1"},
+             "expressions": [{"column": "value", "operator": "+", "value": 2}]}]}
+
     @pytest.mark.parametrize("key, value_increment, exception_name, exception_message", [
         (123456, 120, TypeError, "key must be a string"),
         ('PURGED', '120', ValueError, "value must be an integer"),
@@ -177,8 +194,8 @@ class TestStatistics:
         stat_dict = {'FOGBENCH/TEMPERATURE': 1}
         storage_client_mock = MagicMock(spec=StorageClientAsync)
         s = statistics.Statistics(storage_client_mock)
-        payload = '{"where": {"column": "key", "condition": "=", "value": "FOGBENCH/TEMPERATURE"}, ' \
-                  '"expressions": [{"column": "value", "operator": "+", "value": 1}]}'
+        payload = b'{"where": {"column": "key", "condition": "=", "value": "FOGBENCH/TEMPERATURE"}, ' \
+                  b'"expressions": [{"column": "value", "operator": "+", "value": 1}]}'
 
         async def mock_coro():
             return {"response": "updated", "rows_affected": 1}
@@ -98,6 +98,48 @@ class TestPluginsNorthCommon(object):
 
         assert plugin_common.evaluate_type(value) == expected
 
+    @pytest.mark.parametrize("reading, expected", [
+        ({"x": 1, "y": -1.5, "z": "up"}, {"x": 1, "y": -1.5, "z": "up"}),
+        ({"x": "10", "y": "180.2", "z": "180.0"}, {"x": 10, "y": 180.2, "z": 180.0}),
+        ({"x": 967.0, "y": [1, 2]}, {"x": 967.0, "y": [1, 2]}),
+        # Integers not represented exactly as float are converted to number, as convert_to_type does
+        ({"x": 2 ** 53, "y": 2 ** 53 + 1}, {"x": 2 ** 53, "y": float(2 ** 53 + 1)}),
+    ])
+    def test_convert_reading_to_type(self, reading, expected):
+        """ tests convert_reading_to_type available in plugins.north.common.common """
+
+        plugin_common.convert_reading_to_type("asset", reading, {})
+
+        assert reading == expected
+        assert [type(value) for value in reading.values()] == [type(value) for value in expected.values()]
+
+    def test_convert_reading_to_type_schema(self):
+        """ tests the schema of the asset is cached and updated when it changes """
+
+        schemas = {}
+
+        reading = {"x": 1, "y": "2"}
+        plugin_common.convert_reading_to_type("asset", reading, schemas)
+        assert reading == {"x": 1, "y": 2}
+        schema = schemas["asset"]
+
+        reading = {"x": 3, "y": "4.5"}
+        plugin_common.convert_reading_to_type("asset", reading, schemas)
+        assert reading == {"x": 3, "y": 4.5}
+        assert schemas["asset"] is schema
+
+        # The values of y are not strings anymore
+        reading = {"x": "5", "y": 6}
+        plugin_common.convert_reading_to_type("asset", reading, schemas)
+        assert reading == {"x": 5, "y": 6}
+        assert schemas["asset"] is not schema
+
+    def test_convert_reading_to_type_not_finite(self):
+        """ tests the not finite floats are evaluated as convert_to_type does """
+
+        with pytest.raises(OverflowError):
+            plugin_common.convert_reading_to_type("asset", {"x": 1.0, "y": float("inf")}, {})
+
     @pytest.mark.parametrize("value, expected", [
         (
             # Case 1
@@ -151,3 +193,22 @@ class TestPluginsNorthCommon(object):
         """ """
 
         assert plugin_common.identify_unique_asset_codes(value) == expected
+
+    def test_index_asset_codes(self):
+        """ tests index_asset_codes available in plugins.north.common.common """
+
+        raw_data = [
+            {"asset_code": "temperature1", "reading": 10},
+            {"asset_code": "temperature2", "reading": 20},
+            {"asset_code": "temperature1", "reading": 11},
+            {"asset_code": "temperature3", "reading": 30},
+            {"asset_code": "temperature1", "reading": 12},
+        ]
+
+        index = plugin_common.index_asset_codes(raw_data)
+
+        assert list(index) == ["temperature1", "temperature2", "temperature3"]
+        assert index["temperature1"] == {"asset_code": "temperature1", "asset_data": 10, "count": 3, "first": 0, "last": 4}
+        assert index["temperature2"] == {"asset_code": "temperature2", "asset_data": 20, "count": 1, "first": 1, "last": 1}
+        assert index["temperature3"] == {"asset_code": "temperature3", "asset_data": 30, "count": 1, "first": 3, "last": 3}
+        assert plugin_common.index_asset_codes([]) == {}
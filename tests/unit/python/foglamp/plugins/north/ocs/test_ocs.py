@@ -54,7 +54,10 @@ def fixture_ocs_north(event_loop):
 
     ocs_north._sending_process_instance._storage_async = MagicMock(spec=StorageClientAsync)
 
-    return ocs_north
+    yield ocs_north
+
+    # Closes the HTTP session opened by the test
+    event_loop.run_until_complete(ocs_north.close())
 
 
 @pytest.allure.feature("unit")
@@ -103,6 +106,7 @@ class TestOCS:
                 "formatInteger": {"value": "int64"},
                 "notBlockingErrors": {"value": "{'id': 400, 'message': 'none'}"},
                 "compression": {"value": "true"},
+                "compressionLevel": {"value": "6"},
                 "namespace": {"value": "ocs_namespace_0001"},
                 "tenant_id": {"value": "ocs_tenant_id"},
                 "client_id": {"value": "ocs_client_id"},
@@ -350,11 +354,25 @@ class TestOCS:
         assert patched_send_in_memory_data_to_picromf.called
         assert patched_deleted_omf_types_already_created.called
 
-    def test_plugin_shutdown(self):
+    @pytest.mark.asyncio
+    async def test_plugin_shutdown(self):
 
         ocs._logger = MagicMock()
         data = []
-        ocs.plugin_shutdown([data])
+        await ocs.plugin_shutdown([data])
+
+    @pytest.mark.asyncio
+    async def test_plugin_shutdown_closes_session(self, event_loop, fixture_ocs):
+        """ Unit test for - plugin_shutdown - the HTTP session to OCS is closed """
+
+        ocs_north = ocs.OCSNorthPlugin(MagicMock(), {}, {}, MagicMock(spec=logging))
+        session = ocs_north._get_session()
+        ocs._ocs_north = ocs_north
+
+        await ocs.plugin_shutdown([])
+
+        assert ocs._ocs_north is None
+        assert session.closed
 
     def test_plugin_reconfigure(self):
 
@@ -11,6 +11,7 @@ __license__ = "Apache 2.0"
 __version__ = "${VERSION}"
 
 import asyncio
+import gzip
 import logging
 import pytest
 import json
@@ -59,7 +60,49 @@ def fixture_omf_north(event_loop):
 
     omf_north._sending_process_instance._storage_async = MagicMock(spec=StorageClientAsync)
 
-    return omf_north
+    yield omf_north
+
+    # Closes the HTTP session opened by the test
+    event_loop.run_until_complete(omf_north.close())
+
+
+def _plugin_init_data():
+    """ Returns a good set of values for plugin_init """
+
+    # Used to check the conversions
+    data = {
+            "stream_id": {"value": 1},
+
+            "_CONFIG_CATEGORY_NAME":  module_sp.SendingProcess._CONFIG_CATEGORY_NAME,
+            "URL": {"value": "test_URL"},
+            "producerToken": {"value": "test_producerToken"},
+            "OMFMaxRetry": {"value": "100"},
+            "OMFRetrySleepTime": {"value": "100"},
+            "OMFHttpTimeout": {"value": "100"},
+            "StaticData": {
+                "value": json.dumps(
+                    {
+                        "Location": "Palo Alto",
+                        "Company": "Dianomic"
+                    }
+                )
+            },
+            "destination_type": {"value": "1"},
+            'sending_process_instance': MagicMock(spec=SendingProcess),
+            "formatNumber": {"value": "float64"},
+            "formatInteger": {"value": "int64"},
+            "notBlockingErrors": {"value": "{'id': 400, 'message': 'none'}"},
+            "compression": {"value": "true"},
+            "compressionLevel": {"value": "6"}
+
+    }
+
+    data["debug_level"] = None
+    data["log_performance"] = None
+    data["destination_id"] = 1
+    data["stream_id"] = 1
+
+    return data
 
 
 async def mock_async_call(p1=ANY):
@@ -141,39 +184,9 @@ class TestPiServer:
 
         pi_server._logger = MagicMock()
 
-        # Used to check the conversions
-        data = {
-                "stream_id": {"value": 1},
-
-                "_CONFIG_CATEGORY_NAME":  module_sp.SendingProcess._CONFIG_CATEGORY_NAME,
-                "URL": {"value": "test_URL"},
-                "producerToken": {"value": "test_producerToken"},
-                "OMFMaxRetry": {"value": "100"},
-                "OMFRetrySleepTime": {"value": "100"},
-                "OMFHttpTimeout": {"value": "100"},
-                "StaticData": {
-                    "value": json.dumps(
-                        {
-                            "Location": "Palo Alto",
-                            "Company": "Dianomic"
-                        }
-                    )
-                },
-                "destination_type": {"value": "1"},
-                'sending_process_instance': MagicMock(spec=SendingProcess),
-                "formatNumber": {"value": "float64"},
-                "formatInteger": {"value": "int64"},
-                "notBlockingErrors": {"value": "{'id': 400, 'message': 'none'}"},
-                "compression": {"value": "true"}
-
-        }
-
+        data = _plugin_init_data()
         config_default_omf_types = pi_server.CONFIG_DEFAULT_OMF_TYPES
         config_default_omf_types["type-id"]["value"] = "0001"
-        data["debug_level"] = None
-        data["log_performance"] = None
-        data["destination_id"] = 1
-        data["stream_id"] = 1
 
         with patch.object(data['sending_process_instance'], '_fetch_configuration',
                           return_value=config_default_omf_types):
@@ -185,6 +198,7 @@ class TestPiServer:
         assert config['OMFMaxRetry'] == 100
         assert config['OMFRetrySleepTime'] == 100
         assert config['OMFHttpTimeout'] == 100
+        assert config['compressionLevel'] == 6
 
         # Check conversion from String to Dict
         assert isinstance(config['StaticData'], dict)
@@ -394,11 +408,62 @@ class TestPiServer:
             assert patched_send_in_memory_data_to_picromf.called
             assert patched_deleted_omf_types_already_created.called
 
-    def test_plugin_shutdown(self):
+    @pytest.mark.asyncio
+    async def test_plugin_send_reuses_instance(self, event_loop, fixture_omf):
+        """ Unit test for - plugin_send - the PIServerNorthPlugin instance is kept across the blocks """
+
+        data = MagicMock()
+        pi_server._omf_north = None
+
+        with patch.object(fixture_omf.PIServerNorthPlugin,
+                          'transform_in_memory_data',
+                          return_value=[False, 0, 0]):
+            await fixture_omf.plugin_send(data, [], _STREAM_ID)
+            omf_north = fixture_omf._omf_north
+            await fixture_omf.plugin_send(data, [], _STREAM_ID)
+
+        assert isinstance(omf_north, pi_server.PIServerNorthPlugin)
+        assert fixture_omf._omf_north is omf_north
+
+    @pytest.mark.asyncio
+    async def test_plugin_shutdown(self):
 
         pi_server._logger = MagicMock()
         data = []
-        pi_server.plugin_shutdown([data])
+        await pi_server.plugin_shutdown([data])
+
+    @pytest.mark.asyncio
+    async def test_plugin_shutdown_closes_session(self, event_loop, fixture_omf):
+        """ Unit test for - plugin_shutdown - the HTTP session to PICROMF is closed """
+
+        omf_north = pi_server.PIServerNorthPlugin(MagicMock(), {}, {}, MagicMock(spec=logging))
+        session = omf_north._get_session()
+        pi_server._omf_north = omf_north
+
+        await pi_server.plugin_shutdown([])
+
+        assert pi_server._omf_north is None
+        assert session.closed
+
+    @pytest.mark.asyncio
+    async def test_plugin_init_closes_session(self, event_loop, fixture_omf):
+        """ Unit test for - plugin_init - the HTTP session of the instance dropped is closed """
+
+        omf_north = pi_server.PIServerNorthPlugin(MagicMock(), {}, {}, MagicMock(spec=logging))
+        session = omf_north._get_session()
+        pi_server._omf_north = omf_north
+        data = _plugin_init_data()
+        config_default_omf_types = pi_server.CONFIG_DEFAULT_OMF_TYPES
+        config_default_omf_types["type-id"]["value"] = "0001"
+
+        with patch.object(data['sending_process_instance'], '_fetch_configuration',
+                          return_value=config_default_omf_types):
+            pi_server.plugin_init(data)
+        assert pi_server._omf_north is None
+
+        # The close is awaited by plugin_shutdown
+        await pi_server.plugin_shutdown([])
+        assert session.closed
 
     def test_plugin_reconfigure(self):
 
@@ -1089,6 +1154,57 @@ class TestPIServerNorthPlugin:
         else:
             raise Exception("ERROR : creation type not defined !")
 
+    @pytest.mark.asyncio
+    async def test_create_omf_objects_cached(self, fixture_omf_north):
+        """ Unit test for - create_omf_objects - the OMF objects created are loaded from the Storage layer
+            only once and then tracked in memory
+        """
+
+        def block(*asset_codes):
+            return [{"id": 1, "asset_code": asset_code, "reading": {"humidity": 10}} for asset_code in asset_codes]
+
+        async def mock_retrieve_omf_types_already_created(configuration_key, type_id):
+            return ["asset_1"]
+
+        async def mock_async_noop(*args):
+            return None
+
+        fixture_omf_north._config_omf_types = {"type-id": {"value": "0001"}}
+
+        with patch.object(fixture_omf_north,
+                          '_retrieve_omf_types_already_created',
+                          side_effect=mock_retrieve_omf_types_already_created) as patched_retrieve:
+            with patch.object(fixture_omf_north,
+                              '_create_omf_objects_automatic',
+                              side_effect=mock_async_noop) as patched_create_omf_objects_automatic:
+                with patch.object(fixture_omf_north,
+                                  '_flag_created_omf_type',
+                                  side_effect=mock_async_noop) as patched_flag_created_omf_type:
+
+                    await fixture_omf_north.create_omf_objects(block("asset_1", "asset_2"), "SEND_PR", "0001")
+                    await fixture_omf_north.create_omf_objects(block("asset_2", "asset_1"), "SEND_PR", "0001")
+                    await fixture_omf_north.create_omf_objects(block("asset_3"), "SEND_PR", "0001")
+
+        assert patched_retrieve.call_count == 1
+        assert [args[0]["asset_code"] for args, _ in patched_create_omf_objects_automatic.call_args_list] == \
+            ["asset_2", "asset_3"]
+        patched_flag_created_omf_type.assert_called_with("SEND_PR", "0001", "asset_3")
+        assert fixture_omf_north._omf_types_created == {"asset_1", "asset_2", "asset_3"}
+
+    @pytest.mark.asyncio
+    async def test_deleted_omf_types_already_created(self, fixture_omf_north):
+        """ Unit test for - deleted_omf_types_already_created - the OMF objects are loaded again on the next block """
+
+        fixture_omf_north._omf_types_created = {"asset_1"}
+
+        with patch.object(fixture_omf_north._sending_process_instance._storage_async,
+                          'delete_from_tbl',
+                          return_value=mock_async_call()) as patched_delete_from_tbl:
+            await fixture_omf_north.deleted_omf_types_already_created("SEND_PR", "0001")
+
+        patched_delete_from_tbl.assert_called_with("omf_created_objects", ANY)
+        assert fixture_omf_north._omf_types_created is None
+
     @pytest.mark.parametrize(
         "p_key, "
         "p_value, "
@@ -1196,6 +1312,61 @@ class TestPIServerNorthPlugin:
         assert patched_aiohttp.called
         assert patched_aiohttp.call_count == 1
 
+    @pytest.mark.parametrize("p_size", [10, 100000])
+    @pytest.mark.asyncio
+    async def test_compress_message(self, p_size, fixture_omf_north):
+        """ Unit test for - _compress_message - the large messages are compressed outside the event loop """
+
+        fixture_omf_north._config = dict(compressionLevel=1)
+        message = b'x' * p_size
+
+        with patch.object(asyncio.get_event_loop(), 'run_in_executor',
+                          wraps=asyncio.get_event_loop().run_in_executor) as patched_run_in_executor:
+            compressed = await fixture_omf_north._compress_message(message)
+
+        assert gzip.decompress(compressed) == message
+        assert patched_run_in_executor.called == (p_size >= pi_server._COMPRESSION_OFF_LOOP_SIZE)
+
+    @pytest.mark.asyncio
+    async def test_send_in_memory_data_to_picromf_session(self, fixture_omf_north):
+        """ Unit test for - send_in_memory_data_to_picromf - the HTTP session is reused across the requests """
+
+        fixture_omf_north._config = dict(producerToken="dummy_producerToken")
+        fixture_omf_north._config["URL"] = "dummy_URL"
+        fixture_omf_north._config["OMFRetrySleepTime"] = 1
+        fixture_omf_north._config["OMFHttpTimeout"] = 1
+        fixture_omf_north._config["OMFMaxRetry"] = 1
+        fixture_omf_north._config["compression"] = "false"
+
+        class MockResponse:
+            """ mock the aiohttp.ClientSession.post context manager and its response """
+            status = 200
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *args):
+                return None
+
+            async def text(self):
+                return 'SUCCESS'
+
+        with patch.object(aiohttp.ClientSession,
+                          'post',
+                          side_effect=lambda **kwargs: MockResponse()
+                          ) as patched_aiohttp:
+
+            await fixture_omf_north.send_in_memory_data_to_picromf("Type", {'dummy': 'dummy'})
+            session = fixture_omf_north._session
+            await fixture_omf_north.send_in_memory_data_to_picromf("Data", {'dummy': 'dummy'})
+
+        assert patched_aiohttp.call_count == 2
+        assert fixture_omf_north._session is session
+
+        await fixture_omf_north.close()
+        assert session.closed
+        assert fixture_omf_north._session is None
+
     @pytest.mark.parametrize(
         "p_is_error, "
         "p_code, "
@@ -1480,7 +1651,7 @@ class TestPIServerNorthPlugin:
                         }
                     ],
                     "0001",
-                    # Transformed
+                    # Transformed - grouped in the same container
                     [
                         {
                             "containerid": "0001measurement_test_asset_code",
@@ -1488,12 +1659,7 @@ class TestPIServerNorthPlugin:
                                 {
                                     "Time": "2018-04-20T09:38:50.163Z",
                                     "pressure": 957.2
-                                }
-                            ]
-                        },
-                        {
-                            "containerid": "0001measurement_test_asset_code",
-                            "values": [
+                                },
                                 {
                                     "Time": "2018-04-20T09:38:50.163Z",
                                     "y": 34,
@@ -1504,6 +1670,52 @@ class TestPIServerNorthPlugin:
                         },
                     ],
                     True, 20, 2
+            ),
+
+            # Case 4 - 3 rows of 2 assets, one container each in the order they were read
+            (
+                    # Origin
+                    [
+                        {
+                            "id": 21,
+                            "asset_code": "asset_b",
+                            "read_key": "ef6e1368-4182-11e8-842f-0ed5f89f718b",
+                            "reading": {"x": 1},
+                            "user_ts": '2018-04-20 09:38:50.163164+00'
+                        },
+                        {
+                            "id": 22,
+                            "asset_code": "asset_a",
+                            "read_key": "ef6e1368-4182-11e8-842f-0ed5f89f718b",
+                            "reading": {"x": 2},
+                            "user_ts": '2018-04-20 09:38:51.163164+00'
+                        },
+                        {
+                            "id": 23,
+                            "asset_code": "asset_b",
+                            "read_key": "ef6e1368-4182-11e8-842f-0ed5f89f718b",
+                            "reading": {"x": 3},
+                            "user_ts": '2018-04-20 09:38:52.163164+00'
+                        }
+                    ],
+                    "0001",
+                    # Transformed
+                    [
+                        {
+                            "containerid": "0001measurement_asset_b",
+                            "values": [
+                                {"Time": "2018-04-20T09:38:50.163Z", "x": 1},
+                                {"Time": "2018-04-20T09:38:52.163Z", "x": 3}
+                            ]
+                        },
+                        {
+                            "containerid": "0001measurement_asset_a",
+                            "values": [
+                                {"Time": "2018-04-20T09:38:51.163Z", "x": 2}
+                            ]
+                        },
+                    ],
+                    True, 23, 3
             )
     ])
     def test_plugin_transform_in_memory_data(self,
@@ -1516,7 +1728,7 @@ class TestPIServerNorthPlugin:
                                              fixture_omf_north):
         """Tests the plugin in memory transformations """
 
-        generated_data_to_send = [None for x in range( len(expected_data_to_send) )]
+        generated_data_to_send = []
 
         fixture_omf_north._config_omf_types = {"type-id": {"value": type_id}}
 
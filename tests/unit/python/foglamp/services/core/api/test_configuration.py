@@ -828,3 +828,17 @@ class TestConfiguration:
             assert 1 == patch_delete_cat.call_count
             args, kwargs = patch_delete_cat.call_args
             assert category_name == args[0]
+
+    async def test_get_cache_statistics(self, client, reset_singleton):
+        storage_client_mock = MagicMock(StorageClientAsync)
+        c_mgr = ConfigurationManager(storage_client_mock)
+        c_mgr._cacheManager.update('rest_api', {})
+        assert 'rest_api' in c_mgr._cacheManager
+        assert 'service' not in c_mgr._cacheManager
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            resp = await client.get('/foglamp/configuration/cache')
+            assert 200 == resp.status
+            r = await resp.text()
+            json_response = json.loads(r)
+            assert {'size': 1, 'maxSize': 100, 'ttl': 0, 'hit': 1, 'miss': 1, 'eviction': 0, 'expired': 0,
+                    'hitRatio': 0.5} == json_response
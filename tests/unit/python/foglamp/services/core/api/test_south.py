@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+
+import json
+import uuid
+from unittest.mock import MagicMock, patch
+from aiohttp import web
+import pytest
+
+from foglamp.services.core import routes
+from foglamp.services.core import connect
+from foglamp.common.storage_client.storage_client import StorageClientAsync
+from foglamp.common.configuration_manager import ConfigurationManager
+from foglamp.common.service_record import ServiceRecord
+from foglamp.services.core import server
+from foglamp.services.core.api import south
+from foglamp.services.core.api import scheduler as scheduler_api
+from foglamp.services.core.service_registry.service_registry import ServiceRegistry
+
+
+__author__ = "Ashish Jabble"
+__copyright__ = "Copyright (c) 2026 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_TRACKED = [{'asset': 'sinusoid', 'plugin': 'sinusoid', 'service': 'Sine'},
+            {'asset': 'pressure', 'plugin': 'modbus', 'service': 'Pump'},
+            {'asset': 'flow', 'plugin': 'modbus', 'service': 'Pump'},
+            {'asset': 'level', 'plugin': 'modbus', 'service': 'Pump'}]
+_STATISTICS = [{'key': 'SINUSOID', 'value': 10}, {'key': 'PRESSURE', 'value': 20}, {'key': 'FLOW', 'value': 30}]
+_SCHEDULES = [{'schedule_name': 'Sine', 'enabled': 't'}, {'schedule_name': 'Pump', 'enabled': 'f'}]
+_PLUGINS = [{'name': 'sinusoid', 'version': '1.5.0'}, {'name': 'modbus', 'version': '1.4.0'}]
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("api", "south")
+class TestSouth:
+
+    @pytest.fixture
+    def client(self, loop, test_client):
+        app = web.Application(loop=loop)
+        # fill the routes table
+        routes.setup(app)
+        return loop.run_until_complete(test_client(app))
+
+    @pytest.fixture(autouse=True)
+    def reset(self):
+        south._response_cache['services'] = None
+        south._get_installed_plugins.cache_clear()
+        ServiceRegistry._registry = list()
+        yield
+        south._response_cache['services'] = None
+        ServiceRegistry._registry = list()
+
+    def _query(self, tables):
+        async def query_tbl_with_payload(table, payload):
+            tables.append((table, json.loads(payload)))
+            rows = {'asset_tracker': _TRACKED, 'statistics': _STATISTICS, 'schedules': _SCHEDULES}[table]
+            return {'rows': rows, 'count': len(rows)}
+        return query_tbl_with_payload
+
+    async def test_get_south_services(self, client):
+        async def get_category_child(category_name):
+            return [{'key': 'Sine'}, {'key': 'Pump'}]
+
+        ServiceRegistry._registry = [ServiceRecord('1', 'Sine', 'Southbound', 'http', '127.0.0.1', '1', '2')]
+        tables = []
+        storage_client_mock = MagicMock(StorageClientAsync)
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            with patch.object(ConfigurationManager, 'get_category_child', side_effect=get_category_child):
+                with patch.object(south.PluginDiscovery, 'get_plugins_installed', return_value=_PLUGINS):
+                    with patch.object(storage_client_mock, 'query_tbl_with_payload',
+                                      side_effect=self._query(tables)):
+                        resp = await client.get('/foglamp/south')
+                        assert 200 == resp.status
+                        json_response = json.loads(await resp.text())
+
+        assert {'services': [
+            {'name': 'Sine', 'address': '127.0.0.1', 'management_port': 2, 'service_port': 1, 'protocol': 'http',
+             'status': 'running', 'schedule_enabled': True, 'plugin': {'name': 'sinusoid', 'version': '1.5.0'},
+             'assets': [{'count': 10, 'asset': 'sinusoid'}]},
+            {'name': 'Pump', 'address': '', 'management_port': '', 'service_port': '', 'protocol': '',
+             'status': '', 'schedule_enabled': False, 'plugin': {'name': 'modbus', 'version': '1.4.0'},
+             'assets': [{'count': 20, 'asset': 'pressure'}, {'count': 30, 'asset': 'flow'}]}
+        ]} == json_response
+        # One query per table, whatever the number of services and assets
+        assert ['asset_tracker', 'statistics', 'schedules'] == [table for table, _ in tables]
+        assert {'condition': 'in', 'column': 'key', 'value': sorted(['SINUSOID', 'PRESSURE', 'FLOW', 'LEVEL'])} == \
+            dict(tables[1][1]['where'], value=sorted(tables[1][1]['where']['value']))
+
+    async def test_get_south_services_cached(self, client):
+        async def get_category_child(category_name):
+            return [{'key': 'Sine'}]
+
+        tables = []
+        storage_client_mock = MagicMock(StorageClientAsync)
+        with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
+            with patch.object(ConfigurationManager, 'get_category_child', side_effect=get_category_child):
+                with patch.object(south.PluginDiscovery, 'get_plugins_installed', return_value=_PLUGINS):
+                    with patch.object(storage_client_mock, 'query_tbl_with_payload',
+                                      side_effect=self._query(tables)):
+                        first = await (await client.get('/foglamp/south')).json()
+                        assert 3 == len(tables)
+                        # Served from the cache within its TTL
+                        assert first == await (await client.get('/foglamp/south')).json()
+                        assert 3 == len(tables)
+                        # Not with cached=false
+                        assert first == await (await client.get('/foglamp/south?cached=false')).json()
+                        assert 6 == len(tables)
+
+    @pytest.mark.parametrize("handler, method", [
+        (scheduler_api.enable_schedule, 'enable_schedule'),
+        (scheduler_api.disable_schedule, 'disable_schedule'),
+    ])
+    @pytest.mark.asyncio
+    async def test_schedule_change_invalidates_cache(self, handler, method):
+        async def change_schedule(schedule_id):
+            return True, 'done'
+
+        south._response_cache['services'] = [{'name': 'Sine', 'schedule_enabled': True}]
+        schedule_id = str(uuid.uuid4())
+        request = MagicMock(match_info={'schedule_id': schedule_id})
+        with patch.object(server.Server, 'scheduler', MagicMock(**{method: change_schedule}), create=True):
+            resp = await handler(request)
+        assert 200 == resp.status
+        assert south._response_cache['services'] is None
@@ -1,3 +1,5 @@
+import asyncio
+import time
 from unittest.mock import MagicMock, patch, Mock, call
 import pytest
 
@@ -253,3 +255,98 @@ class TestChangeCallback:
                     'Unable to notify microservice with uuid %s due to exception: %s', s_id_1, '')
             post_patch.assert_has_calls([call('http://saddress1:1/foglamp/change', data='{"category": "catname1", "items": null}', headers={'content-type': 'application/json'})])
         cm_get_patch.assert_called_once_with('catname1')
+
+    class FakeResponse:
+        status = 200
+        reason = 'OK'
+
+        def __init__(self, delay, error):
+            self._delay = delay
+            self._error = error
+
+        async def __aenter__(self):
+            await asyncio.sleep(self._delay)
+            if self._error is not None:
+                raise self._error
+            return self
+
+        async def __aexit__(self, *args):
+            return None
+
+        async def text(self):
+            return ''
+
+    class FakeSession:
+        def __init__(self, delay=0, error=None):
+            self.delay = delay
+            self.error = error
+            self.posts = []
+
+        def post(self, url, data, headers):
+            self.posts.append((url, data))
+            return TestChangeCallback.FakeResponse(self.delay, self.error)
+
+    def _register(self, *categories):
+        cfg_mgr = ConfigurationManager(MagicMock(spec=StorageClientAsync))
+        i_reg = InterestRegistry(cfg_mgr)
+        with patch.object(ServiceRegistry._logger, 'info'):
+            s_id_1 = ServiceRegistry.register('sname1', 'Southbound', 'saddress1', 1, 1, 'http')
+            s_id_2 = ServiceRegistry.register('sname2', 'Southbound', 'saddress2', 2, 2, 'http')
+        for category_name in categories:
+            i_reg.register(s_id_1, category_name)
+            i_reg.register(s_id_2, category_name)
+        return s_id_1, s_id_2
+
+    @pytest.mark.asyncio
+    async def test_run_notifies_concurrently(self):
+        async def get_category_all_items(category_name):
+            return None
+
+        self._register('catname1')
+        session = self.FakeSession(delay=0.2)
+        with patch.object(ConfigurationManager, 'get_category_all_items', side_effect=get_category_all_items):
+            with patch.object(cb, '_get_session', return_value=session):
+                start = time.time()
+                await cb.run('catname1')
+                assert time.time() - start < 0.35
+        assert [('http://saddress1:1/foglamp/change', '{"category": "catname1", "items": null}'),
+                ('http://saddress2:2/foglamp/change', '{"category": "catname1", "items": null}')] == session.posts
+
+    @pytest.mark.asyncio
+    async def test_run_coalesces_changes(self):
+        values = iter(['first', 'latest'])
+
+        async def get_category_all_items(category_name):
+            return next(values)
+
+        self._register('catname1')
+        session = self.FakeSession(delay=0.1)
+        with patch.object(ConfigurationManager, 'get_category_all_items', side_effect=get_category_all_items) as cm_get_patch:
+            with patch.object(cb, '_get_session', return_value=session):
+                in_flight = asyncio.ensure_future(cb.run('catname1'))
+                await asyncio.sleep(0.01)
+                # Changes while a notification is in flight return at once and are sent as one
+                await cb.run('catname1')
+                await cb.run('catname1')
+                assert 2 == len(session.posts)
+                await in_flight
+        assert 2 == cm_get_patch.call_count
+        assert 4 == len(session.posts)
+        assert '{"category": "catname1", "items": "latest"}' == session.posts[-1][1]
+        assert not cb._in_flight
+        assert not cb._changed_again
+
+    @pytest.mark.asyncio
+    async def test_run_timeout(self):
+        async def get_category_all_items(category_name):
+            return None
+
+        s_id_1, s_id_2 = self._register('catname1')
+        session = self.FakeSession(error=asyncio.TimeoutError())
+        with patch.object(ConfigurationManager, 'get_category_all_items', side_effect=get_category_all_items):
+            with patch.object(cb, '_get_session', return_value=session):
+                with patch.object(cb._LOGGER, 'error') as log_error:
+                    await cb.run('catname1')
+        assert 2 == log_error.call_count
+        log_error.assert_any_call('Unable to notify microservice with uuid %s within %s seconds', s_id_1, cb._NOTIFY_TIMEOUT)
+        log_error.assert_any_call('Unable to notify microservice with uuid %s within %s seconds', s_id_2, cb._NOTIFY_TIMEOUT)
@@ -201,6 +201,46 @@ class TestScheduler:
         assert 'OMF to PI north' in args
         assert 'North Readings to PI' in args
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("warm", [True, False])
+    async def test__start_task_warm_worker(self, warm, mocker):
+        # GIVEN
+        scheduler = Scheduler()
+        scheduler._storage_async = MockStorageAsync(core_management_host=None, core_management_port=None)
+        mocker.patch.object(scheduler._logger, "info")
+        schedule = self._schedule_row()
+        scheduler._process_scripts = {"test": ["tasks/purge"]}
+        scheduler._schedule_executions[schedule.id] = scheduler._ScheduleExecution(schedule.id, scheduler)
+        process = MagicMock()
+        process.pid = 1234
+        handed = []
+
+        class WorkerPool:
+            async def start_task(self, args):
+                handed.append(args)
+                return process if warm else None
+
+        async def create_subprocess_exec(*args, **kwargs):
+            return process
+
+        async def wait_for_task_completion(task_process):
+            pass
+
+        scheduler._worker_pool = WorkerPool()
+        exec_patch = mocker.patch.object(asyncio, 'create_subprocess_exec', side_effect=create_subprocess_exec)
+        mocker.patch.object(scheduler, '_wait_for_task_completion', side_effect=wait_for_task_completion)
+
+        # WHEN
+        await scheduler._start_task(schedule)
+
+        # THEN
+        assert 1 == len(handed)
+        assert "tasks/purge" == handed[0][0]
+        assert "--name=test" in handed[0]
+        assert (0 if warm else 1) == exec_patch.call_count
+        task_process, = scheduler._schedule_executions[schedule.id].task_processes.values()
+        assert process is task_process.process
+
     @pytest.mark.asyncio
     async def test_purge_tasks(self, mocker):
         # TODO: Mandatory - Add negative tests for full code coverage
@@ -263,6 +303,117 @@ class TestScheduler:
         assert 'COAP listener south' in args1
         assert 'OMF to PI north' in args2
 
+    def _heap_scheduler(self, schedules, current_time):
+        scheduler = Scheduler()
+        scheduler._max_running_tasks = 10
+        scheduler.current_time = current_time
+        for next_start_time, schedule in schedules:
+            scheduler._schedules[schedule.id] = schedule
+            schedule_execution = scheduler._ScheduleExecution(schedule.id, scheduler)
+            scheduler._schedule_executions[schedule.id] = schedule_execution
+            schedule_execution.next_start_time = next_start_time
+        return scheduler
+
+    def _schedule_row(self, exclusive=False, enabled=True):
+        return Scheduler._ScheduleRow(id=uuid.uuid4(), name="test", type=Schedule.Type.INTERVAL, time=None, day=None,
+                                      repeat=datetime.timedelta(seconds=30), repeat_seconds=30,
+                                      exclusive=exclusive, enabled=enabled, process_name="test")
+
+    @pytest.mark.asyncio
+    async def test__check_schedules_starts_only_due_schedules(self, mocker):
+        # GIVEN
+        current_time = time.time()
+        due = self._schedule_row()
+        not_due = [self._schedule_row() for _ in range(100)]
+        scheduler = self._heap_scheduler([(current_time - 1, due)] +
+                                         [(current_time + 10 + i, s) for i, s in enumerate(not_due)], current_time)
+        started = []
+
+        async def start_task(schedule):
+            started.append(schedule.id)
+
+        mocker.patch.object(scheduler, '_start_task', side_effect=start_task)
+        mocker.patch.object(scheduler._logger, "info")
+
+        # WHEN
+        earliest_start_time = await scheduler._check_schedules()
+
+        # THEN
+        assert [due.id] == started
+        assert current_time + 10 == earliest_start_time
+        # The started schedule was pushed again for its next start time
+        assert current_time - 1 + 30 == scheduler._schedule_executions[due.id].next_start_time
+        assert 101 == len(scheduler._schedule_heap)
+
+    @pytest.mark.asyncio
+    async def test__check_schedules_skips_stale_entries(self, mocker):
+        # GIVEN
+        current_time = time.time()
+        moved = self._schedule_row()
+        disabled = self._schedule_row(enabled=False)
+        deleted = self._schedule_row()
+        scheduler = self._heap_scheduler([(current_time - 1, moved), (current_time - 1, disabled),
+                                          (current_time - 1, deleted)], current_time)
+        # Moving next_start_time leaves a stale entry behind
+        scheduler._schedule_executions[moved.id].next_start_time = current_time + 60
+        del scheduler._schedules[deleted.id]
+        started = []
+
+        async def start_task(schedule):
+            started.append(schedule.id)
+
+        mocker.patch.object(scheduler, '_start_task', side_effect=start_task)
+
+        # WHEN
+        earliest_start_time = await scheduler._check_schedules()
+
+        # THEN
+        assert [] == started
+        assert current_time + 60 == earliest_start_time
+        assert [(current_time + 60, moved.id)] == scheduler._schedule_heap
+        assert deleted.id not in scheduler._schedule_executions
+
+        # WHEN the disabled schedule is enabled again
+        scheduler._schedules[disabled.id] = scheduler._schedules[disabled.id]._replace(enabled=True)
+        scheduler._requeue_schedule(disabled.id)
+        await scheduler._check_schedules()
+
+        # THEN
+        assert [disabled.id] == started
+
+    @pytest.mark.asyncio
+    async def test__check_schedules_exclusive_and_queued(self, mocker):
+        # GIVEN
+        current_time = time.time()
+        exclusive = self._schedule_row(exclusive=True)
+        manual = self._schedule_row()
+        scheduler = self._heap_scheduler([(current_time - 1, exclusive), (current_time + 60, manual)], current_time)
+        started = []
+
+        async def start_task(schedule):
+            started.append(schedule.id)
+            scheduler._schedule_executions[schedule.id].task_processes[len(started)] = schedule
+
+        mocker.patch.object(scheduler, '_start_task', side_effect=start_task)
+
+        # WHEN
+        await scheduler._check_schedules()
+        await scheduler._check_schedules()
+        scheduler._schedule_executions[manual.id].start_now = True
+        await scheduler._check_schedules()
+
+        # THEN the exclusive schedule is not started again while its task runs
+        assert [exclusive.id, manual.id] == started
+        assert {exclusive.id} == scheduler._blocked_schedules
+        assert current_time + 60 == scheduler._schedule_executions[manual.id].next_start_time
+
+        # WHEN the exclusive task finishes
+        scheduler._schedule_executions[exclusive.id].task_processes.clear()
+        await scheduler._check_schedules()
+
+        # THEN
+        assert [exclusive.id, manual.id, exclusive.id] == started
+
     @pytest.mark.asyncio
     @pytest.mark.skip("_scheduler_loop() not suitable for unit testing. Will be tested during System tests.")
     async def test__scheduler_loop(self, mocker):
@@ -494,6 +645,13 @@ class TestScheduler:
                         "default": str(Scheduler._DEFAULT_MAX_COMPLETED_TASK_AGE_DAYS),
                         "value": str(Scheduler._DEFAULT_MAX_COMPLETED_TASK_AGE_DAYS)
                     },
+                    "warm_workers": {
+                        "description": "Number of processes started ahead of time to run scheduled Python tasks, "
+                                       "0 to start a new process for every task",
+                        "type": "integer",
+                        "default": str(Scheduler._DEFAULT_WARM_WORKERS),
+                        "value": str(Scheduler._DEFAULT_WARM_WORKERS)
+                    },
             }
         # GIVEN
         scheduler = Scheduler()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+import asyncio
+import json
+import time
+
+import pytest
+from foglamp.services.core.scheduler.worker_pool import WorkerPool
+
+__author__ = "Ashish Jabble"
+__copyright__ = "Copyright (c) 2026 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+class FakeStdin:
+    def __init__(self, broken=False):
+        self.written = b""
+        self.closed = False
+        self.broken = broken
+
+    def write(self, data):
+        if self.broken:
+            raise BrokenPipeError()
+        self.written += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeProcess:
+    def __init__(self, broken=False):
+        self.stdin = FakeStdin(broken)
+        self.returncode = None
+        self.terminated = False
+
+    def terminate(self):
+        self.terminated = True
+        self.returncode = -15
+
+    async def wait(self):
+        return self.returncode
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("scheduler")
+class TestWorkerPool:
+    def _pool(self, mocker, size=2):
+        pool = WorkerPool(size, 8081)
+        started = []
+
+        async def start_worker():
+            process = FakeProcess()
+            started.append(process)
+            return process
+
+        mocker.patch.object(pool, '_start_worker', side_effect=start_worker)
+        return pool, started
+
+    @pytest.mark.asyncio
+    async def test_start_task(self, mocker):
+        pool, started = self._pool(mocker)
+        await pool.start()
+        assert 2 == pool.idle_count
+
+        args = ["tasks/purge", "--port=8081", "--address=127.0.0.1", "--name=purge"]
+        process = await pool.start_task(args)
+
+        assert started[0] is process
+        assert process.stdin.closed
+        invocation = json.loads(process.stdin.written.decode())
+        assert {"module": "foglamp.tasks.purge", "argv": args} == invocation
+        # The used worker is replaced in the background
+        await pool._fill_task
+        assert 2 == pool.idle_count
+        assert 3 == len(started)
+
+    @pytest.mark.asyncio
+    async def test_start_task_not_python_task(self, mocker):
+        pool, started = self._pool(mocker)
+        await pool.start()
+
+        assert await pool.start_task(["tasks/north_c", "--name=north"]) is None
+        # Runs under cpulimit on Raspbian, which a warm worker would bypass
+        assert await pool.start_task(["tasks/statistics", "--name=stats"]) is None
+        assert 2 == pool.idle_count
+
+    @pytest.mark.asyncio
+    async def test_start_task_skips_dead_and_old_workers(self, mocker):
+        pool, started = self._pool(mocker, size=3)
+        await pool.start()
+        started[0].returncode = 1
+        pool._idle[1] = (started[1], time.time() - WorkerPool._MAX_IDLE_SECONDS - 1)
+
+        process = await pool.start_task(["tasks/purge", "--name=purge"])
+
+        assert started[2] is process
+        await asyncio.sleep(0)
+        assert started[1].terminated
+
+    @pytest.mark.asyncio
+    async def test_start_task_broken_worker(self, mocker):
+        pool = WorkerPool(1, 8081)
+
+        async def start_worker():
+            return FakeProcess(broken=True)
+
+        mocker.patch.object(pool, '_start_worker', side_effect=start_worker)
+        await pool.start()
+
+        assert await pool.start_task(["tasks/purge", "--name=purge"]) is None
+        await pool.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop(self, mocker):
+        pool, started = self._pool(mocker)
+        await pool.start()
+
+        await pool.stop()
+
+        assert 0 == pool.idle_count
+        assert all(process.terminated for process in started)
+        assert await pool.start_task(["tasks/purge", "--name=purge"]) is None
+        assert 0 == pool.idle_count
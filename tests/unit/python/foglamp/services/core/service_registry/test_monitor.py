@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import asyncio
+import time
 from unittest.mock import MagicMock
 from unittest.mock import patch
 import pytest
@@ -67,6 +68,8 @@ class TestMonitor:
                 with pytest.raises(Exception) as excinfo:
                     await monitor._monitor_loop()
                 assert excinfo.type is TestMonitorException
+        # Closes the HTTP session opened by the monitor loop
+        await monitor._session.close()
         # service is good, so it should remain in the service registry
         assert len(ServiceRegistry.get(idx=s_id_1)) is 1
         assert ServiceRegistry.get(idx=s_id_1)[0]._status is ServiceRecord.Status.Running
@@ -106,5 +109,95 @@ class TestMonitor:
                 with pytest.raises(Exception) as excinfo:
                     await monitor._monitor_loop()
                 assert excinfo.type in [TestMonitorException, TypeError]
+        await monitor._session.close()
 
         assert ServiceRegistry.get(idx=s_id_1)[0]._status is ServiceRecord.Status.Failed
+
+    class FakeResponse:
+        def __init__(self, session):
+            self._session = session
+
+        async def __aenter__(self):
+            self._session.active += 1
+            self._session.max_active = max(self._session.max_active, self._session.active)
+            await asyncio.sleep(self._session.delay)
+            self._session.active -= 1
+            return self
+
+        async def __aexit__(self, *args):
+            return None
+
+        async def text(self):
+            return '{"uptime": 10}'
+
+    class FakeSession:
+        closed = False
+
+        def __init__(self, delay):
+            self.delay = delay
+            self.active = 0
+            self.max_active = 0
+            self.urls = []
+
+        def get(self, url, timeout):
+            self.urls.append(url)
+            return TestMonitor.FakeResponse(self)
+
+    @pytest.mark.asyncio
+    async def test__monitor_concurrent_probes(self):
+        class TestMonitorException(Exception):
+            pass
+
+        with patch.object(ServiceRegistry._logger, 'info'):
+            s_ids = [ServiceRegistry.register('sname{}'.format(i), 'Southbound', 'saddress{}'.format(i), i, i, 'http')
+                     for i in range(1, 5)]
+        monitor = Monitor()
+        monitor._sleep_interval = Monitor._DEFAULT_SLEEP_INTERVAL
+        monitor._max_attempts = Monitor._DEFAULT_MAX_ATTEMPTS
+        monitor._max_concurrent_probes = 2
+        session = self.FakeSession(delay=0.1)
+
+        with patch.object(Monitor, '_sleep', side_effect=TestMonitorException()):
+            with patch.object(monitor, '_get_session', return_value=session):
+                start = time.time()
+                with pytest.raises(TestMonitorException):
+                    await monitor._monitor_loop()
+                # 4 pings of 0.1s, 2 at a time
+                assert time.time() - start < 0.3
+        assert 2 == session.max_active
+        assert 4 == len(session.urls)
+        for s_id in s_ids:
+            assert ServiceRegistry.get(idx=s_id)[0]._status is ServiceRecord.Status.Running
+
+        stats = monitor.get_statistics()
+        assert 1 == stats['rounds']['count']
+        assert sorted(s_ids) == sorted(stats['services'])
+        for s_id in s_ids:
+            assert 1 == stats['services'][s_id]['rtt']['count']
+            assert 1 == stats['services'][s_id]['rtt']['buckets']['0.25']
+            assert 1 == stats['services'][s_id]['healthyStreak']
+
+    def test_adaptive_interval(self):
+        with patch.object(ServiceRegistry._logger, 'info'):
+            s_id_1 = ServiceRegistry.register('sname1', 'Southbound', 'saddress1', 1, 1, 'http')
+        monitor = Monitor()
+        monitor._sleep_interval = 10
+        assert monitor._is_probe_due(s_id_1, time.monotonic())
+        monitor._schedule_next_probe(s_id_1, True)
+        # Without adaptive interval every service is pinged every round
+        assert monitor._is_probe_due(s_id_1, time.monotonic())
+        assert 10 == monitor._next_sleep_interval()
+
+        monitor._adaptive_interval = True
+        now = time.monotonic()
+        for streak in range(1, 7):
+            monitor._schedule_next_probe(s_id_1, True)
+            assert pytest.approx(now + 10 * min(streak + 1, Monitor._MAX_PROBE_BACKOFF), abs=1) == monitor._next_probe[s_id_1]
+        assert not monitor._is_probe_due(s_id_1, now + 10)
+        assert monitor._is_probe_due(s_id_1, now + 40)
+
+        ServiceRegistry.get(idx=s_id_1)[0]._status = ServiceRecord.Status.Unresponsive
+        monitor._schedule_next_probe(s_id_1, False)
+        assert 0 == monitor._healthy_streak[s_id_1]
+        assert pytest.approx(now + 5, abs=1) == monitor._next_probe[s_id_1]
+        assert 5 == monitor._next_sleep_interval()
@@ -642,6 +642,19 @@ class TestServer:
         assert 'uptime' in json_response
         assert 0.0 < json_response["uptime"]
 
+    @pytest.mark.asyncio
+    async def test_ping_monitor_statistics(self, mocker):
+        statistics = {'rounds': {'buckets': {}, 'count': 0, 'sum': 0.0}, 'services': {}}
+        mocker.patch.object(Server, "_start_time", 0)
+        mocker.patch.object(Server, "service_monitor", MagicMock(get_statistics=MagicMock(return_value=statistics)))
+
+        resp = await Server.ping(MagicMock(web.Request))
+
+        assert 200 == resp.status
+        json_response = json.loads(resp.body.decode())
+        assert 'uptime' in json_response
+        assert statistics == json_response['monitor']
+
     @pytest.mark.asyncio
     async def test_shutdown(self, mocker):
         async def return_async_value(val):
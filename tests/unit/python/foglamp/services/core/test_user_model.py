@@ -7,11 +7,13 @@
 import json
 import asyncio
 from unittest.mock import MagicMock, patch
+import jwt
 import pytest
 
 from foglamp.services.core import connect
 from foglamp.common.storage_client.storage_client import StorageClientAsync
 from foglamp.common.storage_client.exceptions import StorageServerError
+from foglamp.services.core import user_model
 from foglamp.services.core.user_model import User
 from foglamp.common.configuration_manager import ConfigurationManager
 
@@ -26,6 +28,36 @@ pytestmark = pytest.mark.asyncio
 def mock_coro(*args, **kwargs):
     return None if len(args) == 0 else args[0]
 
+class CacheStorage:
+    def __init__(self):
+        self.queries = []
+        self.updates = []
+
+    async def query_tbl_with_payload(self, table, payload):
+        self.queries.append((table, payload))
+        if table == 'user_logins':
+            return {'rows': [{"token_expiration": "2017-03-14 15:09:19.800648"}], 'count': 1}
+        if table == 'users':
+            return {'rows': [{'id': '2', 'uname': 'user', 'role_id': '2'}], 'count': 1}
+        return {'rows': [{'id': '1'}], 'count': 1}
+
+    async def update_tbl(self, table, payload):
+        self.updates.append((table, payload))
+        return {'rows_affected': 1, "response": "updated"}
+
+    async def delete_from_tbl(self, table, payload=None):
+        return {'rows_affected': 1, "response": "deleted"}
+
+
+@pytest.fixture
+def cache_storage():
+    storage = CacheStorage()
+    User.Objects.clear_cache()
+    with patch.object(connect, 'get_storage_async', return_value=storage):
+        yield storage
+    User.Objects.clear_cache()
+
+
 @pytest.allure.feature("unit")
 @pytest.allure.story("services", "core", "user-model")
 class TestUserModel:
@@ -473,6 +505,59 @@ class TestUserModel:
                 await User.Objects.delete_all_user_tokens()
         delete_tbl_patch.assert_called_once_with('user_logins')
 
+    async def test_token_user_and_role_cached(self, cache_storage):
+        token = jwt.encode({'uid': '2'}, user_model.JWT_SECRET, user_model.JWT_ALGORITHM)
+        for _ in range(3):
+            assert '2' == await User.Objects.validate_token(token)
+            assert {'id': '2', 'uname': 'user', 'role_id': '2'} == await User.Objects.get(uid='2')
+            assert [{'id': '1'}] == await User.Objects.get_role_id_by_name('admin')
+        assert ['user_logins', 'users', 'roles'] == [c[0] for c in cache_storage.queries]
+
+        # logout
+        await User.Objects.delete_token(token)
+        await User.Objects.validate_token(token)
+        assert 'user_logins' == cache_storage.queries[-1][0]
+        assert 4 == len(cache_storage.queries)
+
+    async def test_cache_expires(self, cache_storage):
+        await User.Objects.get(uid='2')
+        with patch.object(user_model, 'TOKEN_CACHE_TTL_SECONDS', -1):
+            await User.Objects.get(uid='2')
+        assert 2 == len(cache_storage.queries)
+
+    async def test_cache_forgets_updated_and_deleted_users(self, cache_storage):
+        token = jwt.encode({'uid': '2'}, user_model.JWT_SECRET, user_model.JWT_ALGORITHM)
+        await User.Objects.validate_token(token)
+        await User.Objects.get(uid='2')
+
+        await User.Objects.update(2, {'role_id': 1})
+        await User.Objects.get(uid='2')
+        await User.Objects.validate_token(token)
+        assert 4 == len(cache_storage.queries)
+
+        await User.Objects.delete(2)
+        await User.Objects.get(uid='2')
+        await User.Objects.validate_token(token)
+        assert 6 == len(cache_storage.queries)
+
+    async def test_refresh_token_expiry_batched(self, cache_storage):
+        await User.Objects.refresh_token_expiry('t1')
+        await User.Objects.refresh_token_expiry('t1')
+        assert 1 == len(cache_storage.updates)
+        assert {"column": "token", "condition": "=", "value": "t1"} == json.loads(cache_storage.updates[0][1])['where']
+
+        # t2 is written along with the t1 refresh still pending
+        await User.Objects.refresh_token_expiry('t1')
+        await User.Objects.refresh_token_expiry('t2')
+        assert 2 == len(cache_storage.updates)
+        where = json.loads(cache_storage.updates[1][1])['where']
+        assert 'in' == where['condition']
+        assert ['t1', 't2'] == sorted(where['value'])
+
+        with patch.object(user_model, 'TOKEN_EXPIRY_WRITE_INTERVAL_SECONDS', -1):
+            await User.Objects.refresh_token_expiry('t1')
+        assert 3 == len(cache_storage.updates)
+
     async def test_no_user_exists(self):
         storage_client_mock = MagicMock(StorageClientAsync)
         with patch.object(connect, 'get_storage_async', return_value=storage_client_mock):
@@ -14,6 +14,7 @@ from foglamp.services.south.ingest import *
 from foglamp.services.south import ingest
 from foglamp.common.storage_client.storage_client import StorageClientAsync, ReadingsStorageClientAsync
 from foglamp.common.microservice_management_client.microservice_management_client import MicroserviceManagementClient
+from foglamp.common.microservice_management_client.exceptions import MicroserviceManagementClientError
 
 __author__ = "Amarendra K Sinha"
 __copyright__ = "Copyright (c) 2017 OSIsoft, LLC"
@@ -50,8 +51,10 @@ class TestIngest:
         Ingest._readings_stats = 0  # type: int
         Ingest._discarded_readings_stats = 0  # type: int
         Ingest._sensor_stats = {}  # type: dict
+        Ingest._asset_codes = {}  # type: dict
         Ingest._write_statistics_task = None  # type: asyncio.Task
         Ingest._write_statistics_sleep_task = None  # type: asyncio.Task
+        Ingest._write_statistics_threshold_reached = None  # type: asyncio.Event
         Ingest._stop = False
         Ingest._started = False
         Ingest._readings_lists = None  # type: List
@@ -64,12 +67,19 @@ class TestIngest:
         Ingest._last_insert_time = 0  # type: int
         Ingest._readings_list_size = 0  # type: int
         Ingest._write_statistics_frequency_seconds = 5
+        Ingest._write_statistics_threshold = 4096
         Ingest._readings_buffer_size = 500
         Ingest._max_concurrent_readings_inserts = 5
         Ingest._readings_insert_batch_size = 100
         Ingest._readings_insert_batch_timeout_seconds = 1
         Ingest._max_readings_insert_batch_connection_idle_seconds = 60
         Ingest._max_readings_insert_batch_reconnect_wait_seconds = 10
+        Ingest._asset_tracker_records = set()
+        Ingest._asset_tracker_pending = []
+        Ingest._asset_tracker_pending_event = None
+        Ingest._asset_tracker_task = None
+        Ingest._asset_tracker_service = None
+        Ingest._asset_tracker_plugin = None
         Ingest.category = 'South'
         Ingest.default_config = {
             "readings_buffer_size": {
@@ -106,6 +116,16 @@ class TestIngest:
                 "type": "integer",
                 "default": str(Ingest._max_readings_insert_batch_reconnect_wait_seconds)
             },
+            "write_statistics_frequency_seconds": {
+                "description": "The number of seconds to wait before writing readings statistics to storage",
+                "type": "integer",
+                "default": str(Ingest._write_statistics_frequency_seconds)
+            },
+            "write_statistics_threshold": {
+                "description": "The number of readings counted that causes readings statistics to be written",
+                "type": "integer",
+                "default": str(Ingest._write_statistics_threshold)
+            },
         }
 
     @pytest.mark.asyncio
@@ -136,6 +156,9 @@ class TestIngest:
                int(new_config['max_readings_insert_batch_connection_idle_seconds']['value'])
         assert Ingest._max_readings_insert_batch_reconnect_wait_seconds == \
                int(new_config['max_readings_insert_batch_reconnect_wait_seconds']['value'])
+        assert Ingest._write_statistics_frequency_seconds == \
+               int(new_config['write_statistics_frequency_seconds']['value'])
+        assert Ingest._write_statistics_threshold == int(new_config['write_statistics_threshold']['value'])
 
     @pytest.mark.asyncio
     async def test_read_config_filter(self, mocker):
@@ -216,7 +239,7 @@ class TestIngest:
         mocker.patch.object(statistics, "create_statistics", return_value=mock_create(None))
         parent_service = MagicMock(_core_microservice_management_client=MicroserviceManagementClient())
         mocker.patch.object(Ingest, "_write_statistics", return_value=mock_coro())
-        mocker.patch.object(Ingest, "_insert_readings", return_value=mock_coro())
+        insert_readings = mocker.patch.object(Ingest, "_insert_readings", side_effect=lambda list_index: mock_coro())
 
         # WHEN
         await Ingest.start(parent=parent_service)
@@ -224,6 +247,9 @@ class TestIngest:
         # THEN
         assert 1 == create_cfg.call_count
         assert 1 == get_cfg.call_count
+        parent_service._readings_storage_async.enable_connection_pool.assert_called_once_with(
+            limit=Ingest._max_concurrent_readings_inserts,
+            idle_timeout=Ingest._max_readings_insert_batch_connection_idle_seconds)
         assert Ingest._stop is False
         assert Ingest._started is True
         assert Ingest._readings_list_size == int(Ingest._readings_buffer_size / (
@@ -233,6 +259,9 @@ class TestIngest:
         assert Ingest._max_concurrent_readings_inserts == len(Ingest._readings_list_batch_size_reached)
         assert Ingest._max_concurrent_readings_inserts == len(Ingest._readings_list_not_empty)
         assert Ingest._max_concurrent_readings_inserts == len(Ingest._readings_lists)
+        assert Ingest._max_concurrent_readings_inserts == len(Ingest._insert_readings_tasks)
+        assert [call(i) for i in range(Ingest._max_concurrent_readings_inserts)] == insert_readings.call_args_list
+        assert Ingest._write_statistics_task is not None
         assert 0 == log_warning.call_count
 
     @pytest.mark.asyncio
@@ -258,9 +287,11 @@ class TestIngest:
         mocker.patch.object(MicroserviceManagementClient, "get_asset_tracker_events", return_value={'track':[]})
         mocker.patch.object(MicroserviceManagementClient, "create_child_category", return_value=None)
         mocker.patch.object(statistics, "create_statistics", return_value=mock_create(None))
-        parent_service = MagicMock(_core_microservice_management_client=MicroserviceManagementClient())
+        parent_service = MagicMock(_core_microservice_management_client=MicroserviceManagementClient(),
+                                   _readings_storage_async=MagicMock(close=MagicMock(return_value=false_coro())),
+                                   _storage_async=MagicMock(close=MagicMock(return_value=false_coro())))
         mocker.patch.object(Ingest, "_write_statistics", return_value=mock_coro())
-        mocker.patch.object(Ingest, "_insert_readings", return_value=mock_coro())
+        insert_readings = mocker.patch.object(Ingest, "_insert_readings", side_effect=lambda list_index: mock_coro())
 
         # WHEN
         await Ingest.start(parent=parent_service)
@@ -278,6 +309,62 @@ class TestIngest:
         assert Ingest._readings_list_batch_size_reached is None
         assert Ingest._readings_list_not_empty is None
         assert Ingest._readings_lists_not_full is None
+        assert Ingest._write_statistics_task is None
+        parent_service._readings_storage_async.close.assert_called_once_with()
+        parent_service._storage_async.close.assert_called_once_with()
+        assert 0 == log_exception.call_count
+
+    @pytest.mark.asyncio
+    async def test_stop_waits_for_asset_tracker_registration(self, mocker):
+
+        class mock_stat:
+            def __init__(self):
+                pass
+
+            async def register(self, key, desc):
+                return None
+
+        async def mock_create(storage):
+            return mock_stat()
+
+        calls = []
+
+        def create_event(payload):
+            calls.append(('start', payload["asset"]))
+            time.sleep(0.5)
+            calls.append(('end', payload["asset"]))
+            if len(calls) == 2:
+                raise MicroserviceManagementClientError(status=503, reason="unavailable")
+            return {}
+
+        # GIVEN
+        mocker.patch.object(StorageClientAsync, "__init__", return_value=None)
+        mocker.patch.object(ReadingsStorageClientAsync, "__init__", return_value=None)
+        log_exception = mocker.patch.object(ingest._LOGGER, "exception")
+        mocker.patch.object(ingest._LOGGER, "warning")
+        mocker.patch.object(MicroserviceManagementClient, "__init__", return_value=None)
+        mocker.patch.object(MicroserviceManagementClient, "create_configuration_category", return_value=None)
+        mocker.patch.object(MicroserviceManagementClient, "get_configuration_category", return_value=get_cat(Ingest.default_config))
+        mocker.patch.object(MicroserviceManagementClient, "get_asset_tracker_events", return_value={'track':[]})
+        mocker.patch.object(MicroserviceManagementClient, "create_child_category", return_value=None)
+        mocker.patch.object(MicroserviceManagementClient, "create_asset_tracker_event", side_effect=create_event)
+        mocker.patch.object(statistics, "create_statistics", side_effect=mock_create)
+        parent_service = MagicMock(_core_microservice_management_client=MicroserviceManagementClient(),
+                                   _readings_storage_async=MagicMock(close=MagicMock(return_value=false_coro())),
+                                   _storage_async=MagicMock(close=MagicMock(return_value=false_coro())))
+        mocker.patch.object(Ingest, "_write_statistics", return_value=mock_coro())
+        mocker.patch.object(Ingest, "_insert_readings", side_effect=lambda list_index: mock_coro())
+
+        # WHEN - stops while the record is being registered, and fails
+        await Ingest.start(parent=parent_service)
+        Ingest._track_asset("pump1")
+        await asyncio.sleep(0.1)
+        await Ingest.stop()
+
+        # THEN - the failed record is sent again by the last flush, once the first registration is done
+        assert [('start', 'pump1'), ('end', 'pump1'), ('start', 'pump1'), ('end', 'pump1')] == calls
+        assert [] == Ingest._asset_tracker_pending
+        assert Ingest._asset_tracker_task is None
         assert 0 == log_exception.call_count
 
     @pytest.mark.asyncio
@@ -289,15 +376,115 @@ class TestIngest:
         # THEN
         assert 1 == Ingest._discarded_readings_stats
 
-    @pytest.mark.skip(reason="This method uses a while True loop. Investigate as to how to write unit test for an infinite loop.")
     @pytest.mark.asyncio
     async def test__insert_readings(self, mocker):
-        pass
+        # GIVEN
+        async def mock_append(payload):
+            return {"response": "appended", "readings_added": len(payload["readings"])}
+
+        Ingest._readings_insert_batch_size = 2
+        Ingest._readings_lists = [[("a0", None, {}, "ts0"), ("a1", "k1", {"x": 1}, "ts1"), ("a2", None, {}, "ts2")], []]
+        Ingest._insert_readings_wait_tasks = [None, None]
+        Ingest._readings_list_batch_size_reached = [asyncio.Event(), asyncio.Event()]
+        Ingest._readings_lists_not_full = asyncio.Event()
+        Ingest._insert_readings_stats = [{'batches': 0, 'readings': 0, 'failures': 0,
+                                          'last_latency': 0.0, 'total_latency': 0.0} for _ in range(2)]
+        Ingest.readings_storage_async = MagicMock(append=MagicMock(side_effect=mock_append))
+        Ingest._write_statistics_threshold = 3
+        Ingest._write_statistics_threshold_reached = asyncio.Event()
+        write_stats = mocker.patch.object(Ingest, "_write_statistics", side_effect=lambda: false_coro())
+        Ingest._stop = True
+
+        # WHEN
+        await asyncio.gather(Ingest._insert_readings(0), Ingest._insert_readings(1))
+
+        # THEN
+        Ingest.readings_storage_async.append.assert_called_once_with(
+            {"readings": [{"asset_code": "a0", "reading": {}, "user_ts": "ts0"},
+                          {"asset_code": "a1", "read_key": "k1", "reading": {"x": 1}, "user_ts": "ts1"},
+                          {"asset_code": "a2", "reading": {}, "user_ts": "ts2"}]})
+        assert 0 == write_stats.call_count
+        assert Ingest._write_statistics_threshold_reached.is_set()
+        assert 3 == Ingest._readings_stats
+        assert 0 == len(Ingest._readings_lists[0])
+        assert Ingest._readings_lists_not_full.is_set()
+        insert_stats = Ingest.get_insert_statistics()
+        assert 2 == len(insert_stats)
+        assert 1 == insert_stats[0]['batches']
+        assert 3 == insert_stats[0]['readings']
+        assert 0 == insert_stats[0]['failures']
+        assert 0 == insert_stats[1]['batches']
+        assert 0.0 == insert_stats[1]['readings_per_second']
+
+    @pytest.mark.asyncio
+    async def test_write_statistics_loop(self, mocker):
+        # GIVEN
+        Ingest._write_statistics_frequency_seconds = 60
+        Ingest._write_statistics_threshold_reached = asyncio.Event()
+        write_stats = mocker.patch.object(Ingest, "_write_statistics", side_effect=lambda: false_coro())
+        task = asyncio.ensure_future(Ingest._write_statistics_loop())
+
+        # WHEN
+        await asyncio.sleep(0.1)
+        assert 0 == write_stats.call_count
+        Ingest._write_statistics_threshold_reached.set()
+        await asyncio.sleep(0.1)
+
+        # THEN
+        assert 1 == write_stats.call_count
+        assert not Ingest._write_statistics_threshold_reached.is_set()
+
+        Ingest._stop = True
+        Ingest._write_statistics_sleep_task.cancel()
+        await task
+        assert 1 == write_stats.call_count
+        assert Ingest._write_statistics_sleep_task is None
 
-    @pytest.mark.skip(reason="This method uses a while True loop. Investigate as to how to write unit test for an infinite loop.")
     @pytest.mark.asyncio
     async def test_write_statistics(self, mocker):
-        pass
+        # GIVEN
+        Ingest._readings_stats = 3
+        Ingest._discarded_readings_stats = 1
+        Ingest._sensor_stats = {'PUMP1': 3}
+        Ingest.stats = MagicMock(register=MagicMock(side_effect=lambda key, desc: false_coro()),
+                                 update_bulk=MagicMock(side_effect=lambda updates: false_coro()))
+
+        # WHEN
+        await Ingest._write_statistics()
+
+        # THEN
+        Ingest.stats.register.assert_called_once_with(
+            'PUMP1', 'Readings received by FogLAMP since startup for sensor PUMP1')
+        Ingest.stats.update_bulk.assert_called_once_with({'READINGS': 3, 'DISCARDED': 1, 'PUMP1': 3})
+        assert 0 == Ingest._readings_stats
+        assert 0 == Ingest._discarded_readings_stats
+        assert 0 == Ingest._sensor_stats['PUMP1']
+
+        # Nothing counted since, nothing written
+        await Ingest._write_statistics()
+        assert 1 == Ingest.stats.update_bulk.call_count
+
+    @pytest.mark.asyncio
+    async def test_write_statistics_failure(self, mocker):
+        # GIVEN
+        async def mock_update_bulk(updates):
+            raise Exception("storage is down")
+
+        Ingest._readings_stats = 3
+        Ingest._discarded_readings_stats = 1
+        Ingest._sensor_stats = {'PUMP1': 3}
+        Ingest.stats = MagicMock(register=MagicMock(side_effect=lambda key, desc: false_coro()),
+                                 update_bulk=MagicMock(side_effect=mock_update_bulk))
+        log_exception = mocker.patch.object(ingest._LOGGER, "exception")
+
+        # WHEN
+        await Ingest._write_statistics()
+
+        # THEN counters are kept for the next write
+        assert 3 == Ingest._readings_stats
+        assert 1 == Ingest._discarded_readings_stats
+        assert 3 == Ingest._sensor_stats['PUMP1']
+        assert 1 == log_exception.call_count
 
     @pytest.mark.asyncio
     async def test_is_available_at_start(self, mocker):
@@ -387,10 +574,13 @@ class TestIngest:
         Ingest._readings_list_not_empty = []
         Ingest._readings_list_not_empty.append(asyncio.Event())
         Ingest._started = True
+        Ingest._asset_tracker_service = "svc"
+        Ingest._asset_tracker_plugin = "plg"
+        Ingest._asset_tracker_pending_event = asyncio.Event()
         mocker.patch.object(Ingest, "_write_statistics", return_value=mock_coro())
         mocker.patch.object(Ingest, "_insert_readings", return_value=mock_coro())
         mocker.patch.object(MicroserviceManagementClient, "__init__", return_value=None)
-        mocker.patch.object(MicroserviceManagementClient, "create_asset_tracker_event", return_value=None)
+        create_event = mocker.patch.object(MicroserviceManagementClient, "create_asset_tracker_event", return_value=None)
         assert 0 == len(Ingest._readings_lists[0])
         assert 'PUMP1' not in list(Ingest._sensor_stats.keys())
 
@@ -402,6 +592,84 @@ class TestIngest:
 
         # THEN
         assert 1 == len(Ingest._readings_lists[0])
+        assert ("pump1", str(data['key']), data['readings'], data['timestamp']) == Ingest._readings_lists[0][0]
+        assert 1 == Ingest._sensor_stats['PUMP1']
+        # asset tracker record is queued for the background registration, not sent inline
+        assert 0 == create_event.call_count
+        assert [("pump1", "Ingest", "svc", "plg")] == Ingest._asset_tracker_pending
+        assert Ingest._asset_tracker_pending_event.is_set()
+
+    @pytest.mark.asyncio
+    async def test_add_readings_without_key(self, mocker):
+        # GIVEN
+        Ingest._max_concurrent_readings_inserts = 1
+        Ingest._readings_list_size = 4
+        Ingest._current_readings_list_index = 0
+        Ingest._readings_lists = [[]]
+        Ingest._readings_list_not_empty = [asyncio.Event()]
+        Ingest._started = True
+        Ingest._asset_tracker_service = "svc"
+        Ingest._asset_tracker_plugin = "plg"
+        Ingest._asset_tracker_pending_event = asyncio.Event()
+
+        # WHEN
+        for i in range(2):
+            await Ingest.add_readings(asset="".join(["pump", "1"]), timestamp="ts{}".format(i), readings={"x": i})
+
+        # THEN
+        first, second = Ingest._readings_lists[0]
+        assert ("pump1", None, {"x": 0}, "ts0") == first
+        assert first[0] is second[0]
+        assert 2 == Ingest._sensor_stats['PUMP1']
+        assert [("pump1", "Ingest", "svc", "plg")] == Ingest._asset_tracker_pending
+        assert {"readings": [{"asset_code": "pump1", "reading": {"x": 0}, "user_ts": "ts0"}]} == \
+            Ingest._readings_payload(Ingest._readings_lists[0], 1)
+
+    @pytest.mark.asyncio
+    async def test_track_asset(self, mocker):
+        # GIVEN
+        Ingest._asset_tracker_service = "svc"
+        Ingest._asset_tracker_plugin = "plg"
+        Ingest._asset_tracker_records = {("pump1", "Ingest", "svc", "plg")}
+        Ingest._asset_tracker_pending_event = asyncio.Event()
+
+        # WHEN
+        Ingest._track_asset("pump1")
+        Ingest._track_asset("pump2")
+        Ingest._track_asset("pump2")
+
+        # THEN
+        assert [("pump2", "Ingest", "svc", "plg")] == Ingest._asset_tracker_pending
+        assert ("pump2", "Ingest", "svc", "plg") in Ingest._asset_tracker_records
+
+    @pytest.mark.asyncio
+    async def test_flush_asset_tracker_records(self, mocker):
+        # GIVEN
+        def create_event(payload):
+            if payload["asset"] == "down":
+                raise MicroserviceManagementClientError(status=503, reason="unavailable")
+            if payload["asset"] == "bad":
+                raise MicroserviceManagementClientError(status=400, reason="bad request")
+            return {}
+
+        Ingest._asset_tracker_client = MagicMock(create_asset_tracker_event=MagicMock(side_effect=create_event))
+        Ingest._asset_tracker_pending = [("ok", "Ingest", "svc", "plg"), ("down", "Ingest", "svc", "plg"),
+                                         ("bad", "Ingest", "svc", "plg")]
+        log_error = mocker.patch.object(ingest._LOGGER, "error")
+        log_warning = mocker.patch.object(ingest._LOGGER, "warning")
+
+        # WHEN
+        retval = await Ingest._flush_asset_tracker_records()
+
+        # THEN
+        assert retval is False
+        assert 3 == Ingest._asset_tracker_client.create_asset_tracker_event.call_count
+        Ingest._asset_tracker_client.create_asset_tracker_event.assert_any_call(
+            {"asset": "ok", "event": "Ingest", "service": "svc", "plugin": "plg"})
+        # only the record that failed on a server error is kept for a retry
+        assert [("down", "Ingest", "svc", "plg")] == Ingest._asset_tracker_pending
+        assert 1 == log_error.call_count
+        assert 1 == log_warning.call_count
 
     @pytest.mark.asyncio
     async def test_add_readings_if_stop(self, mocker):
@@ -595,3 +863,135 @@ class TestIngest:
         # THEN
         assert 1 == len(Ingest._readings_lists[0])
         assert 1 == len(Ingest._readings_lists[1])
+
+    def _start_lists(self, lists, list_size, batch_size):
+        Ingest._max_concurrent_readings_inserts = lists
+        Ingest._readings_list_size = list_size
+        Ingest._readings_insert_batch_size = batch_size
+        Ingest._current_readings_list_index = 0
+        Ingest._readings_lists = [[] for _ in range(lists)]
+        Ingest._readings_list_not_empty = [asyncio.Event() for _ in range(lists)]
+        Ingest._readings_list_batch_size_reached = [asyncio.Event() for _ in range(lists)]
+        Ingest._asset_tracker_pending_event = asyncio.Event()
+        Ingest._started = True
+
+    @pytest.mark.asyncio
+    async def test_add_readings_bulk(self, mocker):
+        # GIVEN
+        self._start_lists(lists=2, list_size=3, batch_size=2)
+        key = str(uuid.uuid4())
+        log_warning = mocker.patch.object(ingest._LOGGER, "warning")
+
+        # WHEN
+        added = await Ingest.add_readings_bulk("pump1", [("ts0", None, {"x": 0}), ("ts1", key, {"x": 1}),
+                                                         ("ts2", None, 2), ("ts3", None, None)])
+
+        # THEN
+        assert 3 == added
+        assert [("pump1", None, {"x": 0}, "ts0"), ("pump1", key, {"x": 1}, "ts1")] == Ingest._readings_lists[0]
+        assert [("pump1", None, {}, "ts3")] == Ingest._readings_lists[1]
+        assert Ingest._readings_list_batch_size_reached[0].is_set()
+        assert not Ingest._readings_list_batch_size_reached[1].is_set()
+        assert Ingest._readings_list_not_empty[1].is_set()
+        assert 1 == Ingest._current_readings_list_index
+        assert 3 == Ingest._sensor_stats['PUMP1']
+        assert 1 == Ingest._discarded_readings_stats
+        assert 1 == len(Ingest._asset_tracker_pending)
+        log_warning.assert_called_once_with('Discarded %s invalid readings of asset %s, %s', 1, 'pump1',
+                                            'readings must be a dictionary')
+
+    @pytest.mark.asyncio
+    async def test_add_readings_bulk_when_buffer_full(self, mocker):
+        # GIVEN
+        self._start_lists(lists=2, list_size=2, batch_size=1)
+        mocker.patch.object(ingest._LOGGER, "warning")
+
+        # WHEN
+        added = await Ingest.add_readings_bulk("pump1", [("ts{}".format(i), None, {}) for i in range(6)])
+
+        # THEN
+        assert 4 == added
+        # Same placement as add_readings, one reading at a time
+        assert ["ts0", "ts3"] == [r[3] for r in Ingest._readings_lists[0]]
+        assert ["ts1", "ts2"] == [r[3] for r in Ingest._readings_lists[1]]
+        assert 4 == Ingest._sensor_stats['PUMP1']
+        assert 2 == Ingest._discarded_readings_stats
+
+    @pytest.mark.asyncio
+    async def test_add_readings_bulk_invalid_asset(self, mocker):
+        # GIVEN
+        self._start_lists(lists=1, list_size=4, batch_size=4)
+
+        # WHEN
+        with pytest.raises(TypeError):
+            await Ingest.add_readings_bulk(1, [("ts0", None, {}), ("ts1", None, {})])
+
+        # THEN
+        assert 0 == len(Ingest._readings_lists[0])
+        assert 2 == Ingest._discarded_readings_stats
+
+    @pytest.mark.asyncio
+    async def test_add_readings_bulk_not_started(self, mocker):
+        with pytest.raises(RuntimeError):
+            await Ingest.add_readings_bulk("pump1", [])
+
+    @pytest.mark.asyncio
+    async def test_add_readings_multi(self, mocker):
+        # GIVEN
+        self._start_lists(lists=1, list_size=4, batch_size=4)
+        mocker.patch.object(ingest._LOGGER, "warning")
+
+        # WHEN
+        added = await Ingest.add_readings_multi([
+            {"asset": "pump1", "timestamp": "ts0", "key": None, "readings": {"x": 0}},
+            {"asset": "pump2", "timestamp": "ts1", "readings": {"x": 1}},
+            {"asset": None, "timestamp": "ts2", "key": None, "readings": {}},
+            {"asset": "pump1", "key": None, "readings": {}},
+            {"asset": "pump1", "timestamp": "ts4", "key": None, "readings": {"x": 4}}])
+
+        # THEN
+        assert 3 == added
+        assert [("pump1", None, {"x": 0}, "ts0"), ("pump2", None, {"x": 1}, "ts1"),
+                ("pump1", None, {"x": 4}, "ts4")] == Ingest._readings_lists[0]
+        assert 2 == Ingest._sensor_stats['PUMP1']
+        assert 1 == Ingest._sensor_stats['PUMP2']
+        assert 2 == Ingest._discarded_readings_stats
+        assert 2 == len(Ingest._asset_tracker_pending)
+        assert Ingest._readings_list_not_empty[0].is_set()
+
+    @pytest.mark.asyncio
+    async def test_add_readings_multi_when_buffer_full(self, mocker):
+        # GIVEN
+        self._start_lists(lists=1, list_size=3, batch_size=3)
+        mocker.patch.object(ingest._LOGGER, "warning")
+
+        # WHEN
+        added = await Ingest.add_readings_multi([{"asset": "pump1", "timestamp": "ts{}".format(i), "key": None,
+                                                  "readings": {}} for i in range(5)])
+
+        # THEN
+        # The readings that fit are kept in order, the rest are counted as discarded on return
+        assert 3 == added
+        assert ["ts0", "ts1", "ts2"] == [r[3] for r in Ingest._readings_lists[0]]
+        assert 3 == Ingest._sensor_stats['PUMP1']
+        assert 2 == Ingest._discarded_readings_stats
+
+    @pytest.mark.asyncio
+    async def test_assets_of_discarded_readings_not_tracked(self, mocker):
+        # GIVEN
+        self._start_lists(lists=1, list_size=2, batch_size=2)
+        mocker.patch.object(ingest._LOGGER, "warning")
+        Ingest._asset_tracker_service = "svc"
+        Ingest._asset_tracker_plugin = "plg"
+
+        # WHEN
+        added = await Ingest.add_readings_multi([{"asset": asset, "timestamp": "ts", "key": None, "readings": {}}
+                                                 for asset in ["pump1", "pump1", "pump2"]])
+        added_bulk = await Ingest.add_readings_bulk("pump3", [("ts", None, {})])
+
+        # THEN - the buffer was full for the readings of pump2 and pump3
+        assert 2 == added
+        assert 0 == added_bulk
+        assert [("pump1", "Ingest", "svc", "plg")] == Ingest._asset_tracker_pending
+        assert {'PUMP1': 2} == Ingest._sensor_stats
+        assert ["pump1"] == list(Ingest._asset_codes)
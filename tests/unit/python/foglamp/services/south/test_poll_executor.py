@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import types
+
+import pytest
+from foglamp.services.south import poll_executor
+
+__author__ = "Ashish Jabble"
+__copyright__ = "Copyright (c) 2026 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+_PLUGIN_MODULE = 'foglamp.plugins.south.poll_executor_test.poll_executor_test'
+
+
+def _plugin_module(poll_seconds=0):
+    """A plugin module recording the thread and process it is called from"""
+    plugin = types.ModuleType(_PLUGIN_MODULE)
+
+    def plugin_init(config):
+        return dict(config, calls=['init'])
+
+    def plugin_poll(handle):
+        time.sleep(poll_seconds)
+        handle['calls'].append('poll')
+        return {'asset': 'test', 'thread': threading.get_ident(), 'pid': os.getpid(), 'calls': handle['calls']}
+
+    def plugin_reconfigure(handle, config):
+        return dict(config, calls=handle['calls'] + ['reconfigure'], restart='yes')
+
+    def plugin_shutdown(handle):
+        handle['calls'].append('shutdown')
+
+    plugin.plugin_init = plugin_init
+    plugin.plugin_poll = plugin_poll
+    plugin.plugin_reconfigure = plugin_reconfigure
+    plugin.plugin_shutdown = plugin_shutdown
+    return plugin
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("south")
+class TestPollExecutor:
+
+    @pytest.mark.asyncio
+    async def test_inline(self):
+        executor = poll_executor.create('inline', _plugin_module(), _PLUGIN_MODULE)
+        assert isinstance(executor, poll_executor.InlinePollExecutor)
+
+        handle = await executor.start({'pollInterval': {'value': '10'}})
+        reading = await executor.poll(handle)
+        handle = await executor.reconfigure(handle, {'pollInterval': {'value': '20'}})
+        await executor.shutdown(handle)
+
+        assert threading.get_ident() == reading['thread']
+        assert ['init', 'poll', 'reconfigure', 'shutdown'] == handle['calls']
+        assert 'yes' == handle['restart']
+
+    @pytest.mark.asyncio
+    async def test_thread_does_not_block_loop(self):
+        executor = poll_executor.create('thread', _plugin_module(poll_seconds=0.3), _PLUGIN_MODULE)
+        assert isinstance(executor, poll_executor.ThreadPollExecutor)
+        handle = await executor.start({})
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker_task = asyncio.ensure_future(ticker())
+        readings = await asyncio.gather(executor.poll(handle), executor.poll(handle))
+        ticker_task.cancel()
+        await executor.shutdown(handle)
+
+        # The loop kept running during the polls, which ran one at a time on the same thread
+        assert ticks > 20
+        assert readings[0]['thread'] == readings[1]['thread'] != threading.get_ident()
+        assert ['init', 'poll', 'poll', 'shutdown'] == handle['calls']
+
+    @pytest.mark.asyncio
+    async def test_process(self):
+        sys.modules[_PLUGIN_MODULE] = _plugin_module()
+        try:
+            executor = poll_executor.create('process', sys.modules[_PLUGIN_MODULE], _PLUGIN_MODULE)
+            assert isinstance(executor, poll_executor.ProcessPollExecutor)
+
+            config = {'pollInterval': {'value': '10'}}
+            handle = await executor.start(config)
+            assert config == handle and config is not handle
+            reading = await executor.poll(handle)
+            handle = await executor.reconfigure(handle, {'pollInterval': {'value': '20'}})
+            second = await executor.poll(handle)
+            await executor.shutdown(handle)
+        finally:
+            del sys.modules[_PLUGIN_MODULE]
+
+        assert os.getpid() != reading['pid']
+        assert reading['pid'] == second['pid']
+        assert ['init', 'poll'] == reading['calls']
+        assert ['init', 'poll', 'reconfigure', 'poll'] == second['calls']
+        assert {'pollInterval': {'value': '20'}, 'restart': 'yes'} == handle
+
+    def test_unknown_mode(self):
+        assert isinstance(poll_executor.create('bad', _plugin_module(), _PLUGIN_MODULE),
+                          poll_executor.InlinePollExecutor)
+
+    def test_statistics(self):
+        statistics = poll_executor.PollStatistics()
+        assert 0.0 == statistics.to_dict()['averageDuration']
+
+        statistics.add_poll(jitter=0.002, duration=0.1)
+        statistics.add_poll(jitter=-0.001, duration=0.3)
+        statistics.add_overruns(2)
+
+        assert {'polls': 2, 'overruns': 2,
+                'lastDuration': 300.0, 'averageDuration': 200.0, 'maxDuration': 300.0,
+                'lastJitter': 0.0, 'averageJitter': 1.0, 'maxJitter': 2.0} == statistics.to_dict()
@@ -6,7 +6,9 @@
 
 import asyncio
 import copy
+import json
 import sys
+import time
 from unittest.mock import MagicMock, Mock, call, patch
 import pytest
 
@@ -351,6 +353,143 @@ class TestServicesSouthServer:
                  call('Stopped all polling tasks for plugin: test')]
         log_warning.assert_has_calls(calls, any_order=True)
 
+    @pytest.mark.asyncio
+    async def test__exec_plugin_poll_thread_mode(self, loop, mocker):
+        # GIVEN
+        cat_get, south_server, ingest_start, log_exception, log_error, log_info, log_warning = self.south_fixture(mocker)
+        config = copy.deepcopy(cat_get())
+        config['pollMode'] = {'type': 'enumeration', 'options': ['inline', 'thread', 'process'],
+                              'default': 'inline', 'value': 'thread'}
+        south_server._core_microservice_management_client.get_configuration_category.return_value = config
+        mocker.patch.object(FoglampMicroservice, '_start_time', 0, create=True)
+        mocker.patch.object(Ingest, '_insert_readings_stats', None)
+        batches = []
+
+        async def add_readings_multi(readings):
+            batches.append(readings)
+            return len(readings)
+        mocker.patch.object(Ingest, 'add_readings_multi', side_effect=add_readings_multi)
+
+        def slow_poll(handle):
+            # A blocking device read taking most of pollInterval
+            time.sleep(.06)
+            return {'asset': 'test', 'timestamp': '2018-01-01 00:00:00', 'key': None, 'readings': {'x': 1}}
+
+        mock_plugin = MagicMock()
+        attrs = copy.deepcopy(plugin_attrs)
+        attrs['plugin_info.return_value']['mode'] = 'poll'
+        attrs['plugin_init.return_value'].update({'pollInterval': {'type': 'integer', 'default': '100',
+                                                                   'value': '100'}})
+        attrs['plugin_poll.side_effect'] = slow_poll
+        mock_plugin.configure_mock(**attrs)
+        sys.modules['foglamp.plugins.south.test.test'] = mock_plugin
+
+        # WHEN
+        await south_server._start(loop)
+        ticks = 0
+        for _ in range(100):
+            await asyncio.sleep(.01)
+            ticks += 1
+        south_server._task_main.cancel()
+        response = await south_server.ping(request=None)
+
+        # THEN
+        # The event loop kept running while polling, and polls kept to pollInterval despite their duration
+        assert 100 == ticks
+        statistics = json.loads(response.body.decode())['poll']
+        assert 'thread' == statistics['mode']
+        assert 9 <= statistics['polls'] <= 11
+        # Each poll is handed to ingest as one batch
+        assert statistics['polls'] == len(batches)
+        assert all(1 == len(batch) and 'test' == batch[0]['asset'] for batch in batches)
+        assert 0 == statistics['overruns']
+        assert statistics['averageDuration'] >= 60
+        assert statistics['maxJitter'] < 50
+
+    @pytest.mark.asyncio
+    async def test__exec_plugin_poll_batch(self, loop, mocker):
+        # GIVEN
+        cat_get, south_server, ingest_start, log_exception, log_error, log_info, log_warning = self.south_fixture(mocker)
+        batches = []
+
+        async def add_readings_multi(readings):
+            batches.append(readings)
+            return len(readings)
+        mocker.patch.object(Ingest, 'add_readings_multi', side_effect=add_readings_multi)
+        mocker.patch.object(Ingest, 'add_readings', side_effect=Exception('one reading at a time'))
+
+        polled = [{'asset': 'test', 'timestamp': '2018-01-01 00:00:00', 'key': None, 'readings': {'x': x}}
+                  for x in range(1000)]
+        mock_plugin = MagicMock()
+        attrs = copy.deepcopy(plugin_attrs)
+        attrs['plugin_info.return_value']['mode'] = 'poll'
+        attrs['plugin_init.return_value'].update({'pollInterval': {'type': 'integer', 'default': '1000',
+                                                                   'value': '1000'}})
+        attrs['plugin_poll.side_effect'] = [polled, polled[0]]
+        mock_plugin.configure_mock(**attrs)
+        sys.modules['foglamp.plugins.south.test.test'] = mock_plugin
+        tasks_before = len(asyncio.all_tasks())
+
+        # WHEN
+        await south_server._start(loop)
+        await asyncio.sleep(0)
+
+        # THEN
+        # The poll is buffered in order by a single call, without a task per reading
+        assert [polled] == batches
+        assert tasks_before + 1 == len(asyncio.all_tasks())
+        await asyncio.sleep(1.1)
+        assert [polled, [polled[0]]] == batches
+        south_server._task_main.cancel()
+
+    @pytest.mark.asyncio
+    async def test__exec_plugin_poll_overrun(self, loop, mocker):
+        # GIVEN
+        cat_get, south_server, ingest_start, log_exception, log_error, log_info, log_warning = self.south_fixture(mocker)
+        def slower_poll(handle):
+            time.sleep(.25)
+            return []
+
+        mock_plugin = MagicMock()
+        attrs = copy.deepcopy(plugin_attrs)
+        attrs['plugin_info.return_value']['mode'] = 'poll'
+        attrs['plugin_init.return_value'].update({'pollInterval': {'type': 'integer', 'default': '100',
+                                                                   'value': '100'}})
+        attrs['plugin_poll.side_effect'] = slower_poll
+        mock_plugin.configure_mock(**attrs)
+        sys.modules['foglamp.plugins.south.test.test'] = mock_plugin
+
+        # WHEN
+        await south_server._start(loop)
+        await asyncio.sleep(.9)
+        south_server._task_main.cancel()
+
+        # THEN
+        # Polls missed while a poll ran are skipped, the next poll is due at the next interval
+        statistics = south_server._poll_statistics.to_dict()
+        assert 3 <= statistics['polls'] <= 4
+        assert 2 * (statistics['polls'] - 1) <= statistics['overruns'] <= 2 * statistics['polls']
+        assert statistics['maxJitter'] < 100
+
+    @pytest.mark.asyncio
+    async def test_ping(self, mocker):
+        # GIVEN
+        cat_get, south_server, ingest_start, log_exception, log_error, log_info, log_warning = self.south_fixture(mocker)
+        mocker.patch.object(FoglampMicroservice, '_start_time', 0, create=True)
+        mocker.patch.object(Ingest, '_readings_lists', [[("a0", None, {}, "ts0")]])
+        mocker.patch.object(Ingest, '_insert_readings_stats', [{'batches': 2, 'readings': 10, 'failures': 1,
+                                                                'last_latency': 0.25, 'total_latency': 0.5}])
+
+        # WHEN
+        response = json.loads((await south_server.ping(request=None)).body.decode())
+
+        # THEN
+        # The readings insert counters of the ingest lists, no poll statistics for an async plugin
+        assert response['uptime'] > 0
+        assert [{'list_index': 0, 'pending': 1, 'batches': 2, 'readings': 10, 'failures': 1, 'last_latency': 0.25,
+                 'average_latency': 0.25, 'readings_per_second': 20.0}] == response['ingest']
+        assert 'poll' not in response
+
     @pytest.mark.asyncio
     async def test_run(self, mocker):
         """Not fit for Unit test"""
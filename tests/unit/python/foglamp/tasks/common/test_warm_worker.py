@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+# FOGLAMP_BEGIN
+# See: http://foglamp.readthedocs.io/
+# FOGLAMP_END
+
+import importlib.util
+import io
+import json
+import sys
+from unittest.mock import patch
+
+import pytest
+from foglamp.tasks.common import warm_worker
+
+__author__ = "Ashish Jabble"
+__copyright__ = "Copyright (c) 2026 OSIsoft, LLC"
+__license__ = "Apache 2.0"
+__version__ = "${VERSION}"
+
+
+@pytest.allure.feature("unit")
+@pytest.allure.story("tasks", "common")
+class TestWarmWorker:
+    def test_main_runs_task(self):
+        argv = ["tasks/purge", "--port=8081", "--address=127.0.0.1", "--name=purge"]
+        stdin = io.StringIO(json.dumps({"module": "foglamp.tasks.purge", "argv": argv}) + "\n")
+        with patch.object(sys, 'argv', ['warm_worker', '--address=127.0.0.1', '--port=8081']):
+            with patch.object(sys, 'stdin', stdin):
+                with patch.object(warm_worker, '_preload') as preload:
+                    with patch.object(warm_worker, '_resolve_storage') as resolve:
+                        with patch.object(warm_worker.runpy, 'run_module') as run_module:
+                            warm_worker.main()
+                            assert argv == sys.argv
+        preload.assert_called_once_with()
+        resolve.assert_called_once_with('127.0.0.1', 8081)
+        run_module.assert_called_once_with("foglamp.tasks.purge", run_name="__main__", alter_sys=True)
+
+    def test_main_stopped_before_task(self):
+        with patch.object(sys, 'argv', ['warm_worker', '--address=127.0.0.1', '--port=8081']):
+            with patch.object(sys, 'stdin', io.StringIO("")):
+                with patch.object(warm_worker, '_preload'):
+                    with patch.object(warm_worker, '_resolve_storage'):
+                        with patch.object(warm_worker.runpy, 'run_module') as run_module:
+                            warm_worker.main()
+        run_module.assert_not_called()
+
+    def test_task_modules_exist(self):
+        for module in warm_worker.TASK_MODULES.values():
+            assert importlib.util.find_spec(module) is not None
+
+    def test_task_modules_not_preloaded(self):
+        # runpy runs a task module already imported a second time, with a RuntimeWarning
+        for module in warm_worker.TASK_MODULES.values():
+            assert module not in warm_worker._PRELOAD_MODULES
+            assert module + ".__main__" not in warm_worker._PRELOAD_MODULES
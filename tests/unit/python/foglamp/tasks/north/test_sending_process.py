@@ -962,6 +962,63 @@ class TestSendingProcess:
         elapsed_seconds = time.time() - start_time
         assert expected_time <= elapsed_seconds <= (expected_time + tolerance)
 
+    @pytest.mark.parametrize("p_async_shutdown", [True, False])
+    @pytest.mark.asyncio
+    async def test_stop(self, event_loop, p_async_shutdown):
+        """ Unit tests - stop, a plugin_shutdown coroutine is awaited """
+
+        with patch.object(sys, 'argv', ['pytest', '--address', 'corehost', '--port', '32333', '--name', 'sname']):
+            with patch.object(MicroserviceManagementClient, '__init__', return_value=None) as mmc_patch:
+                with patch.object(ReadingsStorageClientAsync, '__init__', return_value=None) as rsc_async_patch:
+                    with patch.object(StorageClientAsync, '__init__', return_value=None) as sc_async_patch:
+                        with patch.object(asyncio, 'get_event_loop', return_value=event_loop):
+                            sp = SendingProcess()
+
+        sp._logger = MagicMock(spec=logging)
+        shutdown = []
+
+        async def plugin_shutdown_async(handle):
+            await asyncio.sleep(0)
+            shutdown.append(handle)
+
+        sp._plugin = MagicMock()
+        sp._plugin.plugin_shutdown.side_effect = plugin_shutdown_async if p_async_shutdown else shutdown.append
+        sp._plugin_handle = {'name': 'handle'}
+
+        await sp.stop()
+
+        assert [{'name': 'handle'}] == shutdown
+
+    @pytest.mark.parametrize("p_max_blocks_in_flight, expected_info", [(1, False), (3, True)])
+    @pytest.mark.asyncio
+    async def test_send_data_log_pipeline(self, event_loop, p_max_blocks_in_flight, expected_info):
+        """ Unit tests - send_data, logs the pipeline statistics of a pipelined run, without an audit entry """
+
+        with patch.object(sys, 'argv', ['pytest', '--address', 'corehost', '--port', '32333', '--name', 'sname']):
+            with patch.object(MicroserviceManagementClient, '__init__', return_value=None) as mmc_patch:
+                with patch.object(ReadingsStorageClientAsync, '__init__', return_value=None) as rsc_async_patch:
+                    with patch.object(StorageClientAsync, '__init__', return_value=None) as sc_async_patch:
+                        with patch.object(asyncio, 'get_event_loop', return_value=event_loop):
+                            sp = SendingProcess()
+
+        SendingProcess._logger = MagicMock(spec=logging)
+        sp._audit = MagicMock(spec=AuditLogger)
+        sp._config = {'duration': 0, 'sleepInterval': 0, 'memory_buffer_size': 10,
+                      'max_blocks_in_flight': p_max_blocks_in_flight}
+        SendingProcess._stop_execution = False
+
+        with patch.object(sp, '_last_object_id_read', return_value=0):
+            await sp.send_data()
+
+        assert not sp._audit.information.called
+        message = "send_data - pipeline {}".format(
+            {'in_flight': 0, 'max_in_flight': 0, 'blocks_sent': 0, 'blocks_failed': 0, 'fetched': 0})
+        if expected_info:
+            SendingProcess._logger.info.assert_called_once_with(message)
+        else:
+            SendingProcess._logger.debug.assert_any_call(message)
+            assert not SendingProcess._logger.info.called
+
     @pytest.mark.parametrize(
         "p_rows, "                 # GIVEN, information retrieve from the storage layer
         "p_num_element_to_fetch, " 
@@ -1796,7 +1853,7 @@ class TestSendingProcess:
         SendingProcess._logger = MagicMock(spec=logging)
         sp._audit = MagicMock(spec=AuditLogger)
         sp._stream_id = 1
-        sp._tracked_assets = []
+        sp._tracked_assets = set()
 
         # Configures properly the SendingProcess, enabling JQFilter
         sp._config = {
@@ -1978,7 +2035,7 @@ class TestSendingProcess:
         SendingProcess._logger = MagicMock(spec=logging)
         sp._audit = MagicMock(spec=AuditLogger)
         sp._stream_id = 1
-        sp._tracked_assets = []
+        sp._tracked_assets = set()
 
         # Configures properly the SendingProcess, enabling JQFilter
         sp._config = {
@@ -2151,7 +2208,7 @@ class TestSendingProcess:
             return p_send_result[x]["data_sent"], p_send_result[x]["new_last_object_id"], p_send_result[x]["num_sent"]
 
         # Configures properly the SendingProcess, enabling JQFilter
-        fixture_sp._tracked_assets = []
+        fixture_sp._tracked_assets = set()
         fixture_sp._config = {
             'memory_buffer_size': p_buffer_size,
             'plugin': 'pi_server'
@@ -2195,6 +2252,176 @@ class TestSendingProcess:
 
         assert fixture_sp._memory_buffer == expected_buffer
 
+    async def test_task_send_data_statistics(self, event_loop, fixture_sp):
+        """ Unit tests - _task_send_data - the blocks sent and failed are counted as for a pipelined run """
+
+        sent = []
+
+        async def mock_plugin_send(handle, block, stream_id):
+            """ mock the sending operation, the second block fails the first time """
+            assert fixture_sp.get_pipeline_statistics()['in_flight'] == 1
+            block_id = block[0]["id"]
+            sent.append(block_id)
+            if block_id == 2 and sent.count(2) == 1:
+                return False, 0, 0
+            return True, block_id, len(block)
+
+        p_rows = [
+            [{"id": 1, "asset_code": "asset_1", "reading": {"x": 1}, "user_ts": "16/04/2018 16:32:55"}],
+            [{"id": 2, "asset_code": "asset_1", "reading": {"x": 2}, "user_ts": "16/04/2018 16:32:55"}],
+        ]
+
+        fixture_sp._tracked_assets = set()
+        fixture_sp._config = {
+            'memory_buffer_size': 3,
+            'plugin': 'pi_server'
+        }
+        fixture_sp._memory_buffer = p_rows + [None]
+
+        with patch.object(fixture_sp, '_update_position_reached', return_value=mock_async_call()):
+            with patch.object(fixture_sp._plugin, 'plugin_send', new=mock_plugin_send):
+                with patch.object(fixture_sp._core_microservice_management_client, 'create_asset_tracker_event'):
+                    task_id = asyncio.ensure_future(fixture_sp._task_send_data())
+
+                    await asyncio.sleep(0.1)
+
+                    # Tear down
+                    fixture_sp._task_send_data_run = False
+                    fixture_sp._task_fetch_data_sem.release()
+
+                    await task_id
+
+        assert sent == [1, 2, 2]
+        assert fixture_sp.get_pipeline_statistics() == {
+            'in_flight': 0, 'max_in_flight': 1, 'blocks_sent': 2, 'blocks_failed': 1, 'fetched': 0}
+
+    async def test_task_send_data_pipelined(self, event_loop, fixture_sp):
+        """ Unit tests - _task_send_data_pipelined - blocks are sent concurrently and acknowledged in order """
+
+        sent = []
+        running = []
+
+        async def mock_plugin_send(handle, block, stream_id):
+            """ mock the sending operation, the first block is the slowest one """
+            running.append(block[0]["id"])
+            await asyncio.sleep(0.3 if block[0]["id"] == 1 else 0.1)
+            sent.append(block[0]["id"])
+            return True, block[-1]["id"], len(block)
+
+        p_rows = [
+            [{"id": 1, "asset_code": "asset_1", "reading": {"x": 1}, "user_ts": "16/04/2018 16:32:55"}],
+            [{"id": 2, "asset_code": "asset_1", "reading": {"x": 2}, "user_ts": "16/04/2018 16:32:55"},
+             {"id": 3, "asset_code": "asset_2", "reading": {"x": 3}, "user_ts": "16/04/2018 16:32:55"}],
+            [{"id": 4, "asset_code": "asset_2", "reading": {"x": 4}, "user_ts": "16/04/2018 16:32:55"}],
+        ]
+
+        fixture_sp._tracked_assets = set()
+        fixture_sp._config = {
+            'memory_buffer_size': 5,
+            'max_blocks_in_flight': 3,
+            'plugin': 'pi_server'
+        }
+        fixture_sp._pipeline_stats = {'in_flight': 0, 'max_in_flight': 0, 'blocks_sent': 0, 'blocks_failed': 0}
+        fixture_sp._memory_buffer = p_rows + [None, None]
+
+        with patch.object(fixture_sp, '_update_position_reached', return_value=mock_async_call()) \
+                as patched_update_position_reached:
+            with patch.object(fixture_sp._plugin, 'plugin_send', new=mock_plugin_send):
+                with patch.object(fixture_sp._core_microservice_management_client, 'create_asset_tracker_event') \
+                        as patched_asset_tracker:
+                    task_id = asyncio.ensure_future(fixture_sp._task_send_data_pipelined())
+
+                    await asyncio.sleep(0.1)
+                    assert fixture_sp.get_pipeline_statistics()['fetched'] == 3
+
+                    await asyncio.sleep(0.5)
+
+                    # Tear down
+                    fixture_sp._task_send_data_run = False
+                    fixture_sp._task_fetch_data_sem.release()
+
+                    await task_id
+
+        # THEN - all the blocks were in flight at the same time, the position is the one of the last block
+        assert running == [1, 2, 4]
+        assert sent == [2, 4, 1]
+        assert fixture_sp._memory_buffer == [None] * 5
+        patched_update_position_reached.assert_called_once_with(4, 4)
+        assert patched_asset_tracker.call_count == 2
+        assert fixture_sp._task_send_data_sem._value == 3
+        assert fixture_sp.get_pipeline_statistics() == {
+            'in_flight': 0, 'max_in_flight': 3, 'blocks_sent': 3, 'blocks_failed': 0, 'fetched': 0}
+
+    async def test_task_send_data_pipelined_resend(self, event_loop, fixture_sp):
+        """ Unit tests - _task_send_data_pipelined - a block failing is sent again with the ones after it """
+
+        sent = []
+
+        async def mock_plugin_send(handle, block, stream_id):
+            """ mock the sending operation, the second block fails the first time """
+            await asyncio.sleep(0.01)
+            block_id = block[0]["id"]
+            sent.append(block_id)
+            if block_id == 2 and sent.count(2) == 1:
+                return False, 0, 0
+            return True, block_id, len(block)
+
+        p_rows = [
+            [{"id": 1, "asset_code": "asset_1", "reading": {"x": 1}, "user_ts": "16/04/2018 16:32:55"}],
+            [{"id": 2, "asset_code": "asset_1", "reading": {"x": 2}, "user_ts": "16/04/2018 16:32:55"}],
+            [{"id": 3, "asset_code": "asset_1", "reading": {"x": 3}, "user_ts": "16/04/2018 16:32:55"}],
+        ]
+
+        fixture_sp._tracked_assets = set()
+        fixture_sp._config = {
+            'memory_buffer_size': 3,
+            'max_blocks_in_flight': 3,
+            'plugin': 'pi_server'
+        }
+        fixture_sp._pipeline_stats = {'in_flight': 0, 'max_in_flight': 0, 'blocks_sent': 0, 'blocks_failed': 0}
+        fixture_sp._memory_buffer = list(p_rows)
+        fixture_sp.TASK_SEND_SLEEP = 0.05
+
+        with patch.object(fixture_sp, '_update_position_reached', return_value=mock_async_call()) \
+                as patched_update_position_reached:
+            with patch.object(fixture_sp._plugin, 'plugin_send', new=mock_plugin_send):
+                with patch.object(fixture_sp._core_microservice_management_client, 'create_asset_tracker_event'):
+                    task_id = asyncio.ensure_future(fixture_sp._task_send_data_pipelined())
+
+                    await asyncio.sleep(0.5)
+
+                    # Tear down
+                    fixture_sp._task_send_data_run = False
+                    fixture_sp._task_fetch_data_sem.release()
+
+                    await task_id
+
+        # THEN - the blocks after the failed one are sent again, in order
+        assert sent == [1, 2, 3, 2, 3]
+        assert fixture_sp._memory_buffer == [None] * 3
+        patched_update_position_reached.assert_called_once_with(3, 3)
+        statistics = fixture_sp.get_pipeline_statistics()
+        assert statistics['blocks_sent'] == 3
+        assert statistics['blocks_failed'] == 1
+
+    def test_track_egress_assets(self, fixture_sp):
+        """ Unit tests - _track_egress_assets - a record is registered once for each asset code """
+
+        fixture_sp._name = "sname"
+        fixture_sp._config = {'plugin': 'pi_server'}
+        fixture_sp._tracked_assets = {"asset_1"}
+
+        block = [{"asset_code": "asset_1"}, {"asset_code": "asset_2"}, {"asset_code": "asset_2"}]
+
+        with patch.object(fixture_sp._core_microservice_management_client, 'create_asset_tracker_event') \
+                as patched_asset_tracker:
+            fixture_sp._track_egress_assets(block)
+            fixture_sp._track_egress_assets(block)
+
+        patched_asset_tracker.assert_called_once_with(
+            {"asset": "asset_2", "event": "Egress", "service": "sname", "plugin": "pi_server"})
+        assert fixture_sp._tracked_assets == {"asset_1", "asset_2"}
+
     @pytest.mark.asyncio
     async def test_update_position_reached(self, event_loop):
         """ Unit tests - _update_position_reached """
@@ -2278,7 +2505,35 @@ class TestSendingProcess:
                     "memory_buffer_size": 10,
                     "sleepInterval": 10,
                     "plugin": "omf",
-                    "stream_id": 1
+                    "stream_id": 1,
+                    "max_blocks_in_flight": 1
+                },
+            ),
+            # Case 2
+            (
+                # p_config
+                {
+                    "enable": {"value": "true"},
+                    "duration": {"value": "10"},
+                    "source": {"value": 'readings'},
+                    "blockSize": {"value": "10"},
+                    "memory_buffer_size": {"value": "10"},
+                    "max_blocks_in_flight": {"value": "4"},
+                    "sleepInterval": {"value": "10"},
+                    "plugin": {"value": "omf"},
+                    "stream_id": {"value": "1"}
+                },
+                # expected_config
+                {
+                    "enable": True,
+                    "duration": 10,
+                    "source": 'readings',
+                    "blockSize": 10,
+                    "memory_buffer_size": 10,
+                    "sleepInterval": 10,
+                    "plugin": "omf",
+                    "stream_id": 1,
+                    "max_blocks_in_flight": 4
                 },
             ),
         ]
@@ -2307,6 +2562,7 @@ class TestSendingProcess:
         assert sp._config['sleepInterval'] == expected_config['sleepInterval']
         assert sp._config['plugin'] == expected_config['plugin']
         assert sp._config['stream_id'] == expected_config['stream_id']
+        assert sp._config['max_blocks_in_flight'] == expected_config['max_blocks_in_flight']
 
     @pytest.mark.skip(reason="Stream ID tests no longer valid")
     async def test_start_stream_not_valid(self, event_loop):
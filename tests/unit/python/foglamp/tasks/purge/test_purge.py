@@ -146,7 +146,7 @@ class TestPurge:
                 assert patch_storage.called
                 assert 1 == patch_storage.call_count
                 args, kwargs = patch_storage.call_args
-                assert ('streams', '{"aggregate": {"operation": "min", "column": "last_object"}}') == args
+                assert ('streams', b'{"aggregate": {"operation": "min", "column": "last_object"}}') == args
 
     @pytest.mark.parametrize("conf, expected_return", [
         ({"retainUnsent": {"value": "False"}, "age": {"value": "0"}, "size": {"value": "0"}}, (0, 0)),